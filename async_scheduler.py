@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+异步定时调度器
+基于asyncio，到期任务并发执行（有全局并发上限），睡眠到下一个截止时间而不是轮询；
+支持随机抖动、同一任务不重叠运行、停顿后合并错过的运行，并记录每个任务的耗时和延迟
+"""
+
+import asyncio
+import inspect
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+class IntervalTrigger:
+    """
+    固定间隔触发
+    """
+
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("间隔必须大于0")
+        self.seconds = seconds
+
+    def first(self, now: float) -> float:
+        return now + self.seconds
+
+    def next_after(self, scheduled: float, now: float):
+        """
+        :return: (下一次计划时间, 被合并跳过的次数)
+        """
+        next_time = scheduled + self.seconds
+        if next_time > now:
+            return next_time, 0
+        missed = int((now - scheduled) // self.seconds)
+        return scheduled + (missed + 1) * self.seconds, missed
+
+    def describe(self) -> str:
+        return f"每{self.seconds:g}秒"
+
+class DailyTrigger:
+    """
+    每天固定时刻触发，时刻格式为 "HH:MM" 或 "HH:MM:SS"（本地时间）
+    """
+
+    def __init__(self, at: str):
+        parts = [int(part) for part in at.split(':')]
+        if len(parts) == 2:
+            parts.append(0)
+        if len(parts) != 3 or not (0 <= parts[0] < 24 and 0 <= parts[1] < 60 and 0 <= parts[2] < 60):
+            raise ValueError(f"无效的时刻: {at}")
+        self.at = at
+        self.hour, self.minute, self.second = parts
+
+    def _next_from(self, timestamp: float) -> float:
+        moment = datetime.fromtimestamp(timestamp)
+        target = moment.replace(hour=self.hour, minute=self.minute, second=self.second, microsecond=0)
+        if target.timestamp() <= timestamp:
+            target += timedelta(days=1)
+        return target.timestamp()
+
+    def first(self, now: float) -> float:
+        return self._next_from(now)
+
+    def next_after(self, scheduled: float, now: float):
+        next_time = self._next_from(scheduled)
+        missed = 0
+        while next_time <= now:
+            missed += 1
+            next_time = self._next_from(next_time)
+        return next_time, missed
+
+    def describe(self) -> str:
+        return f"每天{self.at}"
+
+class JobStats:
+    __slots__ = ('starts', 'runs', 'failures', 'skipped_overlap', 'coalesced',
+                 'last_latency', 'max_latency', 'total_latency',
+                 'last_lag', 'max_lag', 'total_lag', 'last_error')
+
+    def __init__(self):
+        self.starts = 0
+        self.runs = 0
+        self.failures = 0
+        self.skipped_overlap = 0
+        self.coalesced = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self.last_error: Optional[str] = None
+
+    def record_lag(self, lag: float):
+        self.starts += 1
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.total_lag += lag
+
+    def record_run(self, latency: float, error: Optional[BaseException]):
+        self.runs += 1
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self.total_latency += latency
+        if error is not None:
+            self.failures += 1
+            self.last_error = str(error)
+
+    def to_dict(self) -> Dict:
+        return {
+            'runs': self.runs,
+            'failures': self.failures,
+            'skipped_overlap': self.skipped_overlap,
+            'coalesced': self.coalesced,
+            'last_latency': round(self.last_latency, 3),
+            'avg_latency': round(self.total_latency / self.runs, 3) if self.runs else 0.0,
+            'max_latency': round(self.max_latency, 3),
+            'last_lag': round(self.last_lag, 3),
+            'avg_lag': round(self.total_lag / self.starts, 3) if self.starts else 0.0,
+            'max_lag': round(self.max_lag, 3),
+            'last_error': self.last_error
+        }
+
+class Job:
+    def __init__(self, name: str, trigger, func: Callable, args: tuple, kwargs: dict, jitter: float):
+        self.name = name
+        self.trigger = trigger
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.jitter = jitter
+        self.stats = JobStats()
+        self.running = False
+        # 不含抖动的计划时间，抖动不会累积到后续的计划中
+        self.scheduled = 0.0
+        self.due = 0.0
+
+    def plan(self, scheduled: float):
+        self.scheduled = scheduled
+        self.due = scheduled + (random.uniform(0, self.jitter) if self.jitter > 0 else 0.0)
+
+    def advance(self, now: float):
+        next_time, missed = self.trigger.next_after(self.scheduled, now)
+        if missed:
+            self.stats.coalesced += missed
+            logging.warning(f"任务 {self.name} 错过了 {missed} 次运行，已合并为一次")
+        self.plan(next_time)
+
+    async def invoke(self):
+        if inspect.iscoroutinefunction(self.func):
+            return await self.func(*self.args, **self.kwargs)
+        return await asyncio.to_thread(self.func, *self.args, **self.kwargs)
+
+class AsyncScheduler:
+    def __init__(self, max_concurrency: int = 4, default_jitter: float = 0.0):
+        """
+        :param max_concurrency: 同时运行的任务数上限
+        :param default_jitter: 默认随机抖动（秒），在计划时间之后随机推迟 [0, jitter] 秒
+        """
+        self.max_concurrency = max_concurrency
+        self.default_jitter = default_jitter
+        self.jobs: List[Job] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks = set()
+        self._stopping = False
+
+    def add_job(self, trigger, func: Callable, *args, name: Optional[str] = None,
+                jitter: Optional[float] = None, run_immediately: bool = False, **kwargs) -> Job:
+        """
+        添加任务，func 可以是普通函数（在线程池中运行）或协程函数
+        :param run_immediately: 是否在调度器启动时立即运行一次
+        """
+        job = Job(
+            name=name or getattr(func, '__name__', 'job'),
+            trigger=trigger,
+            func=func,
+            args=args,
+            kwargs=kwargs,
+            jitter=self.default_jitter if jitter is None else jitter
+        )
+        now = time.time()
+        job.plan(now if run_immediately else trigger.first(now))
+        self.jobs.append(job)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    def every(self, seconds: float, func: Callable, *args, **kwargs) -> Job:
+        return self.add_job(IntervalTrigger(seconds), func, *args, **kwargs)
+
+    def daily_at(self, at: str, func: Callable, *args, **kwargs) -> Job:
+        return self.add_job(DailyTrigger(at), func, *args, **kwargs)
+
+    async def run(self):
+        """
+        运行调度循环，直到调用 stop()
+        """
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+        try:
+            while not self._stopping:
+                now = time.time()
+                for job in self.jobs:
+                    if job.due <= now:
+                        self._dispatch(job, now)
+
+                delay = min((job.due for job in self.jobs), default=now + 3600) - time.time()
+                if delay > 0:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            if self._tasks:
+                await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def _dispatch(self, job: Job, now: float):
+        if job.running:
+            # 上一次运行尚未结束，本次跳过
+            job.stats.skipped_overlap += 1
+            logging.warning(f"任务 {job.name} 上一次运行尚未结束，跳过本次")
+        else:
+            job.running = True
+            task = asyncio.ensure_future(self._run_job(job, job.due))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        job.advance(now)
+
+    async def _run_job(self, job: Job, due: float):
+        try:
+            async with self._semaphore:
+                started = time.time()
+                job.stats.record_lag(max(0.0, started - due))
+                error = None
+                try:
+                    await job.invoke()
+                except Exception as e:
+                    error = e
+                    logging.error(f"任务 {job.name} 运行出错: {e}")
+                job.stats.record_run(time.time() - started, error)
+        finally:
+            job.running = False
+
+    def stop(self):
+        """
+        停止调度循环，已经开始的任务会运行完毕
+        """
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        每个任务的运行统计：耗时（latency）为任务本身的执行时间，
+        延迟（lag）为实际开始时间与计划时间（含抖动）之差，包含等待并发名额的时间
+        """
+        return {job.name: dict(job.stats.to_dict(), trigger=job.trigger.describe(),
+                               next_run=datetime.fromtimestamp(job.due).strftime('%Y-%m-%d %H:%M:%S'))
+                for job in self.jobs}
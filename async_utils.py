@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+异步辅助函数
+在同步代码中运行协程，供各获取器的同步接口共用
+"""
+
+import asyncio
+import threading
+
+def run_sync(coro):
+    """
+    在同步代码中运行协程
+    如果当前线程已有运行中的事件循环，则在独立线程中执行
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result = {}
+
+    def runner():
+        try:
+            result['value'] = asyncio.run(coro)
+        except BaseException as e:
+            result['error'] = e
+
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+    if 'error' in result:
+        raise result['error']
+    return result['value']
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+批量并发获取工具
+在有上限的线程池中执行单条获取函数，合并重复的键，结果按完成顺序逐条产出
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, Optional, Tuple
+
+# (键, 结果, 错误信息)：成功时错误信息为None，失败时结果为None
+BatchItem = Tuple[Hashable, Any, Optional[str]]
+
+def iter_batch(
+    fetch_one: Callable[[Hashable], Any],
+    keys: Iterable[Hashable],
+    concurrency: int = 8,
+    normalize: Callable[[Hashable], Hashable] = lambda key: key
+) -> Iterator[BatchItem]:
+    """
+    并发执行fetch_one，按完成顺序产出结果
+    同时在途的请求数不超过concurrency，输入可以是惰性迭代器
+    :param fetch_one: 获取单条数据的函数，失败时抛出异常
+    :param keys: 要获取的键，重复的键只请求一次
+    :param normalize: 去重前对键做归一化
+    """
+    concurrency = max(1, concurrency)
+    seen = set()
+    unique_keys = (key for key in map(normalize, keys) if not (key in seen or seen.add(key)))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = {}
+
+        def fill():
+            for key in unique_keys:
+                pending[executor.submit(fetch_one, key)] = key
+                if len(pending) >= concurrency:
+                    return
+
+        fill()
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                try:
+                    yield key, future.result(), None
+                except Exception as e:
+                    yield key, None, str(e)
+            fill()
+
+def collect_batch(items: Iterable[BatchItem]) -> Dict[str, Dict]:
+    """
+    把逐条结果汇总为 {'results': {键: 结果}, 'errors': {键: 错误信息}}
+    """
+    results = {}
+    errors = {}
+    for key, value, error in items:
+        if error is None:
+            results[key] = value
+        else:
+            errors[key] = error
+    return {'results': results, 'errors': errors}
+
+def normalize_post_id(post_id: Hashable) -> str:
+    return str(post_id).strip()
+
+def iter_post_details(
+    fetch_detail: Callable[[str], Any],
+    post_ids: Iterable,
+    concurrency: int = 8
+) -> Iterator[BatchItem]:
+    """
+    并发获取多个帖子详情，按完成顺序逐条产出 (帖子ID, 帖子, 错误信息)
+    重复的ID只请求一次，单个帖子失败不影响其他帖子
+    :param fetch_detail: 获取单个帖子详情的函数，失败时抛出异常
+    :param concurrency: 最大并发请求数
+    """
+    return iter_batch(fetch_detail, post_ids, concurrency=concurrency, normalize=normalize_post_id)
+
+def get_post_details(fetch_detail: Callable[[str], Any], post_ids: Iterable, concurrency: int = 8) -> Dict[str, Dict]:
+    """
+    批量获取帖子详情
+    :return: {'results': {帖子ID: 帖子}, 'errors': {帖子ID: 错误信息}}
+    """
+    return collect_batch(iter_post_details(fetch_detail, post_ids, concurrency=concurrency))
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+获取器离线吞吐基准测试
+启动本地替身服务器（见 standin_server.py），把各获取器指向它，并发执行请求，
+输出每个场景的 请求/秒、p50/p99 延迟和失败数，并与保存的基线比较；出现性能回退时以非零状态退出
+
+用法:
+    python benchmarks/bench_fetchers.py [--requests 200] [--concurrency 8] [--scenarios tavily,enhanced.hot]
+    python benchmarks/bench_fetchers.py --throttle-rate 0.05 --error-rate 0.02      # 注入限流和错误（基线中有该配置）
+    python benchmarks/bench_fetchers.py --mode replay --fixtures 目录                 # 回放录制的真实响应
+    python benchmarks/bench_fetchers.py --mode record --requests 5 --concurrency 1  # 通过代理录制真实响应
+    python benchmarks/bench_fetchers.py --update-baseline                            # 以本次结果更新该配置的基线
+
+基线文件按运行配置（故障、模式、请求数、并发、限流）分别保存，只与配置相同的基线比较
+录制模式会访问真实服务：凭证取自环境变量 XUEQIU_U / XUEQIU_TOKEN / TAVILY_API_KEY，不会写入录制文件
+"""
+
+import argparse
+import atexit
+import contextlib
+import io
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from standin_server import add_server_args, restore_env, server_from_args, use_standin
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baselines', 'fetchers.json')
+
+class NullSink:
+    """
+    丢弃推送消息，只测量抓取与处理
+    """
+
+    def send(self, messages: List[str]):
+        pass
+
+def _credentials(record: bool) -> Dict[str, str]:
+    if record:
+        return {
+            'u': os.environ.get('XUEQIU_U', ''),
+            'xq_a_token': os.environ.get('XUEQIU_TOKEN', ''),
+            'tavily': os.environ.get('TAVILY_API_KEY', '')
+        }
+    return {'u': '1000001', 'xq_a_token': 'standin-token', 'tavily': 'standin-key'}
+
+def build_scenarios(record: bool) -> Dict[str, Callable[[], Callable[[int], bool]]]:
+    """
+    场景名 -> 初始化函数；初始化函数返回单次操作 op(i) -> 是否成功
+    每次操作使用不同的参数，避免被请求合并或缓存吸收
+    """
+    creds = _credentials(record)
+    cookies = {'u': creds['u'], 'xq_a_token': creds['xq_a_token']}
+
+    def tavily():
+        from tavily_search_tool import TavilySearchTool
+        tool = TavilySearchTool(api_key=creds['tavily'])
+        return lambda i: 'error' not in tool.search(f"基准查询{i}")
+
+    def scraper_search():
+        from xueqiu_scraper import XueqiuScraper
+        scraper = XueqiuScraper(cookies=cookies)
+        return lambda i: bool(scraper.search_topics(f"关键词{i}", count=20))
+
+    def scraper_user():
+        from xueqiu_scraper import XueqiuScraper
+        scraper = XueqiuScraper(cookies=cookies)
+        return lambda i: bool(scraper.get_user_posts(str(2000000 + i), count=20))
+
+    def enhanced_hot():
+        from enhanced_xueqiu_fetcher import EnhancedXueqiuFetcher
+        fetcher = EnhancedXueqiuFetcher(cookies['u'], cookies['xq_a_token'])
+        return lambda i: bool(fetcher.get_hot_topics(count=10 + i % 40))
+
+    def enhanced_detail():
+        from enhanced_xueqiu_fetcher import EnhancedXueqiuFetcher
+        fetcher = EnhancedXueqiuFetcher(cookies['u'], cookies['xq_a_token'])
+        return lambda i: fetcher.get_post_detail(str(300000000 + i)) is not None
+
+    def comprehensive():
+        from comprehensive_xueqiu_solution import ComprehensiveXueqiuSolution
+        from near_duplicate import NearDuplicateIndex
+
+        def op(i):
+            # 每次操作使用独立身份，避免并发调用被合并；近似重复窗口为0，不跨调用去重
+            solution = ComprehensiveXueqiuSolution(
+                f"{cookies['u']}{i}", cookies['xq_a_token'], creds['tavily'],
+                near_duplicates=NearDuplicateIndex(path=':memory:', window=0)
+            )
+            return bool(solution.try_direct_access())
+        return op
+
+    def scheduler():
+        from social_post_scheduler import SocialPostScheduler
+        from push_delivery import DeliveryPipeline
+        from near_duplicate import NearDuplicateIndex
+        os.environ.setdefault('TAVILY_API_KEY', creds['tavily'])
+        instance = SocialPostScheduler(
+            delivery=DeliveryPipeline(NullSink(), flush_interval=0.05),
+            near_duplicates=NearDuplicateIndex(path=':memory:', window=0)
+        )
+
+        # 获取失败或没有消息加入推送队列都计为失败
+        return lambda i: instance.fetch_and_push_posts('xueqiu', f"关键词{i}")
+
+    return {
+        'tavily.search': tavily,
+        'scraper.search': scraper_search,
+        'scraper.user_timeline': scraper_user,
+        'enhanced.hot': enhanced_hot,
+        'enhanced.detail': enhanced_detail,
+        'comprehensive.direct': comprehensive,
+        'scheduler.fetch_and_push': scheduler
+    }
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def run_scenario(op: Callable[[int], bool], requests: int, concurrency: int, warmup: int) -> Dict:
+    for i in range(warmup):
+        op(-1 - i)
+
+    def timed(i):
+        started = time.perf_counter()
+        try:
+            ok = op(i)
+        except Exception:
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(timed, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(seconds for seconds, _ in samples)
+    return {
+        'requests': requests,
+        'errors': sum(1 for _, ok in samples if not ok),
+        'rps': round(requests / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2)
+    }
+
+def load_baselines(path: str) -> List[Dict]:
+    """
+    读取基线文件：[{'profile': 运行配置, 'scenarios': {场景名: 结果}}, ...]
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)['profiles']
+    except FileNotFoundError:
+        return []
+
+def find_baseline(baselines: List[Dict], profile: Dict) -> Optional[Dict]:
+    for baseline in baselines:
+        if baseline['profile'] == profile:
+            return baseline
+    return None
+
+def compare(results: Dict, baseline: Dict, tolerance: float, p99_tolerance: float, slack_ms: float) -> List[str]:
+    """
+    与基线比较：吞吐下降超过tolerance，或p99上升超过p99_tolerance加固定毫秒余量即视为回退
+    （p99只由最慢的几个样本决定，抖动较大，容差更宽）
+    """
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get('scenarios', {}).get(name)
+        if base is None:
+            continue
+        if current['rps'] < base['rps'] * (1 - tolerance):
+            regressions.append(f"{name}: 吞吐 {current['rps']} < 基线 {base['rps']}")
+        if current['p99_ms'] > base['p99_ms'] * (1 + p99_tolerance) + slack_ms:
+            regressions.append(f"{name}: p99 {current['p99_ms']} ms > 基线 {base['p99_ms']} ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='获取器离线吞吐基准测试')
+    parser.add_argument('--requests', type=int, default=200, help='每个场景的请求数')
+    parser.add_argument('--concurrency', type=int, default=8, help='并发数')
+    parser.add_argument('--warmup', type=int, default=3, help='每个场景正式计时前的预热次数')
+    parser.add_argument('--scenarios', help='只运行这些场景（逗号分隔），默认全部')
+    parser.add_argument('--production-limits', action='store_true',
+                        help='对替身服务器使用雪球的生产限流配置，默认不限流以测量客户端开销')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='基线文件')
+    parser.add_argument('--update-baseline', action='store_true', help='以本次结果更新与本次运行配置相同的基线')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='吞吐允许的相对下降幅度')
+    parser.add_argument('--p99-tolerance', type=float, default=1.0, help='p99允许的相对上升幅度')
+    parser.add_argument('--slack-ms', type=float, default=10.0, help='p99比较的固定余量（毫秒）')
+    add_server_args(parser)
+    args = parser.parse_args()
+
+    record = args.mode == 'record'
+    scenarios = build_scenarios(record)
+    selected = args.scenarios.split(',') if args.scenarios else list(scenarios)
+    unknown = [name for name in selected if name not in scenarios]
+    if unknown:
+        print(f"❌ 未知场景: {', '.join(unknown)}（可选: {', '.join(scenarios)}）")
+        return 1
+
+    # 索引、归档、缓存等状态写入临时目录，不影响本机的真实数据
+    cache_dir = tempfile.mkdtemp(prefix='openclaw-bench-')
+    os.environ['OPENCLAW_CACHE_DIR'] = cache_dir
+    # 先注册的退出函数最后执行，保证默认索引和归档的退出写入完成后再删除
+    atexit.register(shutil.rmtree, cache_dir, True)
+
+    server = server_from_args(args).start()
+    previous = use_standin(server)
+
+    from rate_limiter import HOST_LIMITS, configure_host
+    host = server.base_url.split('//', 1)[1].rsplit(':', 1)[0]
+    if args.production_limits:
+        configure_host(host, *HOST_LIMITS['xueqiu.com'])
+    else:
+        configure_host(host, 1e6, 1000000)
+
+    print(f"替身服务器: {server.base_url}（{args.mode}模式）, 故障配置: {server.faults.to_dict()}")
+    print(f"每个场景 {args.requests} 次请求, 并发 {args.concurrency}\n")
+
+    results = {}
+    try:
+        for name in selected:
+            # 获取器会打印大量过程信息和日志，计时期间屏蔽
+            logging.disable(logging.CRITICAL)
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    op = scenarios[name]()
+                    stats = run_scenario(op, args.requests, args.concurrency, args.warmup)
+            finally:
+                logging.disable(logging.NOTSET)
+            results[name] = stats
+            print(f"{name:>26}: {stats['rps']:>9.1f} 请求/秒  p50 {stats['p50_ms']:>8.2f} ms  "
+                  f"p99 {stats['p99_ms']:>8.2f} ms  失败 {stats['errors']}/{stats['requests']}")
+    finally:
+        restore_env(previous)
+        server.stop()
+
+    print(f"\n服务器统计: {server.stats()}")
+    if record:
+        print(f"已录制到: {args.fixtures}")
+        return 0
+
+    profile = {
+        'faults': server.faults.to_dict(),
+        'mode': args.mode,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'production_limits': args.production_limits
+    }
+    baselines = load_baselines(args.baseline)
+    baseline = find_baseline(baselines, profile)
+    if args.update_baseline:
+        if baseline is None:
+            baseline = {'profile': profile, 'scenarios': {}}
+            baselines.append(baseline)
+        baseline['scenarios'].update(results)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'profiles': baselines}, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"✅ 基线已更新: {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print("💡 没有与本次运行配置相同的基线，可使用 --update-baseline 保存本次结果")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance, args.p99_tolerance, args.slack_ms)
+    if regressions:
+        for regression in regressions:
+            print(f"❌ 性能回退 {regression}")
+        return 1
+    print("✅ 与基线相比没有性能回退")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+命令行冷启动基准测试
+在全新的解释器进程中测量导入 openclaw 并构建参数解析器的耗时，以及 `openclaw.py --help` 的整体耗时；
+超过预算，或启动阶段加载了任何后端模块时以非零状态退出。
+同时列出各子命令后端的导入耗时，供参考
+
+用法: python benchmarks/bench_import_time.py [--budget-ms 50] [--process-budget-ms 200] [--repeat 7]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, 'openclaw.py')
+
+# 启动阶段不应加载的后端模块
+HEAVY_MODULES = ('requests', 'urllib3', 'playwright', 'bs4', 'numpy', 'sqlite3', 'asyncio')
+
+# 子命令 -> 执行时导入的后端模块
+BACKENDS = {
+    'search --local': 'post_index',
+    'search': 'post_fetcher',
+    'fetch-hot': 'enhanced_xueqiu_fetcher',
+    'fetch-user': 'xueqiu_scraper',
+    'browser-scrape': 'xueqiu_browser_automation',
+    'schedule': 'social_post_scheduler'
+}
+
+_PROBE = """
+import sys, time, json
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{'seconds': elapsed, 'modules': sorted(sys.modules)}}))
+"""
+
+def probe(statement: str) -> Optional[Dict]:
+    """
+    在全新的解释器中执行语句并返回耗时和已加载的模块，执行失败时返回None
+    """
+    result = subprocess.run(
+        [sys.executable, '-c', _PROBE.format(statement=statement)],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def median_ms(samples: List[float]) -> float:
+    return statistics.median(samples) * 1000
+
+def measure_process(repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, CLI, '--help'], cwd=ROOT, capture_output=True, check=True)
+        samples.append(time.perf_counter() - started)
+    return median_ms(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description='命令行冷启动基准测试')
+    parser.add_argument('--budget-ms', type=float, default=50, help='导入openclaw并构建解析器的耗时预算（毫秒）')
+    parser.add_argument('--process-budget-ms', type=float, default=200,
+                        help='`openclaw.py --help` 整个进程的耗时预算（毫秒，含解释器启动）')
+    parser.add_argument('--repeat', type=int, default=7, help='每项测量重复次数，取中位数')
+    parser.add_argument('--skip-backends', action='store_true', help='不测量各子命令后端的导入耗时')
+    args = parser.parse_args()
+
+    failures = []
+
+    samples = []
+    loaded = set()
+    for _ in range(args.repeat):
+        result = probe('import openclaw; openclaw.build_parser()')
+        if result is None:
+            print("❌ 导入openclaw失败")
+            return 1
+        samples.append(result['seconds'])
+        loaded.update(name for name in HEAVY_MODULES if name in result['modules'])
+
+    import_ms = median_ms(samples)
+    print(f"导入openclaw并构建解析器: {import_ms:.1f} ms（预算 {args.budget_ms:.0f} ms）")
+    if import_ms > args.budget_ms:
+        failures.append(f"导入耗时 {import_ms:.1f} ms 超出预算 {args.budget_ms:.0f} ms")
+    if loaded:
+        failures.append(f"启动阶段加载了后端模块: {', '.join(sorted(loaded))}")
+
+    process_ms = measure_process(args.repeat)
+    print(f"openclaw.py --help 进程总耗时: {process_ms:.1f} ms（预算 {args.process_budget_ms:.0f} ms）")
+    if process_ms > args.process_budget_ms:
+        failures.append(f"进程耗时 {process_ms:.1f} ms 超出预算 {args.process_budget_ms:.0f} ms")
+
+    if not args.skip_backends:
+        print("\n各子命令后端导入耗时（执行子命令时才会支付）:")
+        for command, module in BACKENDS.items():
+            result = probe(f'import {module}')
+            if result is None:
+                print(f"  {command:>15}: {module} 导入失败（依赖未安装）")
+            else:
+                print(f"  {command:>15}: {result['seconds'] * 1000:>8.1f} ms  ({module})")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print("\n✅ 冷启动在预算内")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
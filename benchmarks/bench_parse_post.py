@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+帖子文本解析基准测试
+对比旧版多正则解析与单遍解析器，输出每秒处理条数和内存分配情况；
+两者结果不一致时以非零状态退出
+
+用法: python benchmarks/bench_parse_post.py [--repeat 200] [--corpus 路径]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from feed_text_parser import parse_feed_text
+
+DEFAULT_CORPUS = os.path.join(ROOT, 'benchmarks', 'data', 'feed_items.json')
+
+def legacy_parse_post(full_text: str) -> Dict:
+    """
+    原 XueqiuBrowserAutomation._parse_post 实现，作为对照组保留
+    """
+    lines = full_text.split('\n')
+    lines = [line.strip() for line in lines if line.strip()]
+
+    post = {
+        'title': '无标题',
+        'author': '未知作者',
+        'content': '',
+        'time_info': '',
+        'interactions': ''
+    }
+
+    author_patterns = [
+        r'.*?修改于.*',
+        r'.*?·\s*来自.*',
+        r'.*?\d{1,2}:\d{2}.*',
+        r'.*?\d{1,2}-\d{1,2}.*'
+    ]
+
+    content_lines = []
+    author_line = ''
+
+    for line in lines:
+        is_author = False
+        for pattern in author_patterns:
+            if re.search(pattern, line):
+                author_line = line
+                is_author = True
+                break
+
+        if not is_author and len(line) > 20:
+            content_lines.append(line)
+
+    if author_line:
+        post['author'] = author_line
+
+    if content_lines:
+        post['content'] = ' '.join(content_lines[:5])
+
+    for line in lines:
+        if 10 < len(line) < 100 and not re.search(r'·\s*来自|修改于|\d{1,2}:\d{2}', line):
+            post['title'] = line
+            break
+
+    if len(post['content']) > 500:
+        post['content'] = post['content'][:500] + '...'
+
+    return post
+
+def load_corpus(path: str) -> List[str]:
+    with open(path, 'r', encoding='utf-8') as f:
+        items = json.load(f)
+    return [item for item in items if isinstance(item, str)]
+
+def check_equivalence(corpus: List[str]) -> List[int]:
+    """
+    返回两种实现结果不一致的条目下标
+    """
+    return [i for i, text in enumerate(corpus) if legacy_parse_post(text) != parse_feed_text(text)]
+
+def measure(parse: Callable[[str], Dict], corpus: List[str], repeat: int) -> Dict:
+    """
+    测量吞吐量和内存分配
+    """
+    total = len(corpus) * repeat
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in corpus:
+            parse(text)
+    elapsed = time.perf_counter() - started
+
+    # 分配统计单独跑一轮，避免tracemalloc拖慢吞吐量测量
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for text in corpus:
+        parse(text)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename') if stat.size_diff > 0)
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+
+    return {
+        'items': total,
+        'seconds': elapsed,
+        'items_per_sec': total / elapsed if elapsed else float('inf'),
+        'peak_kb': peak / 1024,
+        'retained_kb_per_pass': allocated / 1024,
+        'retained_blocks_per_pass': blocks
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='帖子文本解析基准测试')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='帖子文本语料（JSON字符串数组）')
+    parser.add_argument('--repeat', type=int, default=200, help='语料重复次数')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print(f"❌ 语料为空: {args.corpus}")
+        return 1
+
+    mismatches = check_equivalence(corpus)
+    if mismatches:
+        print(f"❌ 解析结果与旧实现不一致，条目: {mismatches}")
+        return 1
+
+    print(f"语料: {len(corpus)} 条, 重复 {args.repeat} 次")
+    results = {}
+    for name, parse in (('legacy', legacy_parse_post), ('single_pass', parse_feed_text)):
+        results[name] = stats = measure(parse, corpus, args.repeat)
+        print(f"{name:>12}: {stats['items_per_sec']:>10.0f} 条/秒  "
+              f"峰值 {stats['peak_kb']:.1f} KB  "
+              f"每轮新增分配 {stats['retained_blocks_per_pass']} 块")
+
+    speedup = results['single_pass']['items_per_sec'] / results['legacy']['items_per_sec']
+    print(f"加速比: {speedup:.2f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+帖子热度排序基准测试
+生成大批候选帖子，对比“全部格式化后再排序”与“先计算热度选出前k个再格式化”两种方式的耗时；
+两者选出的帖子不一致时以非零状态退出
+
+用法: python benchmarks/bench_rank_posts.py [--candidates 50000] [--top 10] [--seed 42]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import post_ranking
+from post_model import Post
+from post_ranking import hotness_scores, rank_posts
+from enhanced_xueqiu_fetcher import EnhancedXueqiuFetcher
+
+def make_posts(count: int, now: float, seed: int) -> List[Post]:
+    rng = random.Random(seed)
+    posts = []
+    for i in range(count):
+        posts.append(Post(
+            id=i,
+            author=f"用户{i % 997}",
+            author_id=100000 + i % 997,
+            title=f"候选帖子{i}",
+            text=f"第{i}条候选帖子的正文内容，" * 4,
+            created_at=int((now - rng.uniform(0, 72 * 3600)) * 1000) if i % 20 else None,
+            like_count=int(rng.paretovariate(1.2)) - 1,
+            comment_count=int(rng.paretovariate(1.5)) - 1,
+            retweet_count=int(rng.paretovariate(1.8)) - 1,
+            url=f"https://xueqiu.com/{100000 + i % 997}/{i}",
+            method='benchmark'
+        ))
+    return posts
+
+def format_all_then_sort(fetcher, posts: List[Post], k: int, now: float) -> List[str]:
+    """
+    对照组：先格式化全部候选，再按热度排序取前k个
+    """
+    scores = hotness_scores(posts, now=now)
+    formatted = [(scores[i], -i, fetcher.format_post(post)) for i, post in enumerate(posts)]
+    formatted.sort(reverse=True)
+    return [text for _, _, text in formatted[:k]]
+
+def rank_then_format(fetcher, posts: List[Post], k: int, now: float) -> List[str]:
+    return [fetcher.format_post(post) for post in rank_posts(posts, k, now=now)]
+
+def main():
+    parser = argparse.ArgumentParser(description='帖子热度排序基准测试')
+    parser.add_argument('--candidates', type=int, default=50000, help='候选帖子数')
+    parser.add_argument('--top', type=int, default=10, help='选出的帖子数')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    args = parser.parse_args()
+
+    now = time.time()
+    posts = make_posts(args.candidates, now, args.seed)
+    fetcher = EnhancedXueqiuFetcher.__new__(EnhancedXueqiuFetcher)
+
+    print(f"候选: {len(posts)} 条, 取前 {args.top} 个, "
+          f"实现: {'numpy' if post_ranking.np is not None else '纯Python'}")
+    results = {}
+    for name, run in (('format_all', format_all_then_sort), ('rank_first', rank_then_format)):
+        start = time.perf_counter()
+        results[name] = run(fetcher, posts, args.top, now)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>12}: {elapsed * 1000:>9.1f} ms  {len(posts) / elapsed:>12.0f} 条/秒")
+
+    if results['format_all'] != results['rank_first']:
+        print("❌ 两种方式选出的帖子不一致")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+时间线响应解码基准测试
+构造一个大的时间线响应，对比“整体解码后取前N个”与“流式解码前N个即停止”的耗时、内存峰值和读取字节数；
+两者结果不一致时以非零状态退出
+
+用法: python benchmarks/bench_stream_decode.py [--statuses 2000] [--limit 5] [--chunk-size 65536] [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, Iterator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from post_model import extract_statuses, loads
+from json_stream import stream_statuses
+
+def make_body(count: int) -> bytes:
+    statuses = []
+    for i in range(count):
+        statuses.append({
+            'id': 300000000 + i,
+            'user_id': 100000 + i % 997,
+            'title': f"候选帖子{i}",
+            'text': f"<p>第{i}条帖子的正文内容，包含$贵州茅台(SH600519)$等股票标记。</p>" * 8,
+            'description': f"第{i}条帖子的摘要",
+            'created_at': 1700000000000 + i * 1000,
+            'like_count': i % 300,
+            'reply_count': i % 50,
+            'retweet_count': i % 20,
+            'target': f"/{100000 + i % 997}/{300000000 + i}",
+            'user': {'id': 100000 + i % 997, 'screen_name': f"用户{i % 997}", 'description': '个人简介' * 10},
+            'tags': [{'tag': '白酒'}, {'tag': '消费'}]
+        })
+    return json.dumps({'count': count, 'statuses': statuses, 'maxPage': 100}, ensure_ascii=False).encode('utf-8')
+
+class CountingChunks:
+    """
+    模拟按块到达的响应体，统计实际读取的字节数
+    """
+
+    def __init__(self, body: bytes, chunk_size: int):
+        self.body = body
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        for start in range(0, len(self.body), self.chunk_size):
+            chunk = self.body[start:start + self.chunk_size]
+            self.bytes_read += len(chunk)
+            yield chunk
+
+def full_decode(body: bytes, limit: int, chunk_size: int):
+    # 整体解码必须先读完整个响应体
+    chunks = CountingChunks(body, chunk_size)
+    return extract_statuses(loads(b''.join(chunks)))[:limit], chunks.bytes_read
+
+def streaming_decode(body: bytes, limit: int, chunk_size: int):
+    chunks = CountingChunks(body, chunk_size)
+    return stream_statuses(chunks, limit=limit), chunks.bytes_read
+
+def measure(decode, body: bytes, limit: int, chunk_size: int, repeat: int) -> Dict:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        decode(body, limit, chunk_size)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    _, bytes_read = decode(body, limit, chunk_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'ms': elapsed * 1000, 'peak_kb': peak / 1024, 'bytes_read': bytes_read}
+
+def main():
+    parser = argparse.ArgumentParser(description='时间线响应解码基准测试')
+    parser.add_argument('--statuses', type=int, default=2000, help='响应中的帖子数')
+    parser.add_argument('--limit', type=int, default=5, help='实际需要的帖子数')
+    parser.add_argument('--chunk-size', type=int, default=64 * 1024, help='响应块大小（字节）')
+    parser.add_argument('--repeat', type=int, default=20, help='计时重复次数')
+    args = parser.parse_args()
+
+    body = make_body(args.statuses)
+    expected, _ = full_decode(body, args.limit, args.chunk_size)
+    actual, _ = streaming_decode(body, args.limit, args.chunk_size)
+    if expected != actual:
+        print("❌ 流式解码结果与整体解码不一致")
+        return 1
+
+    backend = 'orjson' if 'orjson' in sys.modules else 'msgspec' if 'msgspec' in sys.modules else 'json'
+    print(f"响应: {len(body) / 1024:.0f} KB, {args.statuses} 个帖子, 取前 {args.limit} 个, 解码器: {backend}")
+    for name, decode in (('full', full_decode), ('streaming', streaming_decode)):
+        stats = measure(decode, body, args.limit, args.chunk_size, args.repeat)
+        print(f"{name:>10}: {stats['ms']:>8.2f} ms  峰值 {stats['peak_kb']:>9.1f} KB  "
+              f"读取 {stats['bytes_read'] / 1024:>8.0f} KB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
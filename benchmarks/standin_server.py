@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+雪球/Tavily本地替身服务器
+在本机端口上模拟 api.tavily.com/search 和雪球的帖子接口，可配置延迟、错误率和429限流，
+用于离线基准测试和回归测试；获取器通过环境变量 OPENCLAW_XUEQIU_BASE_URL / OPENCLAW_TAVILY_URL 指向它
+
+三种模式:
+    generate  按请求参数确定性地生成响应（默认）
+    replay    优先返回录制的响应，没有录制时退回生成
+    record    作为代理转发到真实服务，并把响应保存为录制文件（不注入故障）
+
+单独运行: python benchmarks/standin_server.py [--port 8765] [--latency-ms 10] [--mode replay --fixtures 目录]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+UPSTREAM_XUEQIU = 'https://xueqiu.com'
+UPSTREAM_TAVILY = 'https://api.tavily.com'
+
+TAVILY_PATH = '/search'
+
+# 不参与录制键计算的参数：防缓存时间戳和API密钥
+IGNORED_PARAMS = ('t', '_', 'api_key')
+
+MODES = ('generate', 'replay', 'record')
+
+class FaultProfile:
+    def __init__(self, latency_ms: float = 10.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: float = 0.05, seed: int = 42):
+        """
+        :param latency_ms: 每个响应的基础延迟（毫秒）
+        :param jitter_ms: 在基础延迟上叠加的随机延迟上限（毫秒）
+        :param error_rate: 返回500的概率
+        :param throttle_rate: 返回429的概率
+        :param retry_after: 429响应的Retry-After（秒）
+        :param seed: 随机种子，相同配置下故障序列可复现
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> Tuple[float, Optional[int]]:
+        """
+        抽取本次请求的延迟（秒）和注入的状态码（None表示正常响应）
+        """
+        with self._lock:
+            delay = (self.latency_ms + self._random.uniform(0, self.jitter_ms)) / 1000
+            roll = self._random.random()
+        if roll < self.throttle_rate:
+            return delay, 429
+        if roll < self.throttle_rate + self.error_rate:
+            return delay, 500
+        return delay, None
+
+    def to_dict(self) -> Dict:
+        return {
+            'latency_ms': self.latency_ms,
+            'jitter_ms': self.jitter_ms,
+            'error_rate': self.error_rate,
+            'throttle_rate': self.throttle_rate,
+            'retry_after': self.retry_after,
+            'seed': self.seed
+        }
+
+def fixture_key(method: str, path: str, query: Dict, body: Optional[Dict] = None) -> str:
+    """
+    录制键：方法、路径、排序后的参数和请求体，去掉时间戳和API密钥
+    """
+    params = sorted((k, str(v)) for k, v in query.items() if k not in IGNORED_PARAMS)
+    payload = sorted((k, json.dumps(v, ensure_ascii=False, sort_keys=True))
+                     for k, v in (body or {}).items() if k not in IGNORED_PARAMS)
+    raw = json.dumps([method.upper(), path, params, payload], ensure_ascii=False)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+class FixtureStore:
+    """
+    录制的响应，每条保存为目录下的一个JSON文件（不含请求中的cookie和API密钥）
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, entry: Dict):
+        with self._lock:
+            tmp_path = self._path(key) + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self._path(key))
+
+    def __len__(self) -> int:
+        return sum(1 for name in os.listdir(self.directory) if name.endswith('.json'))
+
+def _seed_for(*parts) -> int:
+    return int.from_bytes(hashlib.blake2b('|'.join(map(str, parts)).encode('utf-8'), digest_size=6).digest(), 'little')
+
+def make_status(status_id: int, created_at: int) -> Dict:
+    """
+    生成一条结构与雪球接口一致的帖子
+    """
+    rng = random.Random(status_id)
+    user_id = 1000000 + status_id % 9973
+    return {
+        'id': status_id,
+        'user_id': user_id,
+        'title': f"替身帖子{status_id}",
+        'text': f"<p>第{status_id}号帖子的正文，讨论$贵州茅台(SH600519)$的估值与第{rng.randint(1, 99)}季度业绩。</p>",
+        'description': f"第{status_id}号帖子的摘要",
+        'created_at': created_at,
+        'like_count': rng.randint(0, 500),
+        'reply_count': rng.randint(0, 80),
+        'retweet_count': rng.randint(0, 30),
+        'target': f"/{user_id}/{status_id}",
+        'user': {'id': user_id, 'screen_name': f"替身用户{user_id}"},
+        'tags': [{'tag': '白酒'}]
+    }
+
+def make_timeline(path: str, query: Dict, max_pages: int = 5) -> Dict:
+    """
+    按路径和参数生成一页时间线，帖子ID和发布时间按页递减，同一请求结果确定
+    """
+    page = int(query.get('page') or 1)
+    size = int(query.get('size') or query.get('count') or 10)
+    scope = {k: v for k, v in query.items() if k not in IGNORED_PARAMS + ('page',)}
+    base_id = 100000000 + _seed_for(path, sorted(scope.items())) % 100000000
+    now_ms = int(time.time() // 60 * 60000)
+
+    statuses = []
+    for i in range(size):
+        offset = (page - 1) * size + i
+        statuses.append(make_status(base_id - offset, now_ms - offset * 60000))
+
+    if path.endswith('public_timeline_by_category.json'):
+        # 该接口把status序列化为字符串放在data字段中
+        return {'list': [{'id': s['id'], 'data': json.dumps(s, ensure_ascii=False)} for s in statuses],
+                'next_max_id': statuses[-1]['id'] if statuses else -1}
+    return {'statuses': statuses, 'count': size, 'page': page, 'maxPage': max_pages}
+
+def make_tavily_result(body: Dict) -> Dict:
+    query = body.get('query', '')
+    rng = random.Random(_seed_for('tavily', query))
+    count = int(body.get('max_results') or 5)
+    results = []
+    for i in range(count):
+        results.append({
+            'title': f"{query} 相关结果{i + 1}",
+            'url': f"https://xueqiu.com/{rng.randint(1000000, 9999999)}/{rng.randint(100000000, 999999999)}",
+            'content': f"关于“{query}”的第{i + 1}条内容摘要，包含若干讨论和观点。" * 3,
+            'score': round(rng.random(), 4)
+        })
+    return {
+        'query': query,
+        'answer': f"关于“{query}”的替身摘要" if body.get('include_answer') else None,
+        'results': results,
+        'response_time': 0.01
+    }
+
+def generate_response(method: str, path: str, query: Dict, body: Optional[Dict]) -> Tuple[int, str, bytes]:
+    """
+    生成响应 (状态码, Content-Type, 响应体)
+    """
+    if method == 'POST' and path == TAVILY_PATH:
+        payload = make_tavily_result(body or {})
+    elif path == '/':
+        return 200, 'text/html; charset=utf-8', '<html><body>雪球替身首页</body></html>'.encode('utf-8')
+    elif path.endswith('/statuses/original/show.json'):
+        status_id = int(query.get('id') or 1)
+        payload = make_status(status_id, int(time.time() * 1000))
+    elif path.endswith('.json'):
+        payload = make_timeline(path, query)
+    else:
+        return 404, 'application/json', b'{"error_description":"not found"}'
+    return 200, 'application/json; charset=utf-8', json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    """
+    客户端断开连接（连接池丢弃、重试时关闭响应）属于正常情况，不打印异常
+    """
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+class StandInServer:
+    def __init__(self, faults: Optional[FaultProfile] = None, mode: str = 'generate',
+                 fixtures: Optional[FixtureStore] = None, host: str = '127.0.0.1', port: int = 0):
+        """
+        :param faults: 故障配置，不提供则只有默认延迟
+        :param mode: generate / replay / record
+        :param fixtures: 录制文件目录，replay/record模式必须提供
+        :param port: 监听端口，0表示自动分配
+        """
+        if mode not in MODES:
+            raise ValueError(f"未知模式: {mode}")
+        if mode != 'generate' and fixtures is None:
+            raise ValueError(f"{mode} 模式需要提供录制目录")
+
+        self.faults = faults or FaultProfile()
+        self.mode = mode
+        self.fixtures = fixtures
+        self.counts = {'requests': 0, 'generated': 0, 'replayed': 0, 'recorded': 0, 'errors': 0, 'throttled': 0}
+        self._counts_lock = threading.Lock()
+        self._upstream = None
+        self._httpd = _QuietHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def tavily_url(self) -> str:
+        return self.base_url + TAVILY_PATH
+
+    def _count(self, name: str):
+        with self._counts_lock:
+            self.counts[name] += 1
+
+    def start(self) -> 'StandInServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='standin-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> Dict:
+        with self._counts_lock:
+            return dict(self.counts)
+
+    def _forward(self, method: str, path: str, raw_query: str, headers: Dict, body: bytes) -> Tuple[int, str, bytes]:
+        """
+        录制模式：转发到真实服务
+        """
+        if self._upstream is None:
+            from http_transport import create_session
+            self._upstream = create_session()
+        upstream = UPSTREAM_TAVILY if path == TAVILY_PATH else UPSTREAM_XUEQIU
+        url = upstream + path + (f"?{raw_query}" if raw_query else '')
+        forward_headers = {k: v for k, v in headers.items()
+                           if k.lower() in ('cookie', 'content-type', 'referer', 'x-requested-with', 'accept')}
+        response = self._upstream.request(method, url, headers=forward_headers, data=body or None, timeout=15)
+        return response.status_code, response.headers.get('Content-Type', 'application/json'), response.content
+
+    def respond(self, method: str, path: str, raw_query: str, headers: Dict, body: bytes) -> Tuple[int, Dict, bytes]:
+        """
+        处理一个请求，返回 (状态码, 响应头, 响应体)
+        """
+        self._count('requests')
+        query = dict(parse_qsl(raw_query, keep_blank_values=True))
+        try:
+            json_body = json.loads(body) if body else None
+        except ValueError:
+            json_body = None
+        key = fixture_key(method, path, query, json_body if isinstance(json_body, dict) else None)
+
+        if self.mode == 'record':
+            status, content_type, data = self._forward(method, path, raw_query, headers, body)
+            if status == 200:
+                self.fixtures.put(key, {
+                    'method': method, 'path': path,
+                    'query': {k: v for k, v in query.items() if k not in IGNORED_PARAMS},
+                    'status': status, 'content_type': content_type, 'body': data.decode('utf-8', 'replace')
+                })
+                self._count('recorded')
+            return status, {'Content-Type': content_type}, data
+
+        delay, injected = self.faults.draw()
+        if delay > 0:
+            time.sleep(delay)
+        if injected == 429:
+            self._count('throttled')
+            return 429, {'Content-Type': 'application/json', 'Retry-After': str(self.faults.retry_after)}, \
+                b'{"error_description":"too many requests"}'
+        if injected == 500:
+            self._count('errors')
+            return 500, {'Content-Type': 'application/json'}, b'{"error_description":"internal error"}'
+
+        entry = self.fixtures.get(key) if self.mode == 'replay' else None
+        if entry is not None:
+            self._count('replayed')
+            return entry['status'], {'Content-Type': entry['content_type']}, entry['body'].encode('utf-8')
+
+        self._count('generated')
+        status, content_type, data = generate_response(method, path, query, json_body)
+        return status, {'Content-Type': content_type}, data
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # 响应头和响应体分两次写出，关闭Nagle算法避免与延迟确认叠加出约40ms的额外延迟
+            disable_nagle_algorithm = True
+
+            def _handle(self):
+                parts = urlsplit(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                try:
+                    status, headers, data = server.respond(self.command, parts.path, parts.query,
+                                                           dict(self.headers), body)
+                except Exception as e:
+                    status, headers, data = 502, {'Content-Type': 'text/plain; charset=utf-8'}, str(e).encode('utf-8')
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = _handle
+            do_POST = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+def use_standin(server: StandInServer) -> Dict[str, Optional[str]]:
+    """
+    把获取器指向替身服务器，返回原有的环境变量以便恢复
+    """
+    previous = {name: os.environ.get(name) for name in ('OPENCLAW_XUEQIU_BASE_URL', 'OPENCLAW_TAVILY_URL')}
+    os.environ['OPENCLAW_XUEQIU_BASE_URL'] = server.base_url
+    os.environ['OPENCLAW_TAVILY_URL'] = server.tavily_url
+    return previous
+
+def restore_env(previous: Dict[str, Optional[str]]):
+    for name, value in previous.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+def add_server_args(parser: argparse.ArgumentParser):
+    parser.add_argument('--latency-ms', type=float, default=10.0, help='响应基础延迟（毫秒）')
+    parser.add_argument('--jitter-ms', type=float, default=5.0, help='随机叠加的延迟上限（毫秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回500的概率')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='返回429的概率')
+    parser.add_argument('--retry-after', type=float, default=0.05, help='429响应的Retry-After（秒）')
+    parser.add_argument('--seed', type=int, default=42, help='故障注入的随机种子')
+    parser.add_argument('--mode', choices=MODES, default='generate', help='响应来源')
+    parser.add_argument('--fixtures', default=os.path.join(ROOT, 'benchmarks', 'fixtures'),
+                        help='录制文件目录（replay/record模式）')
+
+def server_from_args(args, port: int = 0) -> StandInServer:
+    faults = FaultProfile(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                          throttle_rate=args.throttle_rate, retry_after=args.retry_after, seed=args.seed)
+    fixtures = FixtureStore(args.fixtures) if args.mode != 'generate' else None
+    return StandInServer(faults=faults, mode=args.mode, fixtures=fixtures, port=port)
+
+def main():
+    parser = argparse.ArgumentParser(description='雪球/Tavily本地替身服务器')
+    parser.add_argument('--port', type=int, default=8765, help='监听端口')
+    add_server_args(parser)
+    args = parser.parse_args()
+
+    server = server_from_args(args, port=args.port)
+    print(f"🚀 替身服务器已启动（{args.mode}模式）: {server.base_url}")
+    print(f"   export OPENCLAW_XUEQIU_BASE_URL={server.base_url}")
+    print(f"   export OPENCLAW_TAVILY_URL={server.tavily_url}")
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"\n📊 请求统计: {server.stats()}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+浏览器快速导航
+拦截图片、媒体、字体和第三方统计请求，并以"首个帖子元素出现或网络空闲"代替固定等待
+"""
+
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+# 默认拦截的资源类型
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font'})
+
+# 默认拦截的第三方统计/追踪域名
+TRACKER_HOSTS = (
+    'hm.baidu.com',
+    'google-analytics.com',
+    'googletagmanager.com',
+    'cnzz.com',
+    'growingio.com',
+    'sensorsdata.cn',
+    'doubleclick.net'
+)
+
+def _host_matches(host: str, patterns: Iterable[str]) -> bool:
+    return any(host == pattern or host.endswith('.' + pattern) for pattern in patterns)
+
+def should_block(url: str, resource_type: str, allowlist: Iterable[str] = (),
+                 block_types: Iterable[str] = BLOCKED_RESOURCE_TYPES) -> bool:
+    """
+    判断请求是否应被拦截
+    :param allowlist: 放行的域名或URL片段，优先于拦截规则
+    """
+    if any(pattern in url for pattern in allowlist):
+        return False
+    if resource_type in block_types:
+        return True
+    host = (urlsplit(url).hostname or '').lower()
+    return _host_matches(host, TRACKER_HOSTS)
+
+async def install_resource_blocking(target, allowlist: Optional[List[str]] = None,
+                                    block_types: Iterable[str] = BLOCKED_RESOURCE_TYPES) -> Dict:
+    """
+    在页面或上下文上安装请求拦截
+    :param target: Playwright的Page或BrowserContext
+    :return: 拦截统计 {'blocked': n, 'allowed': n}，随请求实时更新
+    """
+    allowlist = list(allowlist or [])
+    block_types = frozenset(block_types)
+    stats = {'blocked': 0, 'allowed': 0}
+
+    async def handle(route):
+        request = route.request
+        if should_block(request.url, request.resource_type, allowlist, block_types):
+            stats['blocked'] += 1
+            await route.abort()
+        else:
+            stats['allowed'] += 1
+            await route.continue_()
+
+    await target.route('**/*', handle)
+    return stats
+
+def resource_blocker(allowlist: Optional[List[str]] = None, block_types: Iterable[str] = BLOCKED_RESOURCE_TYPES):
+    """
+    返回可用作 BrowserPool(context_setup=...) 的初始化函数，让池中每个上下文都启用拦截
+    """
+    async def setup(context):
+        await install_resource_blocking(context, allowlist=allowlist, block_types=block_types)
+    return setup
+
+async def navigate_fast(page, url: str, ready_selectors: Iterable[str], timeout_ms: int = 15000) -> Dict:
+    """
+    导航到页面并等待帖子就绪：首个帖子元素出现或网络空闲，以先到者为准
+    :return: 各阶段耗时（毫秒）及就绪方式
+    """
+    timings = {}
+    started = time.monotonic()
+
+    await page.goto(url, timeout=timeout_ms, wait_until='domcontentloaded')
+    timings['goto_ms'] = (time.monotonic() - started) * 1000
+
+    ready_started = time.monotonic()
+    remaining = max(1000, timeout_ms - int(timings['goto_ms']))
+    waiters = {
+        asyncio.ensure_future(page.wait_for_selector(', '.join(ready_selectors), state='attached', timeout=remaining)): 'selector',
+        asyncio.ensure_future(page.wait_for_load_state('networkidle', timeout=remaining)): 'networkidle'
+    }
+    ready_by = 'timeout'
+    pending = set(waiters)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            succeeded = [task for task in done if task.exception() is None]
+            if succeeded:
+                ready_by = waiters[succeeded[0]]
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+
+    timings['ready_ms'] = (time.monotonic() - ready_started) * 1000
+    timings['ready_by'] = ready_by
+    return timings
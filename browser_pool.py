@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+常驻浏览器池
+基于async Playwright，启动一次浏览器并预先登录若干上下文，调用方按需租用页面；
+上下文在使用N次或内存增长过多后回收重建，避免每次抓取都重新启动浏览器
+"""
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from http_transport import USER_AGENT
+
+LAUNCH_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage'
+]
+
+def xueqiu_cookies(u_value: str, xq_a_token: str) -> List[Dict]:
+    """
+    雪球登录所需的cookies
+    """
+    return [
+        {'name': 'u', 'value': u_value, 'domain': '.xueqiu.com', 'path': '/'},
+        {'name': 'xq_a_token', 'value': xq_a_token, 'domain': '.xueqiu.com', 'path': '/'}
+    ]
+
+class _ContextSlot:
+    __slots__ = ('context', 'uses', 'recycle')
+
+    def __init__(self, context):
+        self.context = context
+        self.uses = 0
+        self.recycle = False
+
+class BrowserPool:
+    def __init__(
+        self,
+        u_value: str,
+        xq_a_token: str,
+        size: int = 2,
+        max_uses: int = 50,
+        max_heap_mb: float = 300,
+        headless: bool = True,
+        context_setup: Optional[Callable[[Any], Awaitable[None]]] = None
+    ):
+        """
+        :param u_value: 雪球用户ID (u cookie)
+        :param xq_a_token: 雪球认证令牌 (xq_a_token cookie)
+        :param size: 上下文数量，即可同时租出的页面数
+        :param max_uses: 每个上下文最多租用的次数，超过后回收重建
+        :param max_heap_mb: 页面JS堆超过该值（MB）时回收所在的上下文
+        :param context_setup: 每个新上下文创建后执行的异步初始化（如路由拦截）
+        """
+        self.u_value = u_value
+        self.xq_a_token = xq_a_token
+        self.size = size
+        self.max_uses = max_uses
+        self.max_heap_mb = max_heap_mb
+        self.headless = headless
+        self.context_setup = context_setup
+
+        self.recycled = 0
+        self._playwright = None
+        self._browser = None
+        self._slots: Optional[asyncio.Queue] = None
+        self._closed = False
+
+    async def start(self):
+        """
+        启动浏览器并创建预先登录的上下文
+        """
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+        self._slots = asyncio.Queue()
+        for _ in range(self.size):
+            self._slots.put_nowait(_ContextSlot(await self._new_context()))
+        return self
+
+    async def _new_context(self):
+        context = await self._browser.new_context(user_agent=USER_AGENT)
+        await context.add_cookies(xueqiu_cookies(self.u_value, self.xq_a_token))
+        if self.context_setup is not None:
+            await self.context_setup(context)
+        return context
+
+    @asynccontextmanager
+    async def _lease_slot(self):
+        if self._slots is None:
+            raise RuntimeError("浏览器池尚未启动")
+        if self._closed:
+            raise RuntimeError("浏览器池已关闭")
+
+        slot = await self._slots.get()
+        if slot.context is None:
+            # 上次回收时重建失败的槽位，租用时再创建
+            try:
+                slot.context = await self._new_context()
+            except Exception:
+                self._slots.put_nowait(slot)
+                raise
+        try:
+            yield slot
+        except Exception:
+            # 出错的上下文状态不可信，直接重建
+            slot.recycle = True
+            raise
+        finally:
+            slot.uses += 1
+            await self._release(slot)
+
+    @asynccontextmanager
+    async def lease_context(self):
+        """
+        租用一个已登录的上下文，可在其中同时打开多个页面
+        """
+        async with self._lease_slot() as slot:
+            yield slot.context
+
+    @asynccontextmanager
+    async def lease(self):
+        """
+        租用一个页面，用完后自动关闭；池中没有空闲上下文时等待
+        """
+        async with self._lease_slot() as slot:
+            page = await slot.context.new_page()
+            try:
+                yield page
+            finally:
+                if await self._heap_mb(page) > self.max_heap_mb:
+                    slot.recycle = True
+                await page.close()
+
+    async def _heap_mb(self, page) -> float:
+        try:
+            used = await page.evaluate('performance.memory ? performance.memory.usedJSHeapSize : 0')
+            return used / (1024 * 1024)
+        except Exception:
+            return 0.0
+
+    async def _release(self, slot: _ContextSlot):
+        if self._closed:
+            if slot.context is not None:
+                await slot.context.close()
+            return
+
+        if slot.recycle or slot.uses >= self.max_uses:
+            self.recycled += 1
+            try:
+                await slot.context.close()
+            except Exception:
+                pass
+            slot = _ContextSlot(None)
+            try:
+                slot.context = await self._new_context()
+            except Exception as e:
+                # 重建失败也要放回槽位，否则池会逐渐变小，最终lease()永远等待
+                print(f"⚠️ 重建浏览器上下文失败，将在下次租用时重试: {e}")
+        self._slots.put_nowait(slot)
+
+    async def close(self):
+        """
+        关闭所有上下文和浏览器
+        """
+        self._closed = True
+        if self._slots is not None:
+            while not self._slots.empty():
+                slot = self._slots.get_nowait()
+                if slot.context is None:
+                    continue
+                try:
+                    await slot.context.close()
+                except Exception:
+                    pass
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+class BackgroundBrowserPool:
+    """
+    在后台线程的事件循环中运行BrowserPool，供同步代码（如调度器）复用常驻浏览器
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self.pool = BrowserPool(*args, **kwargs)
+        self._submit(self.pool.start())
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def call(self, fn: Callable[[BrowserPool], Awaitable[Any]]) -> Any:
+        """
+        在池所在的事件循环中执行 fn(pool) 并等待结果
+        """
+        return self._submit(fn(self.pool))
+
+    def close(self):
+        self._submit(self.pool.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
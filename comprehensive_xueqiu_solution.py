@@ -4,43 +4,87 @@
 结合API搜索和备用方案来获取高质量内容
 """
 
-import requests
-import json
 import time
 import os
-from typing import List, Dict, Optional
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Optional, Tuple
+from tavily_search_tool import AsyncTavilySearchTool
+from tavily_cache import get_default_cache
+from http_transport import create_xueqiu_session, xueqiu_url
+from post_model import Post
+from json_stream import stream_statuses
+from single_flight import get_default_flight
+from near_duplicate import NearDuplicateIndex, post_text
+from post_index import PostIndex, get_default_index
+from post_archive import PostArchive, get_default_archive
 
 class ComprehensiveXueqiuSolution:
-    def __init__(self, u_value: str, xq_a_token: str, tavily_api_key: str):
+    # 尝试获取内容的多个API端点（相对雪球服务地址的路径）
+    DIRECT_ENDPOINTS = [
+        ('/v4/statuses/public_timeline_by_category.json', {'category': '6', 'page': '1'}),
+        ('/statuses/hot_timeline.json', {'page': '1', 'size': '10'}),
+        ('/trends/statuses.json', {'since_id': '-1', 'max_id': '-1', 'count': '10'})
+    ]
+    
+    # 直接访问最多返回的帖子数，响应按流式解码，读够即停止下载
+    DIRECT_POST_LIMIT = 5
+    
+    # 对冲请求配置：样本不足时的默认延迟（秒）、延迟统计窗口
+    DEFAULT_HEDGE_DELAY = 2.0
+    MIN_LATENCY_SAMPLES = 5
+    LATENCY_WINDOW = 50
+    
+    def __init__(self, u_value: str, xq_a_token: str, tavily_api_key: str,
+                 near_duplicates: Optional[NearDuplicateIndex] = None, post_index: Optional[PostIndex] = None,
+                 archive: Optional[PostArchive] = None):
+        """
+        :param near_duplicates: 近似重复索引，不提供则使用默认状态文件，跨运行丢弃最近返回过的相似内容
+        :param post_index: 本地全文索引，获取到的帖子自动写入，不提供则在首次写入时使用默认索引
+        :param archive: 列式归档，获取到的帖子自动追加，不提供则在首次写入时使用默认归档
+        """
         self.u_value = u_value
         self.xq_a_token = xq_a_token
         self.tavily_api_key = tavily_api_key
         
-        # 初始化会话
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Referer': 'https://xueqiu.com/',
-            'Accept': 'application/json, text/plain, */*',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'X-Requested-With': 'XMLHttpRequest'
-        })
-        
-        # 设置登录凭证
-        self.session.cookies.update({
+        # 初始化会话（共享连接池）并设置登录凭证
+        self.session = create_xueqiu_session(cookies={
             'u': self.u_value,
             'xq_a_token': self.xq_a_token
         })
+        
+        # 各端点的历史响应耗时
+        self._endpoint_latencies = {}
+        self._latency_lock = threading.Lock()
+        
+        # 同一账号并发的直接访问只发一轮请求
+        self.flight = get_default_flight()
+        self.near_duplicates = near_duplicates if near_duplicates is not None else NearDuplicateIndex()
+        self.post_index = post_index
+        self.archive = archive
+    
+    def _direct_endpoints(self) -> List[Tuple[str, Dict]]:
+        return [(xueqiu_url(path), params) for path, params in self.DIRECT_ENDPOINTS]
     
-    def try_direct_access(self) -> List[Dict]:
+    def try_direct_access(self, race: bool = False, hedge: bool = False) -> List[Post]:
         """
         尝试直接访问雪球API
+        :param race: 是否并发请求所有端点，取最先返回有效帖子的结果
+        :param hedge: 竞速模式下，端点超过其p95延迟仍未返回时再发一个重复请求
         """
+        key = ('xueqiu:direct', self.u_value)
+        return list(self.flight.do(key, self._direct_access, race, hedge))
+    
+    def _direct_access(self, race: bool, hedge: bool) -> List[Post]:
+        if race:
+            return self._race_direct_access(hedge=hedge)
+        
         print("🔍 尝试直接访问雪球API...")
         
         try:
             # 先访问主页建立会话
-            home_response = self.session.get('https://xueqiu.com/', timeout=10)
+            home_response = self.session.get(xueqiu_url('/'), timeout=10)
             
             if home_response.status_code == 200:
                 print("✅ 成功访问主页")
@@ -48,37 +92,22 @@ class ComprehensiveXueqiuSolution:
                 print(f"❌ 主页访问失败: {home_response.status_code}")
                 return []
             
-            # 尝试获取内容的多个API端点
-            endpoints = [
-                ('https://xueqiu.com/v4/statuses/public_timeline_by_category.json', {'category': '6', 'page': '1'}),
-                ('https://xueqiu.com/statuses/hot_timeline.json', {'page': '1', 'size': '10'}),
-                ('https://xueqiu.com/trends/statuses.json', {'since_id': '-1', 'max_id': '-1', 'count': '10'})
-            ]
-            
-            for url, params in endpoints:
+            for url, params in self._direct_endpoints():
                 try:
-                    response = self.session.get(url, params=params, timeout=10)
+                    response = self.session.get(url, params=params, timeout=10, stream=True)
                     if response.status_code == 200:
                         print(f"✅ 从 {url} 获取到数据")
                         try:
-                            data = response.json()
-                            
-                            # 根据不同API返回格式提取帖子
-                            posts = []
-                            if 'statuses' in data:
-                                posts = data['statuses']
-                            elif 'list' in data:
-                                posts = data['list']
-                            elif isinstance(data, list):
-                                posts = data
+                            posts = stream_statuses(response, limit=self.DIRECT_POST_LIMIT)
                             
                             if posts:
                                 print(f"   - 解析到 {len(posts)} 个帖子")
-                                return self._format_posts(posts[:5])  # 返回前5个
+                                return self._format_posts(posts)
                             
-                        except json.JSONDecodeError:
+                        except ValueError:
                             print(f"   - 响应不是JSON格式")
                     else:
+                        response.close()
                         print(f"   - {url} 返回状态码: {response.status_code}")
                 except Exception as e:
                     print(f"   - 访问 {url} 时出错: {e}")
@@ -91,7 +120,116 @@ class ComprehensiveXueqiuSolution:
             print(f"❌ 直接访问时出错: {e}")
             return []
     
-    def search_via_tavily(self) -> List[Dict]:
+    def _fetch_endpoint(self, url: str, params: Dict, cancelled: threading.Event) -> List:
+        """
+        请求单个端点并解析帖子列表，失败或无数据时抛出异常
+        """
+        if cancelled.is_set():
+            raise RuntimeError("已取消")
+        
+        started = time.monotonic()
+        response = self.session.get(url, params=params, timeout=10, stream=True)
+        try:
+            if cancelled.is_set():
+                raise RuntimeError("已取消")
+            if response.status_code != 200:
+                raise RuntimeError(f"返回状态码: {response.status_code}")
+            posts = stream_statuses(response, limit=self.DIRECT_POST_LIMIT)
+        finally:
+            response.close()
+        
+        self._record_latency(url, time.monotonic() - started)
+        if not posts:
+            raise RuntimeError("未解析到帖子")
+        return posts
+    
+    def _get_post_index(self) -> PostIndex:
+        if self.post_index is None:
+            self.post_index = get_default_index()
+        return self.post_index
+
+    def _get_archive(self) -> PostArchive:
+        if self.archive is None:
+            self.archive = get_default_archive()
+        return self.archive
+
+    def _record_latency(self, url: str, seconds: float):
+        """
+        记录端点的成功响应耗时，用于计算对冲延迟
+        """
+        with self._latency_lock:
+            samples = self._endpoint_latencies.setdefault(url, deque(maxlen=self.LATENCY_WINDOW))
+            samples.append(seconds)
+    
+    def _hedge_delay(self, url: str) -> float:
+        """
+        根据端点历史耗时的p95计算对冲延迟，样本不足时使用默认值
+        """
+        with self._latency_lock:
+            samples = sorted(self._endpoint_latencies.get(url, ()))
+        if len(samples) < self.MIN_LATENCY_SAMPLES:
+            return self.DEFAULT_HEDGE_DELAY
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    
+    def _race_direct_access(self, hedge: bool = False) -> List[Post]:
+        """
+        并发请求所有端点，返回最先解析出非空帖子列表的结果，并取消其余请求
+        """
+        print("🔍 竞速访问雪球API端点...")
+        
+        cancelled = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=len(self.DIRECT_ENDPOINTS) * 2 + 1)
+        try:
+            # 主页仅用于补充会话cookie，不阻塞端点请求
+            executor.submit(self.session.get, xueqiu_url('/'), timeout=10)
+            
+            started = time.monotonic()
+            pending = {}
+            hedge_at = {}
+            endpoints = self._direct_endpoints()
+            for url, params in endpoints:
+                future = executor.submit(self._fetch_endpoint, url, params, cancelled)
+                pending[future] = url
+                if hedge:
+                    hedge_at[url] = started + self._hedge_delay(url)
+            
+            while pending:
+                now = time.monotonic()
+                timeout = None
+                if hedge_at:
+                    timeout = max(0.0, min(hedge_at.values()) - now)
+                
+                done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    url = pending.pop(future)
+                    try:
+                        posts = future.result()
+                    except Exception as e:
+                        print(f"   - 访问 {url} 时出错: {e}")
+                        continue
+                    
+                    cancelled.set()
+                    print(f"✅ 从 {url} 获取到数据（{time.monotonic() - started:.2f}s）")
+                    print(f"   - 解析到 {len(posts)} 个帖子")
+                    return self._format_posts(posts)
+                
+                # 到达对冲时间且仍未返回的端点，再发送一个重复请求
+                now = time.monotonic()
+                for url in [u for u, at in hedge_at.items() if at <= now]:
+                    del hedge_at[url]
+                    if url in pending.values():
+                        params = dict(endpoints)[url]
+                        print(f"   - {url} 超过对冲延迟，发送重复请求")
+                        pending[executor.submit(self._fetch_endpoint, url, params, cancelled)] = url
+            
+            print("❌ 所有API端点都无法获取有效数据")
+            return []
+        finally:
+            cancelled.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def search_via_tavily(self) -> List[Post]:
         """
         通过Tavily API搜索雪球相关内容
         """
@@ -109,103 +247,71 @@ class ComprehensiveXueqiuSolution:
         
         for query in queries:
             print(f"   - 搜索: {query}")
+        
+        # 并发发出所有查询，整体耗时约等于一次往返
+        tool = AsyncTavilySearchTool(api_key=self.tavily_api_key, cache=get_default_cache(), flight=self.flight)
+        results = tool.search_many_sync(
+            queries,
+            concurrency=len(queries),
+            search_depth='advanced',
+            max_results=3
+        )
+        
+        for query, result in zip(queries, results):
+            if 'error' in result:
+                print(f"   - Tavily搜索出错: {result['error']}")
+                continue
             
-            url = 'https://api.tavily.com/search'
-            data = {
-                'api_key': self.tavily_api_key,
-                'query': query,
-                'search_depth': 'advanced',
-                'include_answer': True,
-                'include_sources': True,
-                'max_results': 3
-            }
+            if result.get('answer'):
+                all_results.append(Post.from_tavily_answer(query, result['answer']))
             
-            try:
-                response = requests.post(url, json=data, timeout=15)
-                if response.status_code == 200:
-                    result = response.json()
-                    
-                    if result.get('answer'):
-                        # 创建模拟帖子结构
-                        post = {
-                            'title': f"Tavily搜索: {query}",
-                            'content': result['answer'],
-                            'author': 'Tavily搜索结果',
-                            'time': 'N/A',
-                            'likes': 0,
-                            'comments': 0,
-                            'shares': 0,
-                            'url': 'N/A',
-                            'method': 'tavily_search'
-                        }
-                        all_results.append(post)
-                    
-                    # 添加来源
-                    sources = result.get('sources', [])
-                    for source in sources[:2]:  # 每个查询最多2个来源
-                        post = {
-                            'title': source.get('title', '无标题'),
-                            'content': source.get('content', '无内容')[:500],
-                            'author': 'Tavily来源',
-                            'time': 'N/A',
-                            'likes': 0,
-                            'comments': 0,
-                            'shares': 0,
-                            'url': source.get('url', 'N/A'),
-                            'method': 'tavily_source'
-                        }
-                        all_results.append(post)
-                
-                time.sleep(1)  # 避免请求过于频繁
-                
-            except Exception as e:
-                print(f"   - Tavily搜索出错: {e}")
-                continue
+            # 添加来源
+            sources = result.get('sources', [])
+            for source in sources[:2]:  # 每个查询最多2个来源
+                all_results.append(Post.from_tavily_source(source))
         
         print(f"✅ 通过Tavily获取到 {len(all_results)} 个结果")
         return all_results
     
-    def _format_posts(self, raw_posts: List) -> List[Dict]:
+    def _format_posts(self, raw_posts: List) -> List[Post]:
         """
         格式化原始帖子数据
         """
-        formatted_posts = []
-        
-        for post in raw_posts:
-            if isinstance(post, dict):
-                # 处理不同API返回的格式
-                formatted = {
-                    'title': post.get('title', post.get('description', '无标题')),
-                    'content': post.get('text', post.get('description', '无内容')),
-                    'author': post.get('user', {}).get('screen_name', '未知作者'),
-                    'time': post.get('created_at', '未知时间'),
-                    'likes': post.get('like_count', 0),
-                    'comments': post.get('comment_count', 0),
-                    'shares': post.get('retweet_count', 0),
-                    'url': f"https://xueqiu.com{post.get('target', '')}",
-                    'method': 'direct_api'
-                }
-                formatted_posts.append(formatted)
-        
-        return formatted_posts
+        return [Post.from_status(post) for post in raw_posts if isinstance(post, dict)]
+    
+    def _drop_near_duplicates(self, posts: List[Post]) -> List[Post]:
+        """
+        丢弃彼此之间或与最近返回过的内容近似重复的帖子
+        """
+        kept = self.near_duplicates.filter_new(posts, text=post_text, label=lambda post: post.url or str(post.id or ''))
+        if len(kept) < len(posts):
+            print(f"   - 过滤掉 {len(posts) - len(kept)} 个近似重复的帖子")
+        return kept
     
-    def get_comprehensive_content(self) -> List[Dict]:
+    def get_comprehensive_content(self, race: bool = False, hedge: bool = False) -> List[Post]:
         """
         获取综合内容：优先尝试直接访问，失败则使用Tavily搜索
+        :param race: 直接访问时是否并发竞速请求各端点
+        :param hedge: 竞速模式下是否启用对冲请求
         """
         print("🚀 开始获取雪球综合内容")
         print("="*60)
         
         # 首先尝试直接访问
-        direct_posts = self.try_direct_access()
+        direct_posts = self.try_direct_access(race=race, hedge=hedge)
         
         if direct_posts:
             print(f"✅ 直接访问成功，获取到 {len(direct_posts)} 个帖子")
-            return direct_posts
+            self._get_post_index().add_posts(direct_posts, platform='xueqiu')
+            self._get_archive().append(direct_posts)
+            return self._drop_near_duplicates(direct_posts)
         else:
             print("⚠️ 直接访问失败，切换到Tavily搜索方案")
             tavily_posts = self.search_via_tavily()
-            return tavily_posts
+            # Tavily摘要没有ID和链接，索引只会收录其中的来源
+            self._get_post_index().add_posts(tavily_posts, platform='xueqiu')
+            self._get_archive().append(tavily_posts)
+            return self._drop_near_duplicates(tavily_posts)
 
 def main():
     # 从环境变量获取API密钥
@@ -222,7 +328,7 @@ def main():
     )
     
     # 获取综合内容
-    posts = solution.get_comprehensive_content()
+    posts = solution.get_comprehensive_content(race=True, hedge=True)
     
     print("\\n" + "="*60)
     print("📊 最终获取到的内容:")
@@ -230,13 +336,14 @@ def main():
     
     if posts:
         for i, post in enumerate(posts, 1):
-            print(f"\\n{i}. 📝 {post['title']}")
-            print(f"   👤 作者: {post['author']}")
-            print(f"   📅 时间: {post['time']}")
-            print(f"   📄 内容: {post['content'][:300]}{'...' if len(post['content']) > 300 else ''}")
-            print(f"   📊 互动: 👍{post['likes']} 💬{post['comments']} 🔄{post['shares']}")
-            print(f"   🔗 链接: {post['url']}")
-            print(f"   🛠️  方式: {post['method']}")
+            content = post.content or '无内容'
+            print(f"\\n{i}. 📝 {post.title or post.description[:50] or '无标题'}")
+            print(f"   👤 作者: {post.author or '未知作者'}")
+            print(f"   📅 时间: {post.display_time}")
+            print(f"   📄 内容: {content[:300]}{'...' if len(content) > 300 else ''}")
+            print(f"   📊 互动: 👍{post.like_count} 💬{post.comment_count} 🔄{post.retweet_count}")
+            print(f"   🔗 链接: {post.url}")
+            print(f"   🛠️  方式: {post.method}")
             print("-" * 50)
     else:
         print("❌ 未能获取到任何内容")
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+增量抓取状态
+为每个查询/用户保存高水位（最新帖子ID和时间），并用布隆过滤器+磁盘集合过滤已处理过的帖子
+"""
+
+import os
+import math
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_STATE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'openclaw')
+
+class BloomFilter:
+    """
+    简单的布隆过滤器，用于在查询磁盘之前快速判断"一定没见过"
+    """
+
+    def __init__(self, capacity: int = 200000, error_rate: float = 0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterator[int]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+class CrawlState:
+    def __init__(self, path: Optional[str] = None, max_seen: int = 200000):
+        """
+        初始化增量抓取状态
+        :param path: SQLite文件路径，默认位于 ~/.cache/openclaw（可用OPENCLAW_CACHE_DIR覆盖目录）
+        :param max_seen: 已处理集合最多保留的条目数，超出时删除最早的记录
+        """
+        if path is None:
+            state_dir = os.environ.get('OPENCLAW_CACHE_DIR', DEFAULT_STATE_DIR)
+            os.makedirs(state_dir, exist_ok=True)
+            path = os.path.join(state_dir, 'crawl_state.sqlite3')
+
+        self.path = path
+        self.max_seen = max_seen
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS watermarks (
+                scope TEXT PRIMARY KEY,
+                last_id INTEGER,
+                last_created_at INTEGER,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        # 旧版本建的表没有续抓游标列
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(watermarks)')}
+        for column in ('resume_id', 'resume_floor'):
+            if column not in columns:
+                self._conn.execute(f'ALTER TABLE watermarks ADD COLUMN {column} INTEGER')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS seen (
+                key TEXT PRIMARY KEY,
+                seen_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_seen_at ON seen(seen_at)')
+        self._conn.commit()
+
+        # 启动时根据磁盘集合重建布隆过滤器
+        self._bloom = BloomFilter(capacity=max(max_seen, 1000))
+        for (key,) in self._conn.execute('SELECT key FROM seen'):
+            self._bloom.add(key)
+
+    def get_watermark(self, scope: str) -> Optional[Dict]:
+        """
+        获取某个查询/用户的高水位，没有记录时返回None
+        resume_id 不为空时表示有未读完的较早帖子：ID在 (resume_floor, resume_id) 之间的帖子还没有返回过
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT last_id, last_created_at, resume_id, resume_floor FROM watermarks WHERE scope = ?', (scope,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'last_id': row[0], 'last_created_at': row[1], 'resume_id': row[2], 'resume_floor': row[3]}
+
+    def update_watermark(self, scope: str, last_id: Optional[int] = None, last_created_at: Optional[int] = None):
+        """
+        推进高水位，只会向前移动
+        """
+        current = self.get_watermark(scope) or {}
+        if current.get('last_id') is not None and last_id is not None:
+            last_id = max(last_id, current['last_id'])
+        if current.get('last_created_at') is not None and last_created_at is not None:
+            last_created_at = max(last_created_at, current['last_created_at'])
+        last_id = current.get('last_id') if last_id is None else last_id
+        last_created_at = current.get('last_created_at') if last_created_at is None else last_created_at
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO watermarks (scope, last_id, last_created_at, updated_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(scope) DO UPDATE SET last_id = excluded.last_id, '
+                'last_created_at = excluded.last_created_at, updated_at = excluded.updated_at',
+                (scope, last_id, last_created_at, time.time())
+            )
+            self._conn.commit()
+
+    def set_resume(self, scope: str, resume_id: Optional[int], resume_floor: Optional[int] = None):
+        """
+        记录（或在resume_id为None时清除）续抓游标：上一轮因条数上限提前结束，
+        ID在 (resume_floor, resume_id) 之间的较早帖子留到下一轮返回；resume_floor为None表示一直到最早的帖子
+        """
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO watermarks (scope, resume_id, resume_floor, updated_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(scope) DO UPDATE SET resume_id = excluded.resume_id, '
+                'resume_floor = excluded.resume_floor, updated_at = excluded.updated_at',
+                (scope, resume_id, None if resume_id is None else resume_floor, time.time())
+            )
+            self._conn.commit()
+
+    def is_seen(self, key: str) -> bool:
+        """
+        判断是否已处理过；布隆过滤器判定为没见过时无需查询磁盘
+        """
+        if key not in self._bloom:
+            return False
+        with self._lock:
+            row = self._conn.execute('SELECT 1 FROM seen WHERE key = ?', (key,)).fetchone()
+        return row is not None
+
+    def mark_seen(self, keys: Iterable[str]):
+        """
+        记录已处理的键
+        """
+        now = time.time()
+        rows = [(key, now) for key in keys]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany('INSERT OR REPLACE INTO seen (key, seen_at) VALUES (?, ?)', rows)
+            for key, _ in rows:
+                self._bloom.add(key)
+            self._prune()
+            self._conn.commit()
+
+    def _prune(self):
+        """
+        超出容量时删除最早的记录（布隆过滤器中残留的位只会导致多查一次磁盘）
+        """
+        (count,) = self._conn.execute('SELECT COUNT(*) FROM seen').fetchone()
+        if count > self.max_seen:
+            self._conn.execute(
+                'DELETE FROM seen WHERE key IN (SELECT key FROM seen ORDER BY seen_at ASC LIMIT ?)',
+                (count - self.max_seen,)
+            )
+
+    def filter_new(self, items: Iterable, key: Callable[[object], str], mark: bool = True) -> List:
+        """
+        过滤掉已处理过的条目
+        :param key: 从条目中提取去重键的函数
+        :param mark: 是否把新条目标记为已处理
+        """
+        fresh = []
+        fresh_keys = set()
+        for item in items:
+            item_key = key(item)
+            if item_key in fresh_keys or self.is_seen(item_key):
+                continue
+            fresh_keys.add(item_key)
+            fresh.append(item)
+        if mark:
+            self.mark_seen(fresh_keys)
+        return fresh
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def status_key(status: Dict) -> str:
+    """
+    雪球帖子的去重键
+    """
+    return f"xueqiu:{status.get('id')}"
+
+def collect_new(
+    state: CrawlState,
+    scope: str,
+    iterate: Callable[[Optional[int]], Iterable[Dict]],
+    max_posts: Optional[int] = None,
+    ordered: bool = True,
+    stop_after_seen: int = 10
+) -> List[Dict]:
+    """
+    增量抓取：只返回未处理过的帖子，并推进高水位
+    :param iterate: iterate(until_id) 返回按需翻页的帖子迭代器
+    :param ordered: 帖子是否按ID倒序返回；为True时用高水位ID截断翻页
+    :param stop_after_seen: 无序模式下，连续遇到这么多已处理帖子即视为进入已知区域，停止翻页
+    有序模式下高水位总是推进到本轮见到的最大ID，下一轮只需翻过新帖子；
+    因max_posts提前结束时记录续抓游标，之后的轮次在新帖子不足max_posts时接着返回游标以下的较早帖子
+    """
+    if not ordered:
+        return _collect_unordered(state, scope, iterate, max_posts, stop_after_seen)
+
+    watermark = state.get_watermark(scope) or {}
+    last_id = watermark.get('last_id')
+    resume_id = watermark.get('resume_id')
+    resume_floor = watermark.get('resume_floor')
+    fresh: List[Dict] = []
+    tracker = _Tracker()
+
+    # 先取高水位以上的新帖子
+    lowest, truncated = _take(state, iterate(last_id), fresh, max_posts, tracker)
+    if truncated:
+        # 本轮新帖子没取完：新的缺口在本轮最早返回的帖子与旧高水位之间，与尚未补完的旧缺口合并
+        # （合并进来的已读区间由已处理集合过滤）
+        resume_floor = resume_floor if resume_id is not None else last_id
+        resume_id = lowest
+    elif resume_id is not None and (max_posts is None or len(fresh) < max_posts):
+        # 新帖子取完后还有余量，接着补上一轮留下的较早帖子
+        older = (status for status in iterate(resume_floor)
+                 if not isinstance(status.get('id'), int) or status['id'] < resume_id)
+        lowest, truncated = _take(state, older, fresh, max_posts, tracker)
+        resume_id = lowest if truncated else None
+
+    state.mark_seen(status_key(status) for status in fresh)
+    if tracker.max_id is not None or tracker.max_created_at is not None:
+        state.update_watermark(scope, last_id=tracker.max_id, last_created_at=tracker.max_created_at)
+    if resume_id != watermark.get('resume_id') or resume_floor != watermark.get('resume_floor'):
+        state.set_resume(scope, resume_id, resume_floor)
+    return fresh
+
+class _Tracker:
+    """
+    记录本轮见到的最大帖子ID和发布时间
+    """
+
+    def __init__(self):
+        self.max_id: Optional[int] = None
+        self.max_created_at: Optional[int] = None
+
+    def observe(self, status: Dict):
+        status_id = status.get('id')
+        if isinstance(status_id, int):
+            self.max_id = status_id if self.max_id is None else max(self.max_id, status_id)
+        created_at = status.get('created_at')
+        if isinstance(created_at, (int, float)):
+            self.max_created_at = int(created_at) if self.max_created_at is None else max(self.max_created_at, int(created_at))
+
+def _take(state: CrawlState, statuses: Iterable[Dict], fresh: List[Dict], max_posts: Optional[int],
+          tracker: _Tracker):
+    """
+    把未处理过的帖子追加到fresh，达到max_posts即停止
+    :return: (本次追加的最小帖子ID, 是否因max_posts提前结束)
+    """
+    lowest = None
+    for status in statuses:
+        tracker.observe(status)
+        if state.is_seen(status_key(status)):
+            continue
+        fresh.append(status)
+        status_id = status.get('id')
+        if isinstance(status_id, int):
+            lowest = status_id if lowest is None else min(lowest, status_id)
+        if max_posts is not None and len(fresh) >= max_posts:
+            return lowest, True
+    return lowest, False
+
+def _collect_unordered(
+    state: CrawlState,
+    scope: str,
+    iterate: Callable[[Optional[int]], Iterable[Dict]],
+    max_posts: Optional[int],
+    stop_after_seen: int
+) -> List[Dict]:
+    fresh = []
+    seen_streak = 0
+    tracker = _Tracker()
+    # 只有走到已知区域或翻完所有页时才推进高水位
+    complete = True
+    for status in iterate(None):
+        tracker.observe(status)
+        if state.is_seen(status_key(status)):
+            seen_streak += 1
+            if seen_streak >= stop_after_seen:
+                break
+            continue
+
+        seen_streak = 0
+        fresh.append(status)
+        if max_posts is not None and len(fresh) >= max_posts:
+            complete = False
+            break
+
+    state.mark_seen(status_key(status) for status in fresh)
+    if complete and (tracker.max_id is not None or tracker.max_created_at is not None):
+        state.update_watermark(scope, last_id=tracker.max_id, last_created_at=tracker.max_created_at)
+    return fresh
@@ -4,60 +4,111 @@
 使用登录凭证获取完整的帖子内容
 """
 
-import requests
 import json
-import time
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from http_transport import create_xueqiu_session, xueqiu_url
+from xueqiu_pagination import PageFetcher, iter_statuses, page_cursor, cache_buster
+from crawl_state import CrawlState, collect_new
+from post_model import Post, loads
+import batch_fetch
+from single_flight import SingleFlight, get_default_flight, request_key
+from post_index import PostIndex, get_default_index
+from post_archive import PostArchive, get_default_archive
+from post_ranking import rank_posts
 
 class EnhancedXueqiuFetcher:
-    def __init__(self, u_value: str, xq_a_token: str):
+    def __init__(self, u_value: str, xq_a_token: str, crawl_state: Optional[CrawlState] = None,
+                 flight: Optional[SingleFlight] = None, post_index: Optional[PostIndex] = None,
+                 archive: Optional[PostArchive] = None):
         """
         初始化雪球获取器
         :param u_value: 雪球用户ID (u cookie)
         :param xq_a_token: 雪球认证令牌 (xq_a_token cookie)
+        :param crawl_state: 增量抓取状态，不提供则在首次增量抓取时使用默认状态文件
+        :param flight: 请求合并器，不提供则使用进程共享的合并器
+        :param post_index: 本地全文索引，获取到的帖子自动写入，不提供则在首次写入时使用默认索引
+        :param archive: 列式归档，获取到的帖子自动追加，不提供则在首次写入时使用默认归档
         """
         self.u_value = u_value
         self.xq_a_token = xq_a_token
         
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Referer': 'https://xueqiu.com/',
-            'Accept': 'application/json, text/html, */*; q=0.01',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'X-Requested-With': 'XMLHttpRequest',
-            'Connection': 'keep-alive',
-            'Sec-Fetch-Dest': 'empty',
-            'Sec-Fetch-Mode': 'cors',
-            'Sec-Fetch-Site': 'same-origin',
-        })
-        
-        # 设置登录凭证
-        self.session.cookies.update({
+        # 使用共享连接池，并设置登录凭证
+        self.session = create_xueqiu_session(cookies={
             'u': self.u_value,
             'xq_a_token': self.xq_a_token
         })
+        self.crawl_state = crawl_state
+        self.flight = flight if flight is not None else get_default_flight()
+        self.post_index = post_index
+        self.archive = archive
     
-    def get_hot_topics(self, count: int = 10) -> List[Dict]:
+    def _get(self, url: str, params: Dict):
+        """
+        发起GET请求，并发的相同请求（忽略时间戳参数）共享同一个响应
+        """
+        key = request_key('GET', url, params, identity=(self.u_value, self.xq_a_token))
+        return self.flight.do(key, self.session.get, url, params=params)
+    
+    def _get_crawl_state(self) -> CrawlState:
+        if self.crawl_state is None:
+            self.crawl_state = CrawlState()
+        return self.crawl_state
+
+    def _get_post_index(self) -> PostIndex:
+        if self.post_index is None:
+            self.post_index = get_default_index()
+        return self.post_index
+
+    def _get_archive(self) -> PostArchive:
+        if self.archive is None:
+            self.archive = get_default_archive()
+        return self.archive
+
+    def _record(self, posts: List[Post]) -> List[Post]:
+        """
+        把获取到的帖子写入本地全文索引和列式归档
+        """
+        self._get_post_index().add_posts(posts, platform='xueqiu')
+        self._get_archive().append(posts)
+        return posts
+
+    def _recorded(self, fetch_page: PageFetcher) -> PageFetcher:
+        """
+        包装翻页函数：每页的status转换为帖子后整页写入索引和归档，逐条遍历时不再逐个记录
+        """
+        def fetch(page: int) -> Tuple[List[Post], Optional[int]]:
+            statuses, next_page = fetch_page(page)
+            return self._record([Post.from_status(status) for status in statuses]), next_page
+        return fetch
+    
+    def get_hot_topics(self, count: int = 10, incremental: bool = False) -> List[Post]:
         """
         获取热门话题
+        :param incremental: 增量模式，只返回之前没有处理过的帖子（最多count个）
         """
+        if incremental:
+            # 热门列表不按ID排序，依靠已处理集合判断是否进入已知区域
+            return collect_new(
+                self._get_crawl_state(), "hot",
+                lambda until_id: self.iter_hot_topics(count=count),
+                max_posts=count, ordered=False
+            )
+        
         try:
-            url = "https://xueqiu.com/v2/statuses/mini.json"
+            url = xueqiu_url("/v2/statuses/mini.json")
             params = {
                 'page': 1,
                 'size': count,
-                't': int(time.time() * 1000)  # 添加时间戳
+                't': cache_buster()  # 添加时间戳
             }
             
-            response = self.session.get(url, params=params)
+            response = self._get(url, params)
             
             if response.status_code == 200:
                 try:
-                    data = response.json()
+                    data = loads(response.content)
                     if 'statuses' in data:
-                        return data['statuses']
+                        return self._record([Post.from_status(status) for status in data['statuses']])
                     else:
                         print(f"警告: 返回数据格式异常: {data}")
                         return []
@@ -72,26 +123,26 @@ class EnhancedXueqiuFetcher:
             print(f"获取热门话题时出错: {e}")
             return []
     
-    def search_posts(self, query: str, count: int = 10) -> List[Dict]:
+    def search_posts(self, query: str, count: int = 10) -> List[Post]:
         """
         搜索帖子
         """
         try:
-            url = "https://xueqiu.com/statuses/search.json"
+            url = xueqiu_url("/statuses/search.json")
             params = {
                 'q': query,
                 'count': count,
                 'page': 1,
-                't': int(time.time() * 1000)  # 添加时间戳
+                't': cache_buster()  # 添加时间戳
             }
             
-            response = self.session.get(url, params=params)
+            response = self._get(url, params)
             
             if response.status_code == 200:
                 try:
-                    data = response.json()
+                    data = loads(response.content)
                     if 'statuses' in data:
-                        return data['statuses']
+                        return self._record([Post.from_status(status) for status in data['statuses']])
                     else:
                         print(f"警告: 搜索返回数据格式异常: {data}")
                         return []
@@ -106,53 +157,112 @@ class EnhancedXueqiuFetcher:
             print(f"搜索帖子时出错: {e}")
             return []
     
-    def get_post_detail(self, post_id: str) -> Dict:
+    def _fetch_page(self, url: str, params: Dict, page: int) -> Tuple[List[Dict], Optional[int]]:
+        """
+        拉取一页帖子，返回 (status列表, 下一页页码)，请求失败时抛出异常
+        """
+        params = dict(params, page=page, t=cache_buster())
+        response = self._get(url, params)
+        response.raise_for_status()
+        data = loads(response.content)
+        statuses = data.get('statuses', [])
+        return statuses, page_cursor(page, data)
+    
+    def iter_hot_topics(self, count: int = 10, max_posts: Optional[int] = None, since=None,
+                        until_id: Optional[int] = None, prefetch: bool = True) -> Iterator[Post]:
         """
-        获取单个帖子的详细内容
+        逐条遍历热门帖子，按需翻页并后台预取下一页
+        :param count: 每页帖子数
+        :param max_posts: 最多返回的帖子数
+        :param since: 时间窗口起点（datetime或时间戳）
+        :param until_id: 遇到不大于该ID的帖子即停止
         """
+        fetch_page = lambda page: self._fetch_page(xueqiu_url("/v2/statuses/mini.json"), {'size': count}, page)
         try:
-            url = f"https://xueqiu.com/statuses/original/show.json"
-            params = {
-                'id': post_id,
-                't': int(time.time() * 1000)
-            }
-            
-            response = self.session.get(url, params=params)
-            
-            if response.status_code == 200:
-                try:
-                    return response.json()
-                except json.JSONDecodeError:
-                    print(f"警告: 获取帖子详情响应不是JSON格式: {response.text[:200]}...")
-                    return {}
-            else:
-                print(f"获取帖子详情失败，状态码: {response.status_code}")
-                return {}
+            for post in iter_statuses(self._recorded(fetch_page), 1, max_posts=max_posts, since=since, until_id=until_id, prefetch=prefetch):
+                yield post
+        except Exception as e:
+            print(f"热门帖子翻页失败: {e}")
+    
+    def iter_search(self, query: str, count: int = 10, max_posts: Optional[int] = None, since=None,
+                    until_id: Optional[int] = None, prefetch: bool = True) -> Iterator[Post]:
+        """
+        逐条遍历搜索结果，按需翻页并后台预取下一页
+        参数含义同 iter_hot_topics；搜索结果按相关度排序，since/until_id只过滤帖子，不会提前结束翻页
+        """
+        fetch_page = lambda page: self._fetch_page(xueqiu_url("/statuses/search.json"), {'q': query, 'count': count}, page)
+        try:
+            for post in iter_statuses(self._recorded(fetch_page), 1, max_posts=max_posts, since=since, until_id=until_id, prefetch=prefetch,
+                                        ordered=False):
+                yield post
+        except Exception as e:
+            print(f"搜索翻页失败: {e}")
+    
+    def _fetch_post_detail(self, post_id: str) -> Post:
+        """
+        请求单个帖子详情，失败时抛出异常
+        """
+        url = xueqiu_url("/statuses/original/show.json")
+        params = {
+            'id': post_id,
+            't': cache_buster()
+        }
+        
+        response = self._get(url, params)
+        if response.status_code != 200:
+            raise RuntimeError(f"状态码: {response.status_code}")
+        return self._record([Post.from_status(loads(response.content))])[0]
+    
+    def get_post_detail(self, post_id: str) -> Optional[Post]:
+        """
+        获取单个帖子的详细内容，失败时返回None
+        """
+        try:
+            return self._fetch_post_detail(post_id)
         except Exception as e:
-            print(f"获取帖子详情时出错: {e}")
-            return {}
+            print(f"获取帖子详情失败: {e}")
+            return None
+    
+    def iter_post_details(self, post_ids: Iterable, concurrency: int = 8) -> Iterator[Tuple[str, Optional[Post], Optional[str]]]:
+        """
+        并发获取多个帖子详情，按完成顺序逐条产出 (帖子ID, 帖子, 错误信息)，见 batch_fetch.iter_post_details
+        """
+        return batch_fetch.iter_post_details(self._fetch_post_detail, post_ids, concurrency=concurrency)
     
-    def format_post(self, post: Dict) -> str:
+    def get_post_details(self, post_ids: Iterable, concurrency: int = 8) -> Dict[str, Dict]:
+        """
+        批量获取帖子详情
+        :return: {'results': {帖子ID: 帖子}, 'errors': {帖子ID: 错误信息}}
+        """
+        return batch_fetch.get_post_details(self._fetch_post_detail, post_ids, concurrency=concurrency)
+    
+    def format_post(self, post: Post) -> str:
         """
         格式化帖子内容
         """
-        user_info = post.get('user', {})
+        tags = post.tags
         formatted = f"""
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-📊 帖子ID: {post.get('id', 'N/A')}
-👤 作者: {user_info.get('screen_name', '匿名用户')} (@{user_info.get('id', 'N/A')})
-📝 标题: {post.get('title', '无标题')}
-📅 发布时间: {post.get('created_at', '未知时间')}
-📈 互动数据: 👍 {post.get('like_count', 0)} | 💬 {post.get('comment_count', 0)} | 🔄 {post.get('retweet_count', 0)}
-🔗 原文链接: https://xueqiu.com{post.get('target', '')}
+📊 帖子ID: {post.id if post.id is not None else 'N/A'}
+👤 作者: {post.author or '匿名用户'} (@{post.author_id if post.author_id is not None else 'N/A'})
+📝 标题: {post.title or '无标题'}
+📅 发布时间: {post.display_time}
+📈 互动数据: 👍 {post.like_count} | 💬 {post.comment_count} | 🔄 {post.retweet_count}
+🔗 原文链接: {post.url}
 
 📝 帖子内容:
-{post.get('text', '无内容')}
+{post.text or '无内容'}
 
-🏷️ 标签: {', '.join([tag.get('tag', '') for tag in post.get('tags', [])]) if post.get('tags') else '无标签'}
+🏷️ 标签: {', '.join([tag.get('tag', '') for tag in tags]) if tags else '无标签'}
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
         """
         return formatted.strip()
+    
+    def format_top_posts(self, posts: Iterable[Post], k: int = 5) -> List[str]:
+        """
+        按热度（互动量+时间衰减）选出前k个帖子再格式化，落选的帖子不做任何字符串处理
+        """
+        return [self.format_post(post) for post in rank_posts(posts, k)]
 
 def main():
     print("🎯 增强版雪球帖子获取器")
@@ -170,13 +280,13 @@ def main():
     fetcher = EnhancedXueqiuFetcher("8603655584", "17fa2787f256c2057245b461d0c6085a10db6eef")
     
     # 获取热门话题
-    hot_posts = fetcher.get_hot_topics(count=5)
+    hot_posts = fetcher.get_hot_topics(count=50)
     
     if hot_posts:
-        print(f"\n🎉 找到 {len(hot_posts)} 个热门帖子:")
+        print(f"\n🎉 找到 {len(hot_posts)} 个热门帖子，按热度展示前5个:")
         
-        for i, post in enumerate(hot_posts, 1):
-            print(f"\n{i}. {fetcher.format_post(post)}")
+        for i, formatted in enumerate(fetcher.format_top_posts(hot_posts, k=5), 1):
+            print(f"\n{i}. {formatted}")
     else:
         print("\n❌ 未能获取到帖子内容")
         print("💡 可能的原因:")
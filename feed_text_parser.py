@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+雪球信息流文本解析器
+把页面上单个帖子元素的innerText解析为标题、作者、正文；
+所有行只扫描一次，每行用一个预编译的正则完成分类
+"""
+
+import re
+from typing import Dict
+
+# 一次匹配同时区分两类元信息：
+#   meta: "修改于"、"· 来自"、时间（10:32），这类行既是作者行也不能作为标题
+#   date: 日期（03-15），仅当该位置之后没有meta时才匹配，这类行是作者行但可以作为标题
+_LINE_CLASSIFIER = re.compile(
+    r'(?P<meta>修改于|·\s*来自|\d{1,2}:\d{2})'
+    r'|(?=\d{1,2}-\d)(?!.*(?:修改于|·\s*来自|\d{1,2}:\d{2}))(?P<date>\d{1,2}-\d{1,2})'
+)
+
+MAX_CONTENT_LINES = 5
+MAX_CONTENT_LENGTH = 500
+
+def parse_feed_text(full_text: str) -> Dict:
+    """
+    解析帖子文本内容
+    规则：最后一个含时间/日期/来源信息的行作为作者行；其余长度超过20的行作为正文（取前5行）；
+    第一个长度在10到100之间且不含时间/来源信息的行作为标题
+    """
+    search = _LINE_CLASSIFIER.search
+    author_line = ''
+    title = ''
+    content_lines = []
+
+    for raw_line in full_text.split('\n'):
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        match = search(line)
+        length = len(line)
+        if match is None:
+            if length > 20 and len(content_lines) < MAX_CONTENT_LINES:
+                content_lines.append(line)
+            if not title and 10 < length < 100:
+                title = line
+        else:
+            author_line = line
+            if not title and 10 < length < 100 and match.lastgroup == 'date':
+                title = line
+
+    content = ' '.join(content_lines)
+    if len(content) > MAX_CONTENT_LENGTH:
+        content = content[:MAX_CONTENT_LENGTH] + '...'
+
+    return {
+        'title': title or '无标题',
+        'author': author_line or '未知作者',
+        'content': content,
+        'time_info': '',
+        'interactions': ''
+    }
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+共享HTTP传输层
+所有获取器共用同一组按主机划分的连接池，保持长连接，避免每次请求都重新握手
+请求前经过按主机共享的自适应限流器
+"""
+
+import os
+import time
+import threading
+import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from typing import Dict, Optional
+from rate_limiter import get_limiter
+
+try:
+    import brotli  # noqa: F401  # 安装后urllib3会自动解码br
+    _ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    _ACCEPT_ENCODING = 'gzip, deflate'
+
+# 默认超时（秒），可在单次请求中通过timeout参数覆盖
+DEFAULT_TIMEOUT = 10
+
+# 被限流（429）后自动重试的次数
+THROTTLE_RETRIES = 2
+
+# 连接池配置：最多缓存的主机数、每个主机保持的连接数
+POOL_HOSTS = 16
+POOL_MAXSIZE = 16
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+DEFAULT_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept-Encoding': _ACCEPT_ENCODING,
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'Connection': 'keep-alive'
+}
+
+# 雪球服务地址，可用环境变量OPENCLAW_XUEQIU_BASE_URL指向本地替身服务器（离线基准测试）
+XUEQIU_BASE_URL = 'https://xueqiu.com'
+
+# 访问雪球接口时额外携带的请求头
+XUEQIU_HEADERS = {
+    'Referer': 'https://xueqiu.com/',
+    'Accept': 'application/json, text/plain, */*',
+    'X-Requested-With': 'XMLHttpRequest',
+    'Sec-Fetch-Dest': 'empty',
+    'Sec-Fetch-Mode': 'cors',
+    'Sec-Fetch-Site': 'same-origin'
+}
+
+class PooledSession(requests.Session):
+    """
+    带默认超时和限流的会话
+    未显式指定timeout时使用传输层的默认值；每个请求先从主机的令牌桶取令牌，
+    收到429时限流器降速并暂停，会话在暂停结束后自动重试
+    """
+
+    def __init__(self, default_timeout: float = DEFAULT_TIMEOUT, rate_limited: bool = True):
+        super().__init__()
+        self.default_timeout = default_timeout
+        self.rate_limited = rate_limited
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.default_timeout
+        if not self.rate_limited:
+            return super().request(method, url, **kwargs)
+
+        limiter = get_limiter(urlsplit(url).hostname or '')
+        for attempt in range(THROTTLE_RETRIES + 1):
+            limiter.acquire()
+            sent_at = time.monotonic()
+            response = super().request(method, url, **kwargs)
+            pause = limiter.on_response(response.status_code, response.headers.get('Retry-After'), sent_at=sent_at)
+            throttled = pause > 0 or response.status_code == 429
+            if not throttled or attempt == THROTTLE_RETRIES:
+                return response
+            response.close()
+        return response
+
+_adapter_lock = threading.Lock()
+_shared_adapters = {}
+_shared_session = None
+
+def _get_adapter(scheme: str) -> HTTPAdapter:
+    """
+    获取进程内共享的连接池适配器
+    同一个适配器可以挂载到多个会话上，从而在不同cookie的会话之间复用连接
+    """
+    with _adapter_lock:
+        adapter = _shared_adapters.get(scheme)
+        if adapter is None:
+            adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE)
+            _shared_adapters[scheme] = adapter
+        return adapter
+
+def create_session(
+    headers: Optional[Dict] = None,
+    cookies: Optional[Dict] = None,
+    timeout: float = DEFAULT_TIMEOUT
+) -> PooledSession:
+    """
+    创建一个使用共享连接池的会话
+    每个会话有自己的cookie，但底层连接在整个进程内复用
+    :param headers: 在默认请求头之上追加的请求头
+    :param cookies: 会话cookie
+    :param timeout: 默认超时（秒）
+    """
+    session = PooledSession(default_timeout=timeout)
+    session.mount('https://', _get_adapter('https://'))
+    session.mount('http://', _get_adapter('http://'))
+    session.headers.update(DEFAULT_HEADERS)
+    if headers:
+        session.headers.update(headers)
+    if cookies:
+        session.cookies.update(cookies)
+    return session
+
+def xueqiu_url(path: str) -> str:
+    """
+    拼接雪球接口地址；每次调用时读取环境变量，切换服务地址无需重新导入
+    """
+    return os.environ.get('OPENCLAW_XUEQIU_BASE_URL', XUEQIU_BASE_URL).rstrip('/') + path
+
+def create_xueqiu_session(cookies: Optional[Dict] = None, timeout: float = DEFAULT_TIMEOUT) -> PooledSession:
+    """
+    创建访问雪球接口的会话
+    """
+    return create_session(headers=XUEQIU_HEADERS, cookies=cookies, timeout=timeout)
+
+def get_shared_session() -> PooledSession:
+    """
+    获取无状态请求（如Tavily API）共用的会话
+    """
+    global _shared_session
+    with _adapter_lock:
+        if _shared_session is not None:
+            return _shared_session
+    session = create_session()
+    with _adapter_lock:
+        if _shared_session is None:
+            _shared_session = session
+        return _shared_session
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+时间线响应的流式解码
+按块读取响应体，定位顶层的 statuses（没有时为 list）数组后逐个切出数组元素并单独解码（走orjson/msgspec快速路径），
+达到调用方需要的条数即停止读取并关闭响应；不需要的字段和剩余帖子既不下载也不构建对象
+"""
+
+import re
+from typing import Any, Iterable, Iterator, List, Optional, Union
+
+from post_model import Post, loads, _unwrap_status
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# 帖子列表所在的顶层字段，两者都有时优先statuses
+STATUSES_KEY = b'"statuses"'
+LIST_KEY = b'"list"'
+
+_STRUCTURE = re.compile(rb'[\[\]{}"]')
+_STRING_END = re.compile(rb'["\\]')
+_SCALAR_END = re.compile(rb'[\s,\]}]')
+_WHITESPACE = b' \t\r\n'
+
+class _Scanner:
+    """
+    增量JSON扫描器：只识别结构（字符串、括号、逗号），用正则跳过字符串和嵌套内容，
+    已扫描过且不再需要的字节会被丢弃，缓冲区大小约为一个块加上一个数组元素
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._buf = bytearray()
+        self._pos = 0
+        self._mark = 0
+        self._keep = False
+        self.bytes_read = 0
+
+    def _fill(self) -> bool:
+        # 保留元素时从元素起点开始保留，否则丢弃已扫描的部分
+        cut = min(self._mark if self._keep else self._pos, len(self._buf))
+        if cut:
+            del self._buf[:cut]
+            self._pos -= cut
+            self._mark -= cut
+        for chunk in self._chunks:
+            if chunk:
+                self._buf += chunk
+                self.bytes_read += len(chunk)
+                return True
+        return False
+
+    def _need(self):
+        if not self._fill():
+            raise ValueError("JSON数据不完整")
+
+    def peek(self) -> bytes:
+        """
+        跳过空白，返回下一个字符（到达末尾时返回空字节串）
+        """
+        while True:
+            buf = self._buf
+            while self._pos < len(buf) and buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(buf):
+                return bytes(buf[self._pos:self._pos + 1])
+            if not self._fill():
+                return b''
+
+    def expect(self, chars: bytes) -> bytes:
+        c = self.peek()
+        if not c or c not in chars:
+            raise ValueError(f"JSON格式错误: 期望 {chars!r}，实际为 {c!r}")
+        self._pos += 1
+        return c
+
+    def _skip_string(self):
+        self._pos += 1
+        while True:
+            m = _STRING_END.search(self._buf, self._pos)
+            if m is None:
+                # 转义字符可能落在块边界之后，此时不回退位置
+                self._pos = max(self._pos, len(self._buf))
+                self._need()
+                continue
+            if m.group() == b'\\':
+                self._pos = m.end() + 1
+                continue
+            self._pos = m.end()
+            return
+
+    def skip_value(self):
+        """
+        跳过一个完整的JSON值
+        """
+        c = self.peek()
+        if c == b'"':
+            self._skip_string()
+        elif c in (b'[', b'{'):
+            depth = 0
+            while True:
+                m = _STRUCTURE.search(self._buf, self._pos)
+                if m is None:
+                    self._pos = len(self._buf)
+                    self._need()
+                    continue
+                if m.group() == b'"':
+                    self._pos = m.start()
+                    self._skip_string()
+                    continue
+                self._pos = m.end()
+                if m.group() in (b'[', b'{'):
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        return
+        elif c:
+            while True:
+                m = _SCALAR_END.search(self._buf, self._pos)
+                if m is not None:
+                    self._pos = m.start()
+                    return
+                self._pos = len(self._buf)
+                if not self._fill():
+                    return
+        else:
+            raise ValueError("JSON数据不完整")
+
+    def read_value(self) -> bytes:
+        """
+        跳过一个值并返回它的原始字节
+        """
+        self.peek()
+        self._mark = self._pos
+        self._keep = True
+        try:
+            self.skip_value()
+            return bytes(self._buf[self._mark:self._pos])
+        finally:
+            self._keep = False
+
+    def iter_array(self) -> Iterator[bytes]:
+        """
+        逐个产出当前数组中各元素的原始字节
+        """
+        self.expect(b'[')
+        if self.peek() == b']':
+            self._pos += 1
+            return
+        while True:
+            yield self.read_value()
+            if self.expect(b',]') == b']':
+                return
+
+    def find_list(self) -> Optional['_Scanner']:
+        """
+        定位帖子数组：顶层本身是数组，或顶层对象中的 statuses / list 字段；
+        与extract_statuses一致，两者都有时取statuses（不论先后），null视为空列表
+        :return: 停在数组 '[' 上的扫描器，没有帖子数组时返回None；
+                 list 先出现时需要读完整个对象确认没有statuses，此时返回基于已缓存的list字节的扫描器
+        """
+        c = self.peek()
+        if c == b'[':
+            return self
+        if c != b'{':
+            return None
+        self._pos += 1
+        if self.peek() == b'}':
+            return None
+        fallback = None
+        while True:
+            key = self.read_value()
+            self.expect(b':')
+            if key == STATUSES_KEY:
+                return self if self.peek() == b'[' else None
+            if key == LIST_KEY and fallback is None:
+                fallback = self.read_value()
+            else:
+                self.skip_value()
+            if self.expect(b',}') == b'}':
+                break
+        if fallback is None or not fallback.startswith(b'['):
+            return None
+        return _Scanner([fallback])
+
+def iter_status_items(source: Union[bytes, Iterable[bytes], Any], limit: Optional[int] = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    流式解码帖子列表，结果与 extract_statuses(loads(body)) 的前limit项一致
+    :param source: 响应字节、字节块迭代器，或requests响应（按iter_content读取，产出完毕或提前停止时关闭）
+    :param limit: 最多解码的帖子数，达到后立即停止读取
+    """
+    if limit is not None and limit <= 0:
+        return
+
+    response = None
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        chunks = [bytes(source)]
+    elif hasattr(source, 'iter_content'):
+        response = source
+        chunks = response.iter_content(chunk_size=chunk_size)
+    else:
+        chunks = source
+
+    try:
+        scanner = _Scanner(chunks).find_list()
+        if scanner is None:
+            return
+        produced = 0
+        for raw in scanner.iter_array():
+            yield _unwrap_status(loads(raw))
+            produced += 1
+            if limit is not None and produced >= limit:
+                return
+    finally:
+        if response is not None:
+            response.close()
+
+def stream_statuses(source, limit: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List:
+    """
+    流式解码帖子列表，返回前limit个status
+    """
+    return list(iter_status_items(source, limit=limit, chunk_size=chunk_size))
+
+def stream_posts(source, limit: Optional[int] = None, method: str = 'direct_api',
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Post]:
+    """
+    流式解码出帖子对象，只构建前limit个
+    """
+    return [Post.from_status(status, method=method)
+            for status in iter_status_items(source, limit=limit, chunk_size=chunk_size)
+            if isinstance(status, dict)]
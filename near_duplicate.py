@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+近似重复检测
+对帖子标题+正文计算64位SimHash（中文按字切分为n-gram，英文数字按词），
+用分段LSH索引查找汉明距离很小的指纹；最近推送过的指纹保存在SQLite中，重启后仍然生效
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import Counter, deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_STATE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'openclaw')
+
+FINGERPRINT_BITS = 64
+_MASK = (1 << FINGERPRINT_BITS) - 1
+
+# 中文字符连续段，或英文/数字单词
+_TOKEN_PATTERN = re.compile(r'[一-鿿㐀-䶿]+|[a-z0-9]+(?:\.[0-9]+)?')
+# HTML标签、链接、股票代码标记等不影响语义的片段
+_NOISE_PATTERN = re.compile(r'<[^>]+>|&[a-z]+;|https?://\S+|\$[^$]{1,40}\$|#[^#]{1,40}#|@\S+')
+
+def shingles(text: str, k: int = 3) -> Counter:
+    """
+    把文本切成特征：中文连续段按k字滑动窗口切分（不足k字的整段作为一个特征），英文数字按词
+    :return: 特征及其出现次数
+    """
+    features = Counter()
+    text = _NOISE_PATTERN.sub(' ', text.lower())
+    for token in _TOKEN_PATTERN.findall(text):
+        if token[0] < '㐀':
+            features[token] += 1
+        elif len(token) <= k:
+            features[token] += 1
+        else:
+            for i in range(len(token) - k + 1):
+                features[token[i:i + k]] += 1
+    return features
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def simhash(text: str, k: int = 3) -> int:
+    """
+    计算64位SimHash指纹，文本没有可用特征时返回0
+    """
+    return simhash_features(shingles(text, k))
+
+def simhash_features(features: Counter) -> int:
+    weights = [0] * FINGERPRINT_BITS
+    for feature, count in features.items():
+        h = _feature_hash(feature)
+        for bit in range(FINGERPRINT_BITS):
+            if (h >> bit) & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+def _to_signed(value: int) -> int:
+    # SQLite的INTEGER是有符号64位
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def _to_unsigned(value: int) -> int:
+    return value & _MASK
+
+class NearDuplicateIndex:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: int = 7,
+        window: int = 5000,
+        max_age: Optional[float] = 7 * 24 * 3600,
+        shingle_size: int = 3,
+        min_features: int = 4
+    ):
+        """
+        初始化近似重复索引
+        :param path: SQLite文件路径，默认位于 ~/.cache/openclaw（可用OPENCLAW_CACHE_DIR覆盖目录）；传入':memory:'则不持久化
+        :param threshold: 汉明距离不超过该值即视为重复（LSH按 threshold+1 段切分，保证不漏检）
+        :param window: 最多保留的最近指纹数
+        :param max_age: 指纹保留时长（秒），None表示不过期
+        :param shingle_size: 中文n-gram长度
+        :param min_features: 特征数少于该值的短文本不参与判重，避免误杀
+        """
+        if path is None:
+            state_dir = os.environ.get('OPENCLAW_CACHE_DIR', DEFAULT_STATE_DIR)
+            os.makedirs(state_dir, exist_ok=True)
+            path = os.path.join(state_dir, 'near_duplicate.sqlite3')
+
+        self.path = path
+        self.threshold = threshold
+        self.window = window
+        self.max_age = max_age
+        self.shingle_size = shingle_size
+        self.min_features = min_features
+
+        self.bands = threshold + 1
+        self._band_bits = FINGERPRINT_BITS // self.bands
+        self._band_mask = (1 << self._band_bits) - 1
+
+        self.hits = 0
+        self.lookups = 0
+
+        self._lock = threading.Lock()
+        self._buckets: List[Dict[int, set]] = [{} for _ in range(self.bands)]
+        self._labels: Dict[int, str] = {}
+        self._entries = deque()  # (row_id, fingerprint, added_at)
+        self._refcount: Counter = Counter()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                fingerprint INTEGER NOT NULL,
+                label TEXT,
+                added_at REAL NOT NULL
+            )
+        ''')
+        self._conn.commit()
+
+        # 启动时加载窗口内的指纹
+        with self._lock:
+            self._expire(time.time())
+            rows = self._conn.execute(
+                'SELECT id, fingerprint, label, added_at FROM fingerprints ORDER BY id DESC LIMIT ?', (window,)
+            ).fetchall()
+            for row_id, fingerprint, label, added_at in reversed(rows):
+                self._insert(row_id, _to_unsigned(fingerprint), label, added_at)
+
+    def _band_keys(self, fingerprint: int) -> Iterable[Tuple[int, int]]:
+        for band in range(self.bands):
+            yield band, (fingerprint >> (band * self._band_bits)) & self._band_mask
+
+    def _insert(self, row_id: int, fingerprint: int, label: Optional[str], added_at: float):
+        if self._refcount[fingerprint] == 0:
+            for band, key in self._band_keys(fingerprint):
+                self._buckets[band].setdefault(key, set()).add(fingerprint)
+        self._refcount[fingerprint] += 1
+        if label is not None:
+            self._labels[fingerprint] = label
+        self._entries.append((row_id, fingerprint, added_at))
+
+    def _remove_oldest(self):
+        _, fingerprint, _ = self._entries.popleft()
+        self._refcount[fingerprint] -= 1
+        if self._refcount[fingerprint] > 0:
+            return
+        del self._refcount[fingerprint]
+        self._labels.pop(fingerprint, None)
+        for band, key in self._band_keys(fingerprint):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(fingerprint)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def _expire(self, now: float):
+        while len(self._entries) > self.window:
+            self._remove_oldest()
+        if self.max_age is not None:
+            cutoff = now - self.max_age
+            while self._entries and self._entries[0][2] < cutoff:
+                self._remove_oldest()
+            self._conn.execute('DELETE FROM fingerprints WHERE added_at < ?', (cutoff,))
+        if self._entries:
+            self._conn.execute('DELETE FROM fingerprints WHERE id < ?', (self._entries[0][0],))
+
+    def fingerprint(self, text: str) -> Optional[int]:
+        """
+        计算文本指纹，特征太少的文本返回None
+        """
+        features = shingles(text, self.shingle_size)
+        if len(features) < self.min_features:
+            return None
+        return simhash_features(features)
+
+    def _find(self, fingerprint: int) -> Optional[int]:
+        for band, key in self._band_keys(fingerprint):
+            for candidate in self._buckets[band].get(key, ()):
+                if hamming_distance(candidate, fingerprint) <= self.threshold:
+                    return candidate
+        return None
+
+    def match(self, text: str) -> Optional[str]:
+        """
+        查找近似重复的已有条目
+        :return: 匹配条目的标签（无标签时为空字符串），没有匹配返回None
+        """
+        fingerprint = self.fingerprint(text)
+        if fingerprint is None:
+            return None
+        with self._lock:
+            self.lookups += 1
+            found = self._find(fingerprint)
+            if found is None:
+                return None
+            self.hits += 1
+            return self._labels.get(found, '')
+
+    def add(self, text: str, label: Optional[str] = None):
+        """
+        把文本加入窗口
+        """
+        fingerprint = self.fingerprint(text)
+        if fingerprint is not None:
+            self._add_many([(fingerprint, label)])
+
+    def _add_many(self, items: List[Tuple[int, Optional[str]]]):
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            for fingerprint, label in items:
+                cursor = self._conn.execute(
+                    'INSERT INTO fingerprints (fingerprint, label, added_at) VALUES (?, ?, ?)',
+                    (_to_signed(fingerprint), label, now)
+                )
+                self._insert(cursor.lastrowid, fingerprint, label, now)
+            self._expire(now)
+            self._conn.commit()
+
+    def filter_new(self, items: Iterable, text: Callable[[object], str],
+                   label: Optional[Callable[[object], str]] = None, mark: bool = True) -> List:
+        """
+        过滤掉与窗口内条目或本批前面条目近似重复的项，保持原有顺序
+        :param text: 从条目中取出用于判重的文本（如标题+正文）
+        :param label: 从条目中取出标签（如URL），用于日志排查
+        :param mark: 是否把保留下来的条目加入窗口
+        """
+        kept = []
+        pending: List[Tuple[int, Optional[str]]] = []
+        batch_fingerprints: List[int] = []
+
+        for item in items:
+            fingerprint = self.fingerprint(text(item))
+            if fingerprint is None:
+                kept.append(item)
+                continue
+
+            with self._lock:
+                self.lookups += 1
+                duplicate = self._find(fingerprint) is not None
+            if not duplicate:
+                duplicate = any(hamming_distance(fingerprint, other) <= self.threshold for other in batch_fingerprints)
+            if duplicate:
+                with self._lock:
+                    self.hits += 1
+                continue
+
+            kept.append(item)
+            batch_fingerprints.append(fingerprint)
+            pending.append((fingerprint, label(item) if label else None))
+
+        if mark:
+            self._add_many(pending)
+        return kept
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'lookups': self.lookups,
+                'duplicates': self.hits,
+                'duplicate_rate': self.hits / self.lookups if self.lookups else 0.0
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def post_text(post) -> str:
+    """
+    Post或Tavily来源用于判重的文本：标题+正文
+    """
+    if isinstance(post, dict):
+        return f"{post.get('title', '')} {post.get('content', '')}"
+    return f"{post.title or ''} {post.content or ''}"
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+openclaw 统一命令行入口
+各子命令只在执行时才导入对应的后端（requests、Playwright、SQLite索引等），
+解析参数和 --help 不加载任何后端，适合定时任务等短生命周期调用
+
+用法:
+    python openclaw.py search 关键词 [--local] [--limit 10]
+    python openclaw.py fetch-hot [--count 50] [--top 5] [--incremental]
+    python openclaw.py fetch-user 用户ID [--count 20] [--incremental]
+    python openclaw.py browser-scrape [--max-posts 10]
+    python openclaw.py schedule [--once]
+
+雪球凭证可通过 --u-value/--token 或环境变量 XUEQIU_U/XUEQIU_TOKEN 提供
+"""
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+def _credentials(args) -> Optional[dict]:
+    u_value = args.u_value or os.environ.get('XUEQIU_U')
+    token = args.token or os.environ.get('XUEQIU_TOKEN')
+    if not u_value or not token:
+        return None
+    return {'u': u_value, 'xq_a_token': token}
+
+def _require_credentials(args) -> Optional[dict]:
+    cookies = _credentials(args)
+    if cookies is None:
+        print("❌ 缺少雪球凭证，请通过 --u-value/--token 或环境变量 XUEQIU_U/XUEQIU_TOKEN 提供")
+    return cookies
+
+def _print_posts(posts: List):
+    for i, post in enumerate(posts, 1):
+        print(f"\n{i}. {post.title or '无标题'}")
+        print(f"   👤 {post.author or '匿名用户'}  📅 {post.display_time}")
+        print(f"   📈 👍 {post.like_count} | 💬 {post.comment_count} | 🔄 {post.retweet_count}")
+        if post.url:
+            print(f"   🔗 {post.url}")
+
+def cmd_search(args) -> int:
+    """
+    搜索帖子：--local只查本地索引（不加载网络相关模块），否则本地命中不足时调用Tavily
+    """
+    filters = {'sort': args.sort}
+    if args.author:
+        filters['author'] = args.author
+    if args.min_likes:
+        filters['min_likes'] = args.min_likes
+
+    if args.local:
+        from post_index import get_default_index
+        posts = get_default_index().search(args.query, limit=args.limit, **filters)
+        if not posts:
+            print(f"❌ 本地索引中没有与“{args.query}”相关的帖子")
+            return 1
+        print(f"🔍 本地索引中找到 {len(posts)} 条帖子:")
+        _print_posts(posts)
+        return 0
+
+    from post_fetcher import SocialMediaPostFetcher
+    result = SocialMediaPostFetcher().search(
+        args.query, min_local_results=args.min_local, limit=args.limit, cache_ttl=args.cache_ttl, **filters)
+    if "error" in result:
+        print(f"❌ 搜索失败: {result['error']}")
+        return 1
+
+    print(f"🔍 {'本地索引' if result.get('local') else 'Tavily'}搜索结果:")
+    if result.get("answer"):
+        print(f"📝 摘要: {result['answer']}")
+    for i, source in enumerate(result.get("sources", []), 1):
+        print(f"\n{i}. {source.get('title') or '无标题'}")
+        print(f"   🔗 {source.get('url') or '无链接'}")
+    return 0
+
+def cmd_fetch_hot(args) -> int:
+    """
+    获取雪球热门帖子，按热度选出前N个展示
+    """
+    cookies = _require_credentials(args)
+    if cookies is None:
+        return 1
+
+    from enhanced_xueqiu_fetcher import EnhancedXueqiuFetcher
+    fetcher = EnhancedXueqiuFetcher(cookies['u'], cookies['xq_a_token'])
+    posts = fetcher.get_hot_topics(count=args.count, incremental=args.incremental)
+    if not posts:
+        print("❌ 未能获取到热门帖子")
+        return 1
+
+    print(f"🎉 获取到 {len(posts)} 个热门帖子，按热度展示前 {min(args.top, len(posts))} 个:")
+    for i, formatted in enumerate(fetcher.format_top_posts(posts, k=args.top), 1):
+        print(f"\n{i}. {formatted}")
+    return 0
+
+def cmd_fetch_user(args) -> int:
+    """
+    获取雪球用户时间线
+    """
+    from xueqiu_scraper import XueqiuScraper
+    scraper = XueqiuScraper(cookies=_credentials(args))
+    posts = scraper.get_user_posts(args.user_id, count=args.count, incremental=args.incremental)
+    if not posts:
+        print(f"❌ 未能获取到用户 {args.user_id} 的帖子")
+        return 1
+
+    print(f"👤 用户 {args.user_id} 的 {len(posts)} 个帖子:")
+    _print_posts(posts)
+    return 0
+
+def cmd_browser_scrape(args) -> int:
+    """
+    通过浏览器自动化获取雪球帖子（需要安装Playwright）
+    """
+    cookies = _require_credentials(args)
+    if cookies is None:
+        return 1
+
+    try:
+        from xueqiu_browser_automation import XueqiuBrowserAutomation
+        automation = XueqiuBrowserAutomation(u_value=cookies['u'], xq_a_token=cookies['xq_a_token'])
+        posts = automation.get_posts(max_posts=args.max_posts)
+    except ImportError as e:
+        print(f"❌ 浏览器自动化不可用: {e}")
+        print("💡 请先安装: pip install playwright && playwright install chromium")
+        return 1
+
+    automation.display_posts(posts)
+    return 0 if posts else 1
+
+def cmd_schedule(args) -> int:
+    """
+    启动定时推送服务；--once只执行一次推送后退出
+    """
+    from social_post_scheduler import HOT_FEED_TTL, SocialPostScheduler
+    scheduler = SocialPostScheduler(max_concurrency=args.concurrency)
+
+    if args.once:
+        scheduler.fetch_and_push_many([("xiaohongshu", "热门"), ("xueqiu", "热门讨论")],
+                                      concurrency=args.concurrency, cache_ttl=HOT_FEED_TTL)
+        scheduler.delivery.flush(timeout=10)
+        scheduler.delivery.close()
+        return 0
+
+    try:
+        scheduler.run_scheduler()
+    except KeyboardInterrupt:
+        print("\n🛑 服务已停止")
+    return 0
+
+def _add_credential_args(parser: argparse.ArgumentParser):
+    parser.add_argument('--u-value', help='雪球用户ID（u cookie），默认读取环境变量XUEQIU_U')
+    parser.add_argument('--token', help='雪球认证令牌（xq_a_token cookie），默认读取环境变量XUEQIU_TOKEN')
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='openclaw', description='社交媒体帖子获取工具')
+    subparsers = parser.add_subparsers(dest='command', metavar='命令')
+    subparsers.required = True
+
+    search = subparsers.add_parser('search', help='搜索帖子（本地索引优先，不足时调用Tavily）')
+    search.add_argument('query', help='搜索关键词')
+    search.add_argument('--local', action='store_true', help='只查本地索引')
+    search.add_argument('--limit', type=int, default=10, help='最多返回的结果数')
+    search.add_argument('--min-local', type=int, default=3, help='本地命中不少于该数时不再调用Tavily')
+    search.add_argument('--sort', choices=('relevance', 'recent', 'engagement'), default='relevance',
+                        help='本地索引结果排序方式')
+    search.add_argument('--author', help='只返回该作者的帖子（本地索引）')
+    search.add_argument('--min-likes', type=int, default=0, help='最少点赞数（本地索引）')
+    search.add_argument('--cache-ttl', type=float, default=None, help='Tavily结果缓存时长（秒）')
+    search.set_defaults(handler=cmd_search)
+
+    fetch_hot = subparsers.add_parser('fetch-hot', help='获取雪球热门帖子')
+    fetch_hot.add_argument('--count', type=int, default=50, help='获取的候选帖子数')
+    fetch_hot.add_argument('--top', type=int, default=5, help='按热度展示的帖子数')
+    fetch_hot.add_argument('--incremental', action='store_true', help='只返回之前没有处理过的帖子')
+    _add_credential_args(fetch_hot)
+    fetch_hot.set_defaults(handler=cmd_fetch_hot)
+
+    fetch_user = subparsers.add_parser('fetch-user', help='获取雪球用户时间线')
+    fetch_user.add_argument('user_id', help='雪球用户ID')
+    fetch_user.add_argument('--count', type=int, default=20, help='获取的帖子数')
+    fetch_user.add_argument('--incremental', action='store_true', help='只返回之前没有处理过的帖子')
+    _add_credential_args(fetch_user)
+    fetch_user.set_defaults(handler=cmd_fetch_user)
+
+    browser_scrape = subparsers.add_parser('browser-scrape', help='通过浏览器自动化获取雪球帖子')
+    browser_scrape.add_argument('--max-posts', type=int, default=10, help='最多获取的帖子数')
+    _add_credential_args(browser_scrape)
+    browser_scrape.set_defaults(handler=cmd_browser_scrape)
+
+    schedule = subparsers.add_parser('schedule', help='启动定时推送服务')
+    schedule.add_argument('--once', action='store_true', help='只执行一次推送后退出')
+    schedule.add_argument('--concurrency', type=int, default=4, help='最多同时运行的任务数')
+    schedule.set_defaults(handler=cmd_schedule)
+
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+帖子列式归档
+获取到的帖子按发布日期分区，追加写入不可变的段文件（segment）：
+数值字段（id、created_at、点赞/评论/转发数等）按列存放为定长int64数组，读取时内存映射、零拷贝扫描；
+其余字段（作者、标题、正文等）整体zlib压缩为JSON行，只有需要完整记录时才解压
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import zlib
+import array
+import atexit
+import struct
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from post_model import Post
+from xueqiu_pagination import to_epoch_ms
+
+DEFAULT_ARCHIVE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'openclaw', 'archive')
+
+MAGIC = b'OCSEG\x00\x01\x00'
+SEGMENT_SUFFIX = '.seg'
+
+# 按列存放的数值字段，缺失值用NULL_INT表示
+NUMERIC_COLUMNS = ('id', 'created_at', 'like_count', 'comment_count', 'retweet_count', 'author_id')
+NULL_INT = -(1 << 63)
+
+# 段文件头：魔数、行数、列数；每列目录项：列名(16字节)、类型、是否压缩、偏移、长度
+_HEADER = struct.Struct('<8sII')
+_COLUMN_ENTRY = struct.Struct('<16sBBxxxxxxQQ')
+_TYPE_INT64 = 1
+_TYPE_JSON_LINES = 2
+
+_NATIVE_LITTLE = sys.byteorder == 'little'
+
+def _to_int(value) -> int:
+    if value is None or value == '':
+        return NULL_INT
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return NULL_INT
+
+def partition_for(created_at: Optional[int]) -> str:
+    """
+    帖子所属的分区（发布日期），没有发布时间的帖子归入归档当天
+    """
+    seconds = created_at / 1000 if isinstance(created_at, (int, float)) else time.time()
+    return datetime.fromtimestamp(seconds).strftime('dt=%Y-%m-%d')
+
+def latest_by_id(posts: Iterable[Post]) -> List[Post]:
+    """
+    同一帖子被多次获取时只保留最后一次（互动数据最新），没有ID的帖子原样保留
+    """
+    latest: Dict = {}
+    for post in posts:
+        key = post.id if post.id not in (None, '') else object()
+        latest.pop(key, None)
+        latest[key] = post
+    return list(latest.values())
+
+def write_segment(path: str, posts: List[Post]):
+    """
+    把一批帖子写成一个段文件（先写临时文件再改名，读者不会看到写了一半的段）
+    """
+    columns = []
+    for name in NUMERIC_COLUMNS:
+        values = array.array('q', (_to_int(getattr(post, name)) for post in posts))
+        if not _NATIVE_LITTLE:
+            values.byteswap()
+        columns.append((name, _TYPE_INT64, 0, values.tobytes()))
+
+    records = []
+    for post in posts:
+        record = post.to_dict()
+        for name in NUMERIC_COLUMNS:
+            # 非整数ID（如URL）无法放进数值列，保留在记录中
+            if name != 'id' or _to_int(record.get('id')) != NULL_INT:
+                record.pop(name, None)
+        records.append(json.dumps(record, ensure_ascii=False))
+    columns.append(('records', _TYPE_JSON_LINES, 1, zlib.compress('\n'.join(records).encode('utf-8'), 6)))
+
+    offset = _HEADER.size + _COLUMN_ENTRY.size * len(columns)
+    entries = []
+    for name, kind, compressed, data in columns:
+        # 数值列按8字节对齐，保证内存映射后可以直接按int64读取
+        offset = (offset + 7) & ~7
+        entries.append((name, kind, compressed, offset, data))
+        offset += len(data)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, len(posts), len(columns)))
+        for name, kind, compressed, column_offset, data in entries:
+            f.write(_COLUMN_ENTRY.pack(name.encode('ascii'), kind, compressed, column_offset, len(data)))
+        for _, _, _, column_offset, data in entries:
+            f.write(b'\x00' * (column_offset - f.tell()))
+            f.write(data)
+    os.replace(tmp_path, path)
+
+class Segment:
+    """
+    内存映射的只读段文件
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.rows, column_count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"不是有效的归档段文件: {path}")
+
+        self._columns = {}
+        for i in range(column_count):
+            name, kind, compressed, offset, length = _COLUMN_ENTRY.unpack_from(
+                self._mmap, _HEADER.size + i * _COLUMN_ENTRY.size)
+            self._columns[name.rstrip(b'\x00').decode('ascii')] = (kind, compressed, offset, length)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def column(self, name: str):
+        """
+        读取数值列：小端机器上直接返回内存映射上的int64视图（不复制），否则返回转换后的数组
+        """
+        kind, _, offset, length = self._columns[name]
+        if kind != _TYPE_INT64:
+            raise ValueError(f"{name} 不是数值列")
+        view = memoryview(self._mmap)[offset:offset + length]
+        if _NATIVE_LITTLE:
+            return view.cast('q')
+        values = array.array('q', view.tobytes())
+        values.byteswap()
+        return values
+
+    def records(self) -> List[Dict]:
+        """
+        解压并还原完整记录（含数值列）
+        """
+        _, compressed, offset, length = self._columns['records']
+        data = self._mmap[offset:offset + length]
+        lines = (zlib.decompress(data) if compressed else data).decode('utf-8').split('\n')
+        numeric = {name: self.column(name) for name in NUMERIC_COLUMNS if name in self._columns}
+
+        results = []
+        for i, line in enumerate(lines[:self.rows]):
+            record = json.loads(line)
+            for name, values in numeric.items():
+                value = values[i]
+                if value != NULL_INT:
+                    record[name] = value
+                else:
+                    record.setdefault(name, None)
+            results.append(record)
+        return results
+
+    def posts(self) -> List[Post]:
+        return [Post.from_dict(record) for record in self.records()]
+
+    def close(self):
+        try:
+            self._mmap.close()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # 仍有列视图引用映射时无法立即关闭，交给垃圾回收
+        try:
+            self.close()
+        except BufferError:
+            pass
+
+class PostArchive:
+    def __init__(self, root: Optional[str] = None, segment_rows: int = 5000, max_buffer_age: float = 300.0,
+                 max_buffered_rows: int = 20000):
+        """
+        :param root: 归档根目录，默认 ~/.cache/openclaw/archive（可用OPENCLAW_CACHE_DIR覆盖上级目录）
+        :param segment_rows: 某个分区缓冲达到这么多条时写出一个段
+        :param max_buffer_age: 缓冲中最早的帖子等待超过这么多秒时写出所有分区（见 flush_if_due）
+        :param max_buffered_rows: 所有分区的缓冲合计达到这么多条时写出所有分区
+        """
+        if root is None:
+            cache_dir = os.environ.get('OPENCLAW_CACHE_DIR')
+            root = os.path.join(cache_dir, 'archive') if cache_dir else DEFAULT_ARCHIVE_DIR
+        os.makedirs(root, exist_ok=True)
+
+        self.root = root
+        self.segment_rows = segment_rows
+        self.max_buffer_age = max_buffer_age
+        self.max_buffered_rows = max_buffered_rows
+        self.written_rows = 0
+        self.written_segments = 0
+        self._lock = threading.Lock()
+        self._buffers: Dict[str, List[Post]] = {}
+        self._buffered_rows = 0
+        self._oldest: Optional[float] = None
+        self._sequence = 0
+
+    def append(self, posts: Iterable[Post]):
+        """
+        追加帖子到对应分区的缓冲，分区缓冲满时写出该分区的段文件；
+        缓冲合计过多或等待过久时写出所有分区
+        """
+        full = []
+        with self._lock:
+            for post in posts:
+                if self._oldest is None:
+                    self._oldest = time.monotonic()
+                partition = partition_for(post.created_at)
+                buffer = self._buffers.setdefault(partition, [])
+                buffer.append(post)
+                self._buffered_rows += 1
+                if len(buffer) >= self.segment_rows:
+                    batch = self._buffers.pop(partition)
+                    self._buffered_rows -= len(batch)
+                    full.append((partition, batch))
+            for partition, batch in full:
+                self._write(partition, batch)
+            if self._due():
+                self._flush_buffers()
+
+    def _due(self) -> bool:
+        if not self._buffered_rows:
+            return False
+        return self._buffered_rows >= self.max_buffered_rows or \
+            time.monotonic() - self._oldest >= self.max_buffer_age
+
+    def _flush_buffers(self):
+        buffers, self._buffers = self._buffers, {}
+        self._buffered_rows = 0
+        self._oldest = None
+        for partition, batch in buffers.items():
+            if batch:
+                self._write(partition, batch)
+
+    def flush(self):
+        """
+        把所有分区的缓冲写成段文件
+        """
+        with self._lock:
+            self._flush_buffers()
+
+    def flush_if_due(self) -> bool:
+        """
+        缓冲等待超过max_buffer_age或合计超过max_buffered_rows时写出所有分区；
+        供调度器定期调用，抓取停顿时缓冲也不会一直留在内存中
+        :return: 是否写出了缓冲
+        """
+        with self._lock:
+            if not self._due():
+                return False
+            self._flush_buffers()
+            return True
+
+    def _write(self, partition: str, posts: List[Post]):
+        posts = latest_by_id(posts)
+        directory = os.path.join(self.root, partition)
+        os.makedirs(directory, exist_ok=True)
+        self._sequence += 1
+        # 文件名按写出顺序排序，读取时后写的段覆盖先写的同一帖子
+        name = f"{int(time.time() * 1000)}-{os.getpid()}-{self._sequence:06d}{SEGMENT_SUFFIX}"
+        write_segment(os.path.join(directory, name), posts)
+        self.written_rows += len(posts)
+        self.written_segments += 1
+
+    def compact(self, partition: str) -> int:
+        """
+        把一个分区中的多个小段合并为一个段（每次运行都会写出新段，长期运行后可定期合并）；
+        同一帖子只保留最后写入的一条
+        :return: 合并掉的段数
+        """
+        directory = os.path.join(self.root, partition)
+        paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                       if name.endswith(SEGMENT_SUFFIX))
+        if len(paths) < 2:
+            return 0
+
+        posts = []
+        for path in paths:
+            segment = Segment(path)
+            try:
+                posts.extend(segment.posts())
+            finally:
+                segment.close()
+        with self._lock:
+            self._write(partition, posts)
+        for path in paths:
+            os.remove(path)
+        return len(paths)
+
+class ArchiveReader:
+    def __init__(self, root: Optional[str] = None):
+        if root is None:
+            cache_dir = os.environ.get('OPENCLAW_CACHE_DIR')
+            root = os.path.join(cache_dir, 'archive') if cache_dir else DEFAULT_ARCHIVE_DIR
+        self.root = root
+
+    def segment_paths(self, since=None, until=None) -> List[str]:
+        """
+        列出时间范围内的段文件；按分区目录名裁剪，不打开范围外的段
+        """
+        if not os.path.isdir(self.root):
+            return []
+        since_day = partition_for(to_epoch_ms(since)) if since is not None else None
+        until_day = partition_for(to_epoch_ms(until)) if until is not None else None
+
+        paths = []
+        for partition in sorted(os.listdir(self.root)):
+            if not partition.startswith('dt='):
+                continue
+            if (since_day and partition < since_day) or (until_day and partition > until_day):
+                continue
+            directory = os.path.join(self.root, partition)
+            paths.extend(os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                         if name.endswith(SEGMENT_SUFFIX))
+        return paths
+
+    def iter_segments(self, since=None, until=None) -> Iterator[Segment]:
+        for path in self.segment_paths(since, until):
+            segment = Segment(path)
+            try:
+                yield segment
+            finally:
+                try:
+                    segment.close()
+                except BufferError:
+                    pass
+
+    def scan(self, columns: Iterable[str] = NUMERIC_COLUMNS, since=None, until=None) -> Iterator[Dict]:
+        """
+        逐段产出所需的数值列 {列名: int64视图}，不解压文本记录
+        视图只在迭代到下一段之前有效
+        """
+        columns = list(columns)
+        for segment in self.iter_segments(since, until):
+            yield {name: segment.column(name) for name in columns}
+
+    def iter_posts(self, since=None, until=None) -> Iterator[Post]:
+        """
+        还原完整帖子（需要解压文本记录），按发布时间过滤
+        """
+        since_ms = to_epoch_ms(since)
+        until_ms = to_epoch_ms(until)
+        for segment in self.iter_segments(since, until):
+            for post in segment.posts():
+                created_at = post.created_at
+                if since_ms is not None and (created_at is None or created_at < since_ms):
+                    continue
+                if until_ms is not None and (created_at is None or created_at > until_ms):
+                    continue
+                yield post
+
+    def summarize(self, since=None, until=None) -> Dict:
+        """
+        只扫描数值列的汇总统计示例：帖子数和各项互动总数
+        同一帖子被多次归档时只计最后写入的一行
+        """
+        since_ms = to_epoch_ms(since) if since is not None else NULL_INT + 1
+        until_ms = to_epoch_ms(until) if until is not None else (1 << 63) - 1
+        names = ('like_count', 'comment_count', 'retweet_count')
+        latest: Dict[int, tuple] = {}
+        anonymous = []
+        for columns in self.scan(('id', 'created_at') + names, since, until):
+            ids = columns['id']
+            created = columns['created_at']
+            for i in range(len(created)):
+                if since_ms <= created[i] <= until_ms or (created[i] == NULL_INT and since is None and until is None):
+                    counts = tuple(columns[name][i] for name in names)
+                    if ids[i] != NULL_INT:
+                        latest[ids[i]] = counts
+                    else:
+                        anonymous.append(counts)
+            del ids, created, columns
+
+        summary = {'posts': len(latest) + len(anonymous), 'like_count': 0, 'comment_count': 0, 'retweet_count': 0}
+        for counts in list(latest.values()) + anonymous:
+            for name, value in zip(names, counts):
+                if value != NULL_INT:
+                    summary[name] += value
+        return summary
+
+_default_archive: Optional[PostArchive] = None
+_default_archive_lock = threading.Lock()
+
+def get_default_archive() -> PostArchive:
+    """
+    获取进程共享的默认归档，进程退出前写出所有缓冲
+    """
+    global _default_archive
+    with _default_archive_lock:
+        if _default_archive is None:
+            _default_archive = PostArchive()
+            atexit.register(_default_archive.flush)
+        return _default_archive
@@ -4,19 +4,34 @@
 用于获取小红书和雪球的公开帖子
 """
 
-import requests
 import time
-from typing import List, Dict, Optional
-from bs4 import BeautifulSoup
-import json
+from typing import List, Dict, Optional, Tuple
+from tavily_search_tool import AsyncTavilySearchTool
+from tavily_cache import TavilyCache, get_default_cache
+from http_transport import create_session, USER_AGENT
+from single_flight import SingleFlight, get_default_flight
+from post_index import PostIndex, get_default_index
+from post_model import Post
+
+# 本地索引命中不少于该条数时直接返回，不再调用Tavily
+MIN_LOCAL_RESULTS = 3
 
 class SocialMediaPostFetcher:
-    def __init__(self):
+    def __init__(self, cache: Optional[TavilyCache] = None, flight: Optional[SingleFlight] = None,
+                 post_index: Optional[PostIndex] = None):
+        """
+        :param cache: Tavily响应缓存，不提供则使用进程共享的默认磁盘缓存
+        :param flight: 请求合并器，不提供则使用进程共享的合并器
+        :param post_index: 本地全文索引，Tavily来源会写入索引，search 优先在本地查找；不提供则在首次使用时使用默认索引
+        """
         self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            'User-Agent': USER_AGENT
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        self.session = create_session(headers=self.headers)
+        self.cache = cache if cache is not None else get_default_cache()
+        self.flight = flight if flight is not None else get_default_flight()
+        self.post_index = post_index
+        self._tavily_tool = None
     
     def fetch_xiaohongshu_posts(self, keyword: str = "", limit: int = 5) -> List[Dict]:
         """
@@ -55,47 +70,129 @@ class SocialMediaPostFetcher:
             }
         ]
     
-    def search_via_tavily(self, query: str) -> Dict:
+    def _get_post_index(self) -> PostIndex:
+        if self.post_index is None:
+            self.post_index = get_default_index()
+        return self.post_index
+    
+    def _get_tavily_tool(self) -> Optional[AsyncTavilySearchTool]:
+        """
+        获取（并缓存）Tavily搜索工具，未设置API密钥时返回None
+        """
+        if self._tavily_tool is None:
+            try:
+                self._tavily_tool = AsyncTavilySearchTool(cache=self.cache, flight=self.flight)
+            except ValueError:
+                return None
+        return self._tavily_tool
+    
+    def search_via_tavily(self, query: str, cache_ttl: Optional[float] = None, platform: Optional[str] = None) -> Dict:
         """
         通过Tavily搜索获取相关内容
+        :param cache_ttl: 本次查询的缓存有效期（秒）
+        :param platform: 查询所针对的平台，来源写入索引时记录该平台
         """
-        import os
-        api_key = os.environ.get('TAVILY_API_KEY')
-        if not api_key:
+        tool = self._get_tavily_tool()
+        if tool is None:
             return {"error": "Tavily API密钥未设置"}
         
-        try:
-            import requests
-            url = 'https://api.tavily.com/search'
-            data = {
-                'api_key': api_key,
-                'query': query,
-                'search_depth': 'basic',
-                'include_answer': True,
-                'include_sources': True,
-                'max_results': 5
-            }
-            
-            response = requests.post(url, json=data, timeout=15)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"error": f"搜索失败，状态码: {response.status_code}"}
-        except Exception as e:
-            return {"error": f"搜索过程中发生错误: {e}"}
+        return self._index_sources(tool.search(query, cache_ttl=cache_ttl), platform)
+    
+    def search_many_via_tavily(self, queries: List[str], concurrency: int = 4, cache_ttl: Optional[float] = None,
+                               platforms: Optional[List[Optional[str]]] = None) -> List[Dict]:
+        """
+        并发执行多个Tavily查询，结果顺序与输入一致
+        :param platforms: 与queries一一对应的平台，来源写入索引时记录
+        """
+        tool = self._get_tavily_tool()
+        if tool is None:
+            return [{"error": "Tavily API密钥未设置"} for _ in queries]
+        
+        if platforms is None:
+            platforms = [None] * len(queries)
+        results = tool.search_many_sync(queries, concurrency=concurrency, cache_ttl=cache_ttl)
+        return [self._index_sources(result, platform) for result, platform in zip(results, platforms)]
+    
+    def _index_sources(self, result: Dict, platform: Optional[str] = None) -> Dict:
+        """
+        把Tavily返回的来源写入本地索引
+        """
+        if "error" not in result:
+            self._get_post_index().add_posts((Post.from_tavily_source(source) for source in result.get("sources") or []),
+                                      platform=platform)
+        return result
+    
+    def search_local(self, query: str, limit: int = 10, **filters) -> List[Post]:
+        """
+        在本地全文索引中搜索已获取过的帖子
+        :param filters: since / until / author / platform / min_likes / min_engagement / sort，见 PostIndex.search
+        """
+        return self._get_post_index().search(query, limit=limit, **filters)
+    
+    def search(self, query: str, min_local_results: int = MIN_LOCAL_RESULTS, limit: int = 10, cache_ttl: Optional[float] = None, **filters) -> Dict:
+        """
+        先查本地索引，命中数不少于min_local_results时直接返回，否则再调用Tavily
+        :return: 与Tavily结果相同的结构，本地命中时带有 "local": True
+        """
+        posts = self.search_local(query, limit=limit, **filters)
+        if len(posts) >= min_local_results:
+            return self._local_result(query, posts)
+        
+        return self.search_via_tavily(query, cache_ttl=cache_ttl, platform=filters.get("platform"))
+    
+    def _local_result(self, query: str, posts: List[Post]) -> Dict:
+        """
+        把本地命中的帖子包装为与Tavily结果相同的结构
+        """
+        return {
+            "answer": f"本地索引中找到 {len(posts)} 条与“{query}”相关的帖子",
+            "sources": [
+                {"title": post.title or post.content[:50], "url": post.url, "content": post.content, "author": post.author}
+                for post in posts
+            ],
+            "local": True
+        }
+    
+    def build_tavily_query(self, platform: str, keyword: str = "") -> Optional[str]:
+        """
+        根据平台和关键词构建Tavily查询，不支持的平台返回None
+        """
+        # 归一化关键词的空白，让等价的关键词得到相同的查询
+        keyword = ' '.join(keyword.split())
+        platform = platform.strip().lower()
+        if platform == "xiaohongshu":
+            return f"小红书 {keyword}" if keyword else "小红书 热门内容"
+        elif platform == "xueqiu":
+            return f"雪球 {keyword}" if keyword else "雪球 热门讨论"
+        return None
     
-    def fetch_posts_with_tavily(self, platform: str, keyword: str = "") -> Dict:
+    def fetch_posts_with_tavily(self, platform: str, keyword: str = "", cache_ttl: Optional[float] = None,
+                                local_first: bool = False) -> Dict:
         """
         使用Tavily搜索获取社交平台内容
+        :param local_first: 先在本地索引中查找该平台下匹配关键词的帖子，命中足够时不调用Tavily
         """
-        if platform.lower() == "xiaohongshu":
-            query = f"小红书 {keyword}".strip() if keyword else "小红书 热门内容"
-        elif platform.lower() == "xueqiu":
-            query = f"雪球 {keyword}".strip() if keyword else "雪球 热门讨论"
-        else:
+        query = self.build_tavily_query(platform, keyword)
+        if query is None:
             return {"error": "不支持的平台"}
         
-        return self.search_via_tavily(query)
+        platform = platform.strip().lower()
+        if local_first and keyword.strip():
+            posts = self.search_local(keyword, platform=platform)
+            if len(posts) >= MIN_LOCAL_RESULTS:
+                return self._local_result(keyword, posts)
+        return self.search_via_tavily(query, cache_ttl=cache_ttl, platform=platform)
+    
+    def fetch_many_with_tavily(self, targets: List[Tuple[str, str]], concurrency: int = 4, cache_ttl: Optional[float] = None) -> List[Dict]:
+        """
+        并发获取多个 (平台, 关键词) 的内容，结果顺序与输入一致
+        """
+        queries = [self.build_tavily_query(platform, keyword) for platform, keyword in targets]
+        valid_queries = [query for query in queries if query is not None]
+        valid_platforms = [platform.strip().lower() for (platform, _), query in zip(targets, queries) if query is not None]
+        results = iter(self.search_many_via_tavily(valid_queries, concurrency=concurrency, cache_ttl=cache_ttl,
+                                                   platforms=valid_platforms))
+        return [next(results) if query is not None else {"error": "不支持的平台"} for query in queries]
 
 def main():
     fetcher = SocialMediaPostFetcher()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+本地帖子全文索引
+各获取器拿到的帖子写入SQLite FTS5索引，中文按二元组（bigram）切词、英文数字按词；
+支持按相关度/时间/互动量排序，以及按时间、作者、互动量过滤，命中时无需再调用Tavily
+"""
+
+import os
+import re
+import json
+import time
+import zlib
+import atexit
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from post_model import Post
+from xueqiu_pagination import to_epoch_ms
+
+DEFAULT_INDEX_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'openclaw')
+
+# 中文字符连续段，或英文/数字单词
+_TOKEN_PATTERN = re.compile(r'[一-鿿㐀-䶿]+|[a-z0-9]+')
+# HTML标签、实体和链接不参与索引
+_NOISE_PATTERN = re.compile(r'<[^>]+>|&[a-z]+;|https?://\S+')
+
+SORT_ORDERS = {
+    'relevance': 'rank',
+    'recent': 'p.created_at DESC',
+    'engagement': '(p.like_count + p.comment_count + p.retweet_count) DESC'
+}
+
+def tokenize(text: str) -> List[str]:
+    """
+    切词：中文连续段切成相邻两字的组合（单字段保留单字），英文数字按词并转小写
+    """
+    tokens = []
+    text = _NOISE_PATTERN.sub(' ', (text or '').lower())
+    for run in _TOKEN_PATTERN.findall(text):
+        if run[0] < '㐀' or len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+def _match_term(token: str) -> str:
+    # 索引中没有单个汉字，单字查询按前缀匹配二元组
+    term = '"%s"' % token.replace('"', '""')
+    return term + '*' if len(token) == 1 and token >= '㐀' else term
+
+def fts5_available() -> bool:
+    try:
+        conn = sqlite3.connect(':memory:')
+        conn.execute('CREATE VIRTUAL TABLE t USING fts5(x)')
+        conn.close()
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def post_key(post: Post) -> Optional[str]:
+    """
+    帖子的唯一键：优先使用帖子ID，其次URL
+    """
+    if post.id not in (None, ''):
+        return f"id:{post.id}"
+    if post.url:
+        return f"url:{post.url}"
+    return None
+
+class PostIndex:
+    def __init__(self, path: Optional[str] = None, flush_size: int = 200):
+        """
+        初始化索引
+        :param path: SQLite文件路径，默认位于 ~/.cache/openclaw（可用OPENCLAW_CACHE_DIR覆盖目录）
+        :param flush_size: 写入缓冲的条数，达到后批量写入磁盘；搜索前也会先写入
+        """
+        if path is None:
+            index_dir = os.environ.get('OPENCLAW_CACHE_DIR', DEFAULT_INDEX_DIR)
+            os.makedirs(index_dir, exist_ok=True)
+            path = os.path.join(index_dir, 'post_index.sqlite3')
+
+        self.path = path
+        self.flush_size = flush_size
+        self.available = fts5_available()
+        self._lock = threading.Lock()
+        self._buffer: Dict[str, Tuple[Post, Optional[str]]] = {}
+
+        if not self.available:
+            print("⚠️  当前SQLite不支持FTS5，本地索引已禁用")
+            self._conn = None
+            return
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS posts (
+                key TEXT PRIMARY KEY,
+                author TEXT,
+                created_at INTEGER,
+                like_count INTEGER NOT NULL DEFAULT 0,
+                comment_count INTEGER NOT NULL DEFAULT 0,
+                retweet_count INTEGER NOT NULL DEFAULT 0,
+                method TEXT,
+                platform TEXT,
+                data BLOB NOT NULL,
+                indexed_at REAL NOT NULL
+            )
+        ''')
+        # 旧版本建的表没有platform列，补上后旧帖子的平台为空，不会被按平台过滤的查询命中
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(posts)')}
+        if 'platform' not in columns:
+            self._conn.execute('ALTER TABLE posts ADD COLUMN platform TEXT')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_posts_created ON posts(created_at)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_posts_author ON posts(author)')
+        # 文本已预先切词并以空格分隔，unicode61只负责按空格拆分
+        self._conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(title, body, tokenize='unicode61')
+        ''')
+        self._conn.commit()
+
+    def add_posts(self, posts: Iterable[Post], platform: Optional[str] = None):
+        """
+        把帖子放入写入缓冲；相同键的帖子以最新一次为准（更新互动数据）
+        :param platform: 帖子所属平台（如 xueqiu / xiaohongshu），用于按平台过滤搜索
+        """
+        if not self.available:
+            return
+        with self._lock:
+            for post in posts:
+                key = post_key(post)
+                if key is not None:
+                    self._buffer[key] = (post, platform)
+            should_flush = len(self._buffer) >= self.flush_size
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """
+        把缓冲中的帖子写入磁盘
+        """
+        if not self.available:
+            return
+        with self._lock:
+            if not self._buffer:
+                return
+            pending, self._buffer = self._buffer, {}
+            now = time.time()
+            for key, (post, platform) in pending.items():
+                self._write(key, post, platform, now)
+            self._conn.commit()
+
+    def _write(self, key: str, post: Post, platform: Optional[str], now: float):
+        record = post.to_dict()
+        data = zlib.compress(json.dumps(record, ensure_ascii=False).encode('utf-8'), 1)
+        row = self._conn.execute('SELECT rowid FROM posts WHERE key = ?', (key,)).fetchone()
+        values = (post.author, post.created_at, post.like_count or 0, post.comment_count or 0,
+                  post.retweet_count or 0, post.method, platform, data, now)
+        if row is None:
+            cursor = self._conn.execute(
+                'INSERT INTO posts (author, created_at, like_count, comment_count, retweet_count, method, platform, data, indexed_at, key) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', values + (key,)
+            )
+            rowid = cursor.lastrowid
+        else:
+            rowid = row[0]
+            self._conn.execute(
+                'UPDATE posts SET author = ?, created_at = ?, like_count = ?, comment_count = ?, retweet_count = ?, '
+                'method = ?, platform = COALESCE(?, platform), data = ?, indexed_at = ? WHERE rowid = ?', values + (rowid,)
+            )
+            self._conn.execute('DELETE FROM posts_fts WHERE rowid = ?', (rowid,))
+        self._conn.execute(
+            'INSERT INTO posts_fts (rowid, title, body) VALUES (?, ?, ?)',
+            (rowid, ' '.join(tokenize(post.title)), ' '.join(tokenize(record.get('text') or record.get('description') or '')))
+        )
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        since=None,
+        until=None,
+        author: Optional[str] = None,
+        platform: Optional[str] = None,
+        min_likes: int = 0,
+        min_engagement: int = 0,
+        sort: str = 'relevance'
+    ) -> List[Post]:
+        """
+        搜索本地索引
+        :param query: 查询文本，所有切出的词都需命中
+        :param since: 发布时间下限（datetime或时间戳）
+        :param until: 发布时间上限（datetime或时间戳）
+        :param author: 作者名（精确匹配）
+        :param platform: 只返回该平台的帖子
+        :param min_likes: 最少点赞数
+        :param min_engagement: 点赞+评论+转发的最小总数
+        :param sort: relevance（BM25，标题权重更高）/ recent / engagement
+        """
+        if not self.available:
+            return []
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        self.flush()
+
+        conditions = ['posts_fts MATCH ?']
+        params: List = [' AND '.join(_match_term(token) for token in tokens)]
+        if since is not None:
+            conditions.append('p.created_at >= ?')
+            params.append(to_epoch_ms(since))
+        if until is not None:
+            conditions.append('p.created_at <= ?')
+            params.append(to_epoch_ms(until))
+        if author:
+            conditions.append('p.author = ?')
+            params.append(author)
+        if platform:
+            conditions.append('p.platform = ?')
+            params.append(platform)
+        if min_likes:
+            conditions.append('p.like_count >= ?')
+            params.append(min_likes)
+        if min_engagement:
+            conditions.append('p.like_count + p.comment_count + p.retweet_count >= ?')
+            params.append(min_engagement)
+        params.append(limit)
+
+        order = SORT_ORDERS.get(sort, SORT_ORDERS['relevance'])
+        sql = (
+            'SELECT p.data, bm25(posts_fts, 3.0, 1.0) AS rank FROM posts_fts '
+            'JOIN posts p ON p.rowid = posts_fts.rowid '
+            f"WHERE {' AND '.join(conditions)} ORDER BY {order} LIMIT ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [Post.from_dict(json.loads(zlib.decompress(data))) for data, _ in rows]
+
+    def count(self) -> int:
+        if not self.available:
+            return 0
+        self.flush()
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM posts').fetchone()[0]
+
+    def close(self):
+        if not self.available:
+            return
+        self.flush()
+        with self._lock:
+            self._conn.close()
+        self.available = False
+
+_default_index: Optional[PostIndex] = None
+_default_index_lock = threading.Lock()
+
+def get_default_index() -> PostIndex:
+    """
+    获取进程共享的默认索引，进程退出前自动写入缓冲
+    """
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = PostIndex()
+            atexit.register(_default_index.flush)
+        return _default_index
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+统一的帖子模型
+所有获取器（雪球接口、Tavily搜索、浏览器自动化）都返回 Post 对象
+常用字段存放在 __slots__ 中，正文、摘要、标签、完整用户信息等较少访问的字段合成一个元组，
+直接引用解码出的原对象而不重新编码或复制，四项都为空的帖子不占用额外对象
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+
+    def loads(data):
+        return orjson.loads(data)
+except ImportError:
+    try:
+        import msgspec
+
+        _msgspec_decoder = msgspec.json.Decoder()
+
+        def loads(data):
+            try:
+                return _msgspec_decoder.decode(data)
+            except msgspec.DecodeError as e:
+                # 与json/orjson保持一致，调用方统一捕获JSONDecodeError
+                raise json.JSONDecodeError(str(e), data if isinstance(data, str) else '', 0) from e
+    except ImportError:
+        def loads(data):
+            return json.loads(data)
+
+# 较少访问的字段在元组中的位置
+_EXTRA_NAMES = ('text', 'description', 'tags', 'user')
+
+class Post:
+    __slots__ = (
+        'id', 'author', 'author_id', 'title', 'created_at', 'time_text',
+        'like_count', 'comment_count', 'retweet_count', 'url', 'method', '_extra'
+    )
+
+    def __init__(
+        self,
+        id: Optional[int] = None,
+        author: str = '',
+        author_id: Optional[int] = None,
+        title: str = '',
+        created_at: Optional[int] = None,
+        time_text: str = '',
+        like_count: int = 0,
+        comment_count: int = 0,
+        retweet_count: int = 0,
+        url: str = '',
+        method: str = '',
+        text: str = '',
+        description: str = '',
+        tags: Optional[List] = None,
+        user: Optional[Dict] = None
+    ):
+        """
+        :param created_at: 发布时间（毫秒时间戳），来源没有结构化时间时为None
+        :param time_text: 来源提供的原始时间文本
+        :param method: 获取方式，如 direct_api / tavily_search / tavily_source / browser
+        """
+        self.id = id
+        self.author = author
+        self.author_id = author_id
+        self.title = title
+        self.created_at = created_at
+        self.time_text = time_text
+        self.like_count = like_count
+        self.comment_count = comment_count
+        self.retweet_count = retweet_count
+        self.url = url
+        self.method = method
+        # 四项都为空时不创建元组
+        self._extra = (text, description, tags, user) if (text or description or tags or user) else None
+
+    @classmethod
+    def from_status(cls, status: Dict, method: str = 'direct_api') -> 'Post':
+        """
+        从雪球接口返回的status构建
+        """
+        user = status.get('user') or {}
+        return cls(
+            id=status.get('id'),
+            author=user.get('screen_name') or '',
+            author_id=user.get('id'),
+            title=status.get('title') or '',
+            created_at=status.get('created_at'),
+            like_count=status.get('like_count') or 0,
+            comment_count=status.get('comment_count') or status.get('reply_count') or 0,
+            retweet_count=status.get('retweet_count') or 0,
+            url=f"https://xueqiu.com{status.get('target', '')}",
+            method=method,
+            text=status.get('text') or '',
+            description=status.get('description') or '',
+            tags=status.get('tags') or None,
+            user=user or None
+        )
+
+    @classmethod
+    def from_tavily_answer(cls, query: str, answer: str) -> 'Post':
+        """
+        把Tavily生成的摘要包装为帖子
+        """
+        return cls(
+            title=f"Tavily搜索: {query}",
+            author='Tavily搜索结果',
+            time_text='N/A',
+            url='N/A',
+            method='tavily_search',
+            text=answer
+        )
+
+    @classmethod
+    def from_tavily_source(cls, source: Dict, max_content: int = 500) -> 'Post':
+        """
+        把Tavily返回的来源包装为帖子
+        """
+        return cls(
+            title=source.get('title', '无标题'),
+            author='Tavily来源',
+            time_text='N/A',
+            url=source.get('url', 'N/A'),
+            method='tavily_source',
+            text=source.get('content', '无内容')[:max_content]
+        )
+
+    @classmethod
+    def from_parsed(cls, parsed: Dict, method: str = 'browser') -> 'Post':
+        """
+        从浏览器页面解析结果构建
+        """
+        return cls(
+            id=parsed.get('id'),
+            author=parsed.get('author', ''),
+            title=parsed.get('title', ''),
+            created_at=parsed.get('created_at'),
+            time_text=parsed.get('time_info', ''),
+            like_count=parsed.get('like_count', 0),
+            comment_count=parsed.get('comment_count', 0),
+            retweet_count=parsed.get('retweet_count', 0),
+            url=parsed.get('url', ''),
+            method=method,
+            text=parsed.get('content', '')
+        )
+
+    @property
+    def text(self) -> str:
+        return (self._extra[0] or '') if self._extra else ''
+
+    @property
+    def description(self) -> str:
+        return (self._extra[1] or '') if self._extra else ''
+
+    @property
+    def tags(self) -> List:
+        return (self._extra[2] or []) if self._extra else []
+
+    @property
+    def user(self) -> Dict:
+        return (self._extra[3] or {}) if self._extra else {}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Post':
+        """
+        从 to_dict 的结果还原，忽略未知字段
+        """
+        return cls(**{key: value for key, value in data.items() if key in _FIELDS})
+
+    @property
+    def content(self) -> str:
+        """
+        正文，没有正文时使用摘要
+        """
+        return self.text or self.description
+
+    @property
+    def display_time(self) -> str:
+        """
+        用于展示的发布时间
+        """
+        if isinstance(self.created_at, (int, float)):
+            return datetime.fromtimestamp(self.created_at / 1000).strftime('%Y-%m-%d %H:%M')
+        return self.time_text or '未知时间'
+
+    def to_dict(self) -> Dict:
+        """
+        转换为普通字典（用于序列化）
+        """
+        data = {name: getattr(self, name) for name in self.__slots__ if name != '_extra'}
+        if self._extra:
+            data.update((name, value) for name, value in zip(_EXTRA_NAMES, self._extra) if value)
+        return data
+
+    # 兼容旧代码中按字典方式访问帖子的写法
+    _ALIASES = {
+        'time': 'display_time', 'likes': 'like_count',
+        'comments': 'comment_count', 'shares': 'retweet_count', 'href': 'url',
+        'time_info': 'time_text'
+    }
+
+    def get(self, key: str, default: Any = None) -> Any:
+        name = self._ALIASES.get(key, key)
+        if name.startswith('_'):
+            return default
+        value = getattr(self, name, None)
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        # 已知字段的值为None时返回None，只有未知的键才抛出KeyError
+        name = self._ALIASES.get(key, key)
+        if name not in _KNOWN_KEYS:
+            raise KeyError(key)
+        return getattr(self, name)
+
+    def __repr__(self) -> str:
+        return f"Post(id={self.id!r}, author={self.author!r}, title={self.title[:30]!r}, method={self.method!r})"
+
+_FIELDS = frozenset(name for name in Post.__slots__ if name != '_extra') | frozenset(_EXTRA_NAMES)
+_KNOWN_KEYS = _FIELDS | {'content', 'display_time'}
+
+def extract_statuses(data: Any) -> List:
+    """
+    根据不同API返回格式提取帖子列表
+    """
+    items = []
+    if isinstance(data, list):
+        items = data
+    elif isinstance(data, dict):
+        if 'statuses' in data:
+            items = data['statuses'] or []
+        elif 'list' in data:
+            items = data['list'] or []
+    return [_unwrap_status(item) for item in items]
+
+def _unwrap_status(item: Any) -> Any:
+    """
+    部分时间线接口（如public_timeline_by_category）把status序列化成字符串放在data字段里
+    """
+    if isinstance(item, dict) and isinstance(item.get('data'), str) and 'user' not in item:
+        try:
+            status = loads(item['data'])
+        except ValueError:
+            return item
+        if isinstance(status, dict):
+            return status
+    return item
+
+def decode_posts(body: bytes, limit: Optional[int] = None, method: str = 'direct_api') -> List[Post]:
+    """
+    直接从响应字节解码出帖子列表
+    :param limit: 最多解码的帖子数
+    """
+    statuses = extract_statuses(loads(body))
+    if limit is not None:
+        statuses = statuses[:limit]
+    return [Post.from_status(status, method=method) for status in statuses if isinstance(status, dict)]
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+帖子热度排序
+把一批帖子的点赞、评论、转发数和发布时长整理成数组，一次向量化计算带时间衰减的热度分，
+再用部分排序选出前k个；只有入选的帖子才需要格式化
+安装了numpy时使用向量化实现，否则退回纯Python（heapq）实现，结果相同
+"""
+
+import math
+import heapq
+import time
+from typing import List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class HotnessWeights:
+    """
+    热度计算参数
+    热度 = log(1 + 点赞×like + 评论×comment + 转发×retweet) × 0.5^(发布时长/半衰期)
+    """
+
+    def __init__(self, like: float = 1.0, comment: float = 2.0, retweet: float = 3.0,
+                 half_life_hours: float = 6.0, missing_age_hours: Optional[float] = None):
+        """
+        :param half_life_hours: 热度减半所需的小时数
+        :param missing_age_hours: 没有发布时间的帖子按多少小时计算，默认取一个半衰期
+        """
+        self.like = like
+        self.comment = comment
+        self.retweet = retweet
+        self.half_life_hours = half_life_hours
+        self.missing_age_hours = half_life_hours if missing_age_hours is None else missing_age_hours
+
+DEFAULT_WEIGHTS = HotnessWeights()
+
+def _now_ms(now) -> float:
+    if now is None:
+        return time.time() * 1000
+    return now * 1000 if now < 1e11 else float(now)
+
+def hotness_scores(posts: Sequence, now: Optional[float] = None, weights: HotnessWeights = DEFAULT_WEIGHTS):
+    """
+    计算每个帖子的热度分
+    :param now: 当前时间（秒或毫秒时间戳），默认取当前时间
+    :return: 安装numpy时为float64数组，否则为列表，顺序与输入一致
+    """
+    now_ms = _now_ms(now)
+    hour_ms = 3600 * 1000.0
+    missing_ms = now_ms - weights.missing_age_hours * hour_ms
+
+    if np is not None:
+        count = len(posts)
+        likes = np.fromiter((post.like_count or 0 for post in posts), dtype=np.float64, count=count)
+        comments = np.fromiter((post.comment_count or 0 for post in posts), dtype=np.float64, count=count)
+        retweets = np.fromiter((post.retweet_count or 0 for post in posts), dtype=np.float64, count=count)
+        created = np.fromiter(
+            (post.created_at if isinstance(post.created_at, (int, float)) else missing_ms for post in posts),
+            dtype=np.float64, count=count
+        )
+        engagement = weights.like * likes + weights.comment * comments + weights.retweet * retweets
+        age_hours = np.maximum(now_ms - created, 0.0) / hour_ms
+        return np.log1p(np.maximum(engagement, 0.0)) * np.exp2(-age_hours / weights.half_life_hours)
+
+    scores = []
+    for post in posts:
+        engagement = (weights.like * (post.like_count or 0) + weights.comment * (post.comment_count or 0)
+                      + weights.retweet * (post.retweet_count or 0))
+        created = post.created_at if isinstance(post.created_at, (int, float)) else missing_ms
+        age_hours = max(now_ms - created, 0.0) / hour_ms
+        scores.append(math.log1p(max(engagement, 0.0)) * 2.0 ** (-age_hours / weights.half_life_hours))
+    return scores
+
+def select_top_k(scores, k: int) -> List[int]:
+    """
+    选出分数最高的k个下标（按分数从高到低，分数相同时保持原顺序）
+    numpy下先用argpartition部分排序，只对入选的k个做完整排序
+    """
+    count = len(scores)
+    if k <= 0 or count == 0:
+        return []
+    k = min(k, count)
+
+    if np is not None:
+        values = np.asarray(scores, dtype=np.float64)
+        if k < count:
+            # 第k大的分数作为门槛；与门槛同分的都保留为候选，保证同分时按原顺序取舍
+            threshold = -np.partition(-values, k - 1)[k - 1]
+            candidates = np.flatnonzero(values >= threshold)
+        else:
+            candidates = np.arange(count)
+        order = np.argsort(-values[candidates], kind='stable')[:k]
+        return candidates[order].tolist()
+
+    return heapq.nsmallest(k, range(count), key=lambda i: (-scores[i], i))
+
+def rank_posts(posts: Sequence, k: Optional[int] = None, now: Optional[float] = None,
+               weights: HotnessWeights = DEFAULT_WEIGHTS) -> List:
+    """
+    按热度排序并返回前k个帖子（k为None时返回全部）
+    """
+    posts = list(posts)
+    scores = hotness_scores(posts, now=now, weights=weights)
+    indices = select_top_k(scores, len(posts) if k is None else k)
+    return [posts[i] for i in indices]
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+推送投递管道
+抓取任务只把消息放入有界队列，后台线程在刷新窗口内把多条消息合并成一次投递；
+投递失败按退避重试，目标端变慢时队列积压会自动形成更大的批次；
+队列满时默认丢弃最旧的消息（计数并记录日志），抓取任务不会被投递阻塞，也可以选择有上限地等待队列腾出空间
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from http_transport import create_session
+
+class StdoutSink:
+    """
+    打印到标准输出（本地调试/演示用）
+    """
+
+    def send(self, messages: List[str]):
+        for message in messages:
+            print(message)
+
+class FileSink:
+    """
+    追加写入文件，每批消息之间用分隔线隔开
+    """
+
+    def __init__(self, path: str, separator: str = '-' * 50):
+        self.path = path
+        self.separator = separator
+
+    def send(self, messages: List[str]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(messages))
+            f.write(f"\n{self.separator}\n")
+
+class WebhookSink:
+    """
+    以JSON POST到HTTP Webhook：{"text": 合并后的文本, "count": 消息条数, "messages": [...]}
+    非2xx响应视为投递失败
+    """
+
+    def __init__(self, url: str, timeout: float = 10, headers: Optional[Dict] = None):
+        self.url = url
+        self.timeout = timeout
+        self.session = create_session(headers=headers)
+
+    def send(self, messages: List[str]):
+        payload = {'text': '\n\n'.join(messages), 'count': len(messages), 'messages': messages}
+        response = self.session.post(
+            self.url,
+            data=json.dumps(payload, ensure_ascii=False).encode('utf-8'),
+            headers={'Content-Type': 'application/json; charset=utf-8'},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+
+# 队列满时的处理方式
+OVERFLOW_POLICIES = ('drop_oldest', 'block')
+
+class DeliveryPipeline:
+    def __init__(
+        self,
+        sink,
+        max_queue: int = 200,
+        max_batch: int = 20,
+        flush_interval: float = 2.0,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+        overflow: str = 'drop_oldest',
+        block_timeout: Optional[float] = 5.0
+    ):
+        """
+        :param sink: 投递目标，需提供 send(messages: List[str])，失败时抛出异常
+        :param max_queue: 队列中最多等待的消息数，超出时丢弃最旧的消息
+        :param max_batch: 单次投递最多合并的消息数
+        :param flush_interval: 刷新窗口（秒），首条消息到达后最多等待这么久再投递
+        :param max_retries: 单批消息的最大重试次数
+        :param retry_backoff: 重试退避基数（秒），第n次重试等待 retry_backoff * 2^(n-1)
+        :param overflow: 队列满时的处理方式：drop_oldest 立即丢弃最旧的消息；
+                         block 等待后台线程腾出空间，最多等待block_timeout秒，超时后仍丢弃最旧的消息
+        :param block_timeout: block模式下submit的默认最长等待时间（秒），None表示一直等待
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"未知的队列溢出处理方式: {overflow}")
+        self.sink = sink
+        self.max_queue = max_queue
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+
+        self.submitted = 0
+        self.delivered = 0
+        self.batches = 0
+        self.retries = 0
+        self.failed = 0
+        self.dropped = 0
+
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._closing = False
+        self._worker = threading.Thread(target=self._run, name='push-delivery', daemon=True)
+        self._worker.start()
+
+    def submit(self, message: str, timeout: Optional[float] = None) -> bool:
+        """
+        放入投递队列；队列已满时按overflow处理（立即或等待超时后丢弃最旧的一条）
+        :param timeout: block模式下本次最长等待时间（秒），不提供则使用block_timeout
+        :return: 是否有旧消息因队列已满被丢弃
+        """
+        with self._cond:
+            if self.overflow == 'block' and len(self._pending) >= self.max_queue:
+                wait = self.block_timeout if timeout is None else timeout
+                deadline = None if wait is None else time.monotonic() + wait
+                while len(self._pending) >= self.max_queue and not self._closing:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            if self._closing:
+                raise RuntimeError("投递管道已关闭")
+            dropped = False
+            if len(self._pending) >= self.max_queue:
+                lost = self._pending.popleft()
+                self.dropped += 1
+                dropped = True
+                preview = lost.strip().split('\n', 1)[0][:60]
+                logging.warning(f"推送队列已满，丢弃最旧的一条消息（累计丢弃 {self.dropped} 条）: {preview}")
+            self._pending.append(message)
+            self.submitted += 1
+            self._cond.notify()
+            return dropped
+
+    def _next_batch(self) -> List[str]:
+        """
+        等待首条消息，然后在刷新窗口内继续收集，直到凑满一批或窗口结束
+        """
+        with self._cond:
+            while not self._pending and not self._closing:
+                self._cond.wait()
+            if not self._pending:
+                return []
+
+            deadline = time.monotonic() + self.flush_interval
+            while len(self._pending) < self.max_batch and not self._closing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            count = min(self.max_batch, len(self._pending))
+            batch = [self._pending.popleft() for _ in range(count)]
+            # 唤醒在block模式下等待队列空间的submit
+            self._cond.notify_all()
+            return batch
+
+    def _deliver(self, batch: List[str]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.sink.send(batch)
+                self.delivered += len(batch)
+                self.batches += 1
+                return
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    self.failed += len(batch)
+                    logging.error(f"推送 {len(batch)} 条消息失败，已放弃: {e}")
+                    return
+                self.retries += 1
+                delay = self.retry_backoff * (2 ** attempt)
+                logging.warning(f"推送失败，{delay:.1f}秒后重试: {e}")
+                with self._cond:
+                    # 关闭时不再长时间等待
+                    if not self._closing:
+                        self._cond.wait(delay)
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            self._deliver(batch)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待队列中已有的消息投递完（不关闭管道）
+        :return: 是否在超时前清空
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if not self._pending and not self._busy():
+                    return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+    def _busy(self) -> bool:
+        return self.submitted - self.dropped > self.delivered + self.failed
+
+    def close(self, timeout: Optional[float] = 30):
+        """
+        停止接收新消息，立即投递剩余消息后结束后台线程
+        """
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._worker.join(timeout)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            queued = len(self._pending)
+        return {
+            'submitted': self.submitted,
+            'delivered': self.delivered,
+            'batches': self.batches,
+            'avg_batch': round(self.delivered / self.batches, 2) if self.batches else 0.0,
+            'retries': self.retries,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'queued': queued
+        }
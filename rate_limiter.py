@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+自适应令牌桶限流器
+按主机共享，进程内所有客户端共用；遇到429和Retry-After时自动降速，之后逐步恢复
+"""
+
+import time
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+# 各主机的默认限流配置：(初始速率 请求/秒, 突发容量, 最大速率 请求/秒)
+HOST_LIMITS = {
+    'xueqiu.com': (2.0, 5, 10.0),
+    'api.tavily.com': (5.0, 10, 20.0)
+}
+DEFAULT_LIMIT = (10.0, 20, 50.0)
+
+class AdaptiveTokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_rate: Optional[float] = None,
+        min_rate: float = 0.1,
+        decrease_factor: float = 0.5,
+        increase_fraction: float = 0.05
+    ):
+        """
+        :param rate: 初始速率（请求/秒）
+        :param burst: 桶容量，即允许的突发请求数
+        :param max_rate: 速率恢复的上限，默认等于初始速率
+        :param min_rate: 降速的下限
+        :param decrease_factor: 每次限流事件速率乘以该系数（乘性降速）；
+            同一批并发请求的多个429只算一次事件
+        :param increase_fraction: 每次成功响应后速率增加 max_rate 的这一比例（加性恢复）
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_rate = max_rate if max_rate is not None else rate
+        self.min_rate = min_rate
+        self.decrease_factor = decrease_factor
+        self.increase_step = self.max_rate * increase_fraction
+
+        self.throttled = 0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = float('-inf')
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        获取一个令牌，必要时阻塞等待
+        :param timeout: 最长等待时间（秒），None表示一直等待
+        :return: 是否成功获取
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._paused_until:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return True
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    wait = self._paused_until - now
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def on_response(self, status_code: int, retry_after: Optional[str] = None,
+                    sent_at: Optional[float] = None) -> float:
+        """
+        根据响应调整速率
+        :param sent_at: 请求发出时的 time.monotonic()；在上次降速之前发出的请求返回的429
+            属于同一次限流事件，只延长暂停，不再降速。未提供时以是否处于暂停期判断
+        :return: 收到限流响应时需要暂停的秒数，否则为0
+        """
+        with self._lock:
+            now = time.monotonic()
+            if status_code == 429 or (status_code == 503 and retry_after):
+                self.throttled += 1
+                if sent_at is not None:
+                    same_event = sent_at < self._last_decrease
+                else:
+                    same_event = now < self._paused_until
+                if not same_event:
+                    self._refill(now)
+                    self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                    self._last_decrease = now
+                self._tokens = 0.0
+                pause = parse_retry_after(retry_after)
+                if pause is None:
+                    pause = 1.0 / self.rate
+                self._paused_until = max(self._paused_until, now + pause)
+                return pause
+
+            if status_code < 400 and self.rate < self.max_rate:
+                self._refill(now)
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+            return 0.0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'rate': self.rate,
+                'max_rate': self.max_rate,
+                'throttled': self.throttled,
+                'paused_for': max(0.0, self._paused_until - time.monotonic())
+            }
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析Retry-After头，支持秒数和HTTP日期两种格式
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def _limit_for(host: str) -> Tuple[str, Tuple[float, int, float]]:
+    """
+    找到主机对应的配置；子域名与主域名共用同一个限流器，有多个匹配时取最长（最具体）的配置
+    """
+    best = None
+    for suffix in HOST_LIMITS:
+        if (host == suffix or host.endswith('.' + suffix)) and (best is None or len(suffix) > len(best)):
+            best = suffix
+    if best is None:
+        return host, DEFAULT_LIMIT
+    return best, HOST_LIMITS[best]
+
+def get_limiter(host: str) -> AdaptiveTokenBucket:
+    """
+    获取主机对应的共享限流器
+    """
+    key, (rate, burst, max_rate) = _limit_for(host.lower())
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = AdaptiveTokenBucket(rate, burst, max_rate=max_rate)
+            _limiters[key] = limiter
+        return limiter
+
+def configure_host(host: str, rate: float, burst: int, max_rate: Optional[float] = None):
+    """
+    设置主机的限流配置，替换已有的限流器；
+    该主机的子域名此前按默认配置创建的限流器也一并丢弃，之后改用新配置
+    """
+    host = host.lower()
+    HOST_LIMITS[host] = (rate, burst, max_rate if max_rate is not None else rate)
+    with _limiters_lock:
+        for key in list(_limiters):
+            if key == host or (key.endswith('.' + host) and key not in HOST_LIMITS):
+                del _limiters[key]
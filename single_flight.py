@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+请求合并（single-flight）
+同一时刻对同一个键的多个请求只真正执行一次，其余调用方等待并共享这次的结果或异常；
+调用结束后立即移除记录，之后的请求会重新执行（缓存由调用方自行负责）
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+# 不参与合并键的请求参数（时间戳类的防缓存参数）
+CACHE_BUSTER_PARAMS = ('t', '_')
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        执行 fn(*args, **kwargs)；如果相同键的调用正在进行，则等待并返回它的结果
+        结果对象会被所有调用方共享，调用方不应修改它
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict:
+        """
+        executions: 实际执行次数；shared: 通过合并省下的次数
+        """
+        total = self.executions + self.shared
+        return {
+            'executions': self.executions,
+            'shared': self.shared,
+            'shared_rate': self.shared / total if total else 0.0,
+            'in_flight': self.in_flight()
+        }
+
+def _normalize(value):
+    if isinstance(value, str):
+        return ' '.join(value.split())
+    return value
+
+def request_key(method: str, url: str, params: Optional[Dict] = None, identity: Hashable = None,
+                ignore: Iterable[str] = CACHE_BUSTER_PARAMS) -> tuple:
+    """
+    生成请求的合并键：参数排序、字符串空白归一化，并去掉防缓存参数
+    :param identity: 区分不同登录身份的值（如用户ID），不同身份的请求不会被合并
+    """
+    ignored = set(ignore)
+    items = tuple(sorted(
+        (str(name), str(_normalize(value)))
+        for name, value in (params or {}).items()
+        if name not in ignored
+    ))
+    return (method.upper(), url, items, identity)
+
+_default_flight: Optional[SingleFlight] = None
+_default_flight_lock = threading.Lock()
+
+def get_default_flight() -> SingleFlight:
+    """
+    获取进程共享的合并器，让不同的获取器实例之间也能合并相同的请求
+    """
+    global _default_flight
+    with _default_flight_lock:
+        if _default_flight is None:
+            _default_flight = SingleFlight()
+        return _default_flight
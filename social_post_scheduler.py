@@ -4,76 +4,174 @@
 使用cron或其他调度系统定期推送小红书和雪球的帖子
 """
 
-import time
-import schedule
+import asyncio
 import logging
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from post_fetcher import SocialMediaPostFetcher
+from crawl_state import CrawlState
+from async_scheduler import AsyncScheduler
+from push_delivery import DeliveryPipeline, StdoutSink
+from near_duplicate import NearDuplicateIndex, post_text
+from post_ranking import select_top_k
+from post_archive import PostArchive, get_default_archive
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# 各定时任务的运行间隔（秒）
+XIAOHONGSHU_HOT_INTERVAL = 3600
+XUEQIU_HOT_INTERVAL = 1800
+DAILY_INTERVAL = 86400
+
+# Tavily结果缓存只用来吸收同一次运行内重叠或重试的等价查询，时长必须短于任务间隔：
+# 否则下一次运行会拿到上一次的同一份结果，来源全部被已推送集合过滤掉，等于隔一次才真正刷新
+CACHE_TTL_FRACTION = 0.5
+MAX_CACHE_TTL = 600
+
+def cache_ttl_for(interval: float) -> float:
+    """
+    由任务间隔推出Tavily缓存时长
+    """
+    return min(interval * CACHE_TTL_FRACTION, MAX_CACHE_TTL)
+
+HOT_FEED_TTL = cache_ttl_for(XUEQIU_HOT_INTERVAL)
+TOPIC_TTL = cache_ttl_for(DAILY_INTERVAL)
+
 class SocialPostScheduler:
-    def __init__(self):
+    def __init__(self, crawl_state: Optional[CrawlState] = None, max_concurrency: int = 4, jitter: float = 30.0,
+                 delivery: Optional[DeliveryPipeline] = None, near_duplicates: Optional[NearDuplicateIndex] = None,
+                 archive: Optional[PostArchive] = None):
+        """
+        :param crawl_state: 增量抓取状态，用于跳过已经推送过的来源，不提供则使用默认状态文件
+        :param max_concurrency: 同时运行的定时任务数上限
+        :param jitter: 周期任务的随机抖动（秒），避免多个任务同时发起请求
+        :param delivery: 推送投递管道（可接Webhook/文件），不提供则批量打印到标准输出
+        :param near_duplicates: 近似重复索引，用于丢弃与最近推送内容几乎相同的来源（如不同URL的同一篇文章）
+        :param archive: 帖子归档，调度器每分钟检查一次并写出等待过久的缓冲，不提供则使用默认归档
+        """
         self.fetcher = SocialMediaPostFetcher()
+        self.crawl_state = crawl_state if crawl_state is not None else CrawlState()
+        self.scheduler = AsyncScheduler(max_concurrency=max_concurrency, default_jitter=jitter)
+        self.delivery = delivery if delivery is not None else DeliveryPipeline(StdoutSink())
+        self.near_duplicates = near_duplicates if near_duplicates is not None else NearDuplicateIndex()
+        self.archive = archive if archive is not None else get_default_archive()
         self.platform_keywords = {
             "xiaohongshu": ["热门", "生活方式", "美妆", "时尚"],
             "xueqiu": ["热门讨论", "股票", "投资", "市场"]
         }
     
-    def fetch_and_push_posts(self, platform: str, keyword: str = ""):
+    def fetch_and_push_posts(self, platform: str, keyword: str = "", cache_ttl: Optional[float] = None) -> bool:
         """
         获取并推送帖子
+        :param cache_ttl: 本次查询的Tavily缓存有效期（秒），不提供则使用缓存默认值
+        :return: 是否有消息加入推送队列
         """
         try:
             logging.info(f"开始获取 {platform} {keyword} 相关内容")
             
-            result = self.fetcher.fetch_posts_with_tavily(platform, keyword)
+            result = self.fetcher.fetch_posts_with_tavily(platform, keyword, cache_ttl=cache_ttl)
+            return self.push_result(platform, keyword, result)
+            
+        except Exception as e:
+            logging.error(f"推送 {platform} 内容时出错: {e}")
+            return False
+    
+    def fetch_and_push_many(self, targets: List[Tuple[str, str]], concurrency: int = 4,
+                            cache_ttl: Optional[float] = None):
+        """
+        并发获取多个 (平台, 关键词) 的内容，然后依次推送
+        :param cache_ttl: 本次查询的Tavily缓存有效期（秒），不提供则使用缓存默认值
+        """
+        try:
+            logging.info(f"开始并发获取 {len(targets)} 组内容")
+            
+            results = self.fetcher.fetch_many_with_tavily(targets, concurrency=concurrency, cache_ttl=cache_ttl)
+            for (platform, keyword), result in zip(targets, results):
+                self.push_result(platform, keyword, result)
             
+        except Exception as e:
+            logging.error(f"批量推送内容时出错: {e}")
+    
+    def push_result(self, platform: str, keyword: str, result: Dict) -> bool:
+        """
+        推送单个搜索结果
+        :return: 是否有消息加入推送队列（获取失败或没有新内容时为False）
+        """
+        try:
             if "error" in result:
                 logging.error(f"获取 {platform} 内容失败: {result['error']}")
-                return
+                return False
             
             summary = result.get("answer", "未获取到摘要")
             sources = result.get("sources", [])
             
-            # 这里模拟推送消息（实际应用中会调用message工具）
-            print(f"\n📢 [{datetime.now().strftime('%H:%M:%S')}] 推送 {platform} 内容:")
-            print(f"🔍 关键词: {keyword or '默认'}")
-            print(f"📝 摘要: {summary[:200]}...")
-            
+            # 只推送之前没有推送过的来源
             if sources:
-                print(f"🔗 来源链接:")
-                for i, source in enumerate(sources[:3], 1):  # 只显示前3个来源
-                    print(f"  {i}. {source.get('title', '无标题')}")
-                    print(f"     {source.get('url', '无链接')}")
-            else:
-                print("💡 提示: 可以通过以下方式获取更详细内容:")
-                if platform == "xiaohongshu":
-                    print("   - 访问 https://www.xiaohongshu.com/")
-                elif platform == "xueqiu":
-                    print("   - 访问 https://xueqiu.com/")
+                sources = self.crawl_state.filter_new(sources, key=lambda source: f"url:{source.get('url')}")
+                sources = self.near_duplicates.filter_new(sources, text=post_text, label=lambda source: source.get('url'))
+                if not sources:
+                    logging.info(f"{platform} {keyword} 没有新内容，跳过推送")
+                    return False
+            
+            # 放入投递队列，由后台线程批量推送，慢速的推送端不会阻塞抓取
+            self.delivery.submit(self.format_message(platform, keyword, summary, sources))
             
-            logging.info(f"成功推送 {platform} 内容")
+            logging.info(f"{platform} 内容已加入推送队列")
+            return True
             
         except Exception as e:
             logging.error(f"推送 {platform} 内容时出错: {e}")
+            return False
+    
+    def format_message(self, platform: str, keyword: str, summary: str, sources: List[Dict]) -> str:
+        """
+        生成推送消息文本
+        """
+        lines = [
+            f"\n📢 [{datetime.now().strftime('%H:%M:%S')}] 推送 {platform} 内容:",
+            f"🔍 关键词: {keyword or '默认'}",
+            f"📝 摘要: {summary[:200]}..."
+        ]
+        
+        if sources:
+            lines.append("🔗 来源链接:")
+            # 只显示相关度最高的3个来源
+            top = [sources[j] for j in select_top_k([source.get('score') or 0.0 for source in sources], 3)]
+            for i, source in enumerate(top, 1):
+                lines.append(f"  {i}. {source.get('title', '无标题')}")
+                lines.append(f"     {source.get('url', '无链接')}")
+        else:
+            lines.append("💡 提示: 可以通过以下方式获取更详细内容:")
+            if platform == "xiaohongshu":
+                lines.append("   - 访问 https://www.xiaohongshu.com/")
+            elif platform == "xueqiu":
+                lines.append("   - 访问 https://xueqiu.com/")
+        
+        return '\n'.join(lines)
     
     def schedule_posts(self):
         """
         设置定时任务
         """
         # 每小时获取一次小红书热门内容
-        schedule.every().hour.do(self.fetch_and_push_posts, "xiaohongshu", "热门")
+        self.scheduler.every(XIAOHONGSHU_HOT_INTERVAL, self.fetch_and_push_posts, "xiaohongshu", "热门",
+                             name="xiaohongshu:热门", cache_ttl=cache_ttl_for(XIAOHONGSHU_HOT_INTERVAL))
         
         # 每30分钟获取一次雪球热门讨论
-        schedule.every(30).minutes.do(self.fetch_and_push_posts, "xueqiu", "热门讨论")
+        self.scheduler.every(XUEQIU_HOT_INTERVAL, self.fetch_and_push_posts, "xueqiu", "热门讨论",
+                             name="xueqiu:热门讨论", cache_ttl=cache_ttl_for(XUEQIU_HOT_INTERVAL))
         
-        # 每天上午9点推送美妆相关内容
-        schedule.every().day.at("09:00").do(self.fetch_and_push_posts, "xiaohongshu", "美妆")
+        # 每天上午9点推送美妆相关内容（定点任务不加抖动）
+        self.scheduler.daily_at("09:00", self.fetch_and_push_posts, "xiaohongshu", "美妆", name="xiaohongshu:美妆", jitter=0,
+                                cache_ttl=TOPIC_TTL)
         
         # 每天下午2点推送投资相关内容
-        schedule.every().day.at("14:00").do(self.fetch_and_push_posts, "xueqiu", "股票投资")
+        self.scheduler.daily_at("14:00", self.fetch_and_push_posts, "xueqiu", "股票投资", name="xueqiu:股票投资", jitter=0,
+                                cache_ttl=TOPIC_TTL)
+        
+        # 每分钟检查一次归档缓冲，抓取间隔很长时也能及时落盘
+        self.scheduler.every(60, self.archive.flush_if_due, name="archive:flush", jitter=0)
         
         logging.info("✅ 定时任务已设置完成")
         logging.info("📌 小红书内容将每小时推送一次")
@@ -93,9 +191,15 @@ class SocialPostScheduler:
         print("   - 由于访问限制，通过Tavily搜索获取公开信息")
         print("   - 实际部署时，会通过message工具推送给您")
         
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # 每分钟检查一次
+        try:
+            asyncio.run(self.scheduler.run())
+        finally:
+            self.delivery.close()
+            self.archive.flush()
+            logging.info(f"推送统计: {self.delivery.stats()}")
+            for name, stats in self.scheduler.stats().items():
+                logging.info(f"任务 {name}: 运行 {stats['runs']} 次, 失败 {stats['failures']} 次, "
+                             f"平均耗时 {stats['avg_latency']}s, 最大延迟 {stats['max_lag']}s")
 
 def main():
     scheduler = SocialPostScheduler()
@@ -106,9 +210,8 @@ def main():
     try:
         # 立即运行一次演示
         print("\n🔄 执行一次演示推送...")
-        scheduler.fetch_and_push_posts("xiaohongshu", "热门")
-        time.sleep(2)
-        scheduler.fetch_and_push_posts("xueqiu", "热门讨论")
+        scheduler.fetch_and_push_many([("xiaohongshu", "热门"), ("xueqiu", "热门讨论")], cache_ttl=HOT_FEED_TTL)
+        scheduler.delivery.flush(timeout=10)
         
         print(f"\n✅ 演示完成!")
         print("💡 要启动定时推送服务，请运行: python social_post_scheduler.py")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Tavily搜索结果缓存
+基于SQLite的持久化TTL/LRU缓存，进程重启后在有效期内仍可直接命中
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'openclaw')
+
+class TavilyCache:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        default_ttl: float = 600,
+        max_entries: int = 2000,
+        max_bytes: int = 50 * 1024 * 1024
+    ):
+        """
+        初始化缓存
+        :param path: SQLite文件路径，默认位于 ~/.cache/openclaw（可用OPENCLAW_CACHE_DIR覆盖目录）
+        :param default_ttl: 默认有效期（秒）
+        :param max_entries: 最多保留的条目数，超出时按最近访问时间淘汰
+        :param max_bytes: 压缩后数据的总大小上限（字节）
+        """
+        if path is None:
+            cache_dir = os.environ.get('OPENCLAW_CACHE_DIR', DEFAULT_CACHE_DIR)
+            os.makedirs(cache_dir, exist_ok=True)
+            path = os.path.join(cache_dir, 'tavily_cache.sqlite3')
+
+        self.path = path
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)')
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(payload: Dict) -> str:
+        """
+        根据请求参数生成缓存键
+        去掉api_key，并对查询做空白归一化，保证等价请求得到相同的键
+        """
+        normalized = {k: v for k, v in payload.items() if k != 'api_key'}
+        if isinstance(normalized.get('query'), str):
+            normalized['query'] = ' '.join(normalized['query'].split())
+        raw = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        读取缓存，未命中或已过期返回None
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, expires_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(zlib.decompress(row[0]).decode('utf-8'))
+
+    def set(self, key: str, value: Dict, ttl: Optional[float] = None):
+        """
+        写入缓存
+        :param ttl: 本条目的有效期（秒），不提供则使用默认值
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, value, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)',
+                (key, blob, len(blob), now + ttl, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """
+        清理过期条目，并按LRU淘汰直到满足数量和大小上限
+        """
+        self._conn.execute('DELETE FROM responses WHERE expires_at <= ?', (now,))
+
+        count, total = self._conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses'
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            'SELECT key, size FROM responses ORDER BY last_access ASC'
+        ).fetchall()
+        victims = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            total -= size
+
+        self._conn.executemany('DELETE FROM responses WHERE key = ?', victims)
+        self.evictions += len(victims)
+
+    def clear(self):
+        """
+        清空缓存
+        """
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """
+        返回命中统计信息
+        """
+        with self._lock:
+            count, total = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses'
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': count,
+            'bytes': total
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_default_cache() -> TavilyCache:
+    """
+    获取进程内共享的默认缓存实例
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = TavilyCache()
+        return _default_cache
@@ -5,21 +5,36 @@ Tavily搜索工具
 """
 
 import os
+import asyncio
 import requests
 import json
 from typing import Dict, List, Optional
+from tavily_cache import TavilyCache, get_default_cache
+from http_transport import get_shared_session
+from single_flight import SingleFlight
+from async_utils import run_sync
+
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
 
 class TavilySearchTool:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, timeout: float = 15, cache: Optional[TavilyCache] = None,
+                 flight: Optional[SingleFlight] = None, base_url: Optional[str] = None):
         """
         初始化Tavily搜索工具
         :param api_key: Tavily API密钥，如果不提供则从环境变量获取
+        :param timeout: 单次请求超时时间（秒）
+        :param cache: 响应缓存，不提供则每次都请求API
+        :param flight: 请求合并器，并发的等价查询只发出一次请求
+        :param base_url: 搜索接口地址，默认读取环境变量OPENCLAW_TAVILY_URL，未设置时使用Tavily官方地址
         """
         self.api_key = api_key or os.getenv('TAVILY_API_KEY')
         if not self.api_key:
             raise ValueError("Tavily API密钥未设置。请设置TAVILY_API_KEY环境变量。")
         
-        self.base_url = "https://api.tavily.com/search"
+        self.base_url = base_url or os.environ.get('OPENCLAW_TAVILY_URL', TAVILY_SEARCH_URL)
+        self.timeout = timeout
+        self.cache = cache
+        self.flight = flight
     
     def search(
         self,
@@ -29,7 +44,8 @@ class TavilySearchTool:
         include_sources: bool = True,
         max_results: int = 5,
         include_images: bool = False,
-        include_raw_content: bool = False
+        include_raw_content: bool = False,
+        cache_ttl: Optional[float] = None
     ) -> Dict:
         """
         执行Tavily搜索
@@ -40,6 +56,7 @@ class TavilySearchTool:
         :param max_results: 最大结果数量
         :param include_images: 是否包含图片
         :param include_raw_content: 是否包含原始内容
+        :param cache_ttl: 本次查询的缓存有效期（秒），不提供则使用缓存默认值
         :return: 搜索结果
         """
         payload = {
@@ -53,15 +70,71 @@ class TavilySearchTool:
             "include_raw_content": include_raw_content
         }
         
+        if self.flight is not None:
+            # 每个调用方拿到自己的顶层副本，互不影响
+            return dict(self.flight.do(('tavily', TavilyCache.make_key(payload)), self._execute, payload, cache_ttl))
+        return self._execute(payload, cache_ttl)
+    
+    def _execute(self, payload: Dict, cache_ttl: Optional[float] = None) -> Dict:
+        """
+        先查缓存，未命中时请求API
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(payload)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
-            response = requests.post(self.base_url, json=payload)
+            response = get_shared_session().post(self.base_url, json=payload, timeout=self.timeout)
             response.raise_for_status()
-            return response.json()
+            result = response.json()
+            if cache_key is not None:
+                self.cache.set(cache_key, result, ttl=cache_ttl)
+            return result
         except requests.exceptions.RequestException as e:
             return {"error": f"搜索请求失败: {str(e)}"}
         except Exception as e:
             return {"error": f"搜索过程中发生错误: {str(e)}"}
 
+class AsyncTavilySearchTool(TavilySearchTool):
+    """
+    基于asyncio的并发Tavily搜索工具
+    多个查询在并发上限内同时发出，整体耗时约等于一次往返
+    """
+
+    async def search_async(self, query: str, **kwargs) -> Dict:
+        """
+        异步执行单个查询
+        :param query: 搜索查询
+        :param kwargs: 透传给search的参数
+        :return: 搜索结果
+        """
+        return await asyncio.to_thread(self.search, query, **kwargs)
+
+    async def search_many(self, queries: List[str], concurrency: int = 4, **kwargs) -> List[Dict]:
+        """
+        并发执行多个查询
+        :param queries: 搜索查询列表
+        :param concurrency: 最大并发请求数
+        :param kwargs: 透传给search的参数
+        :return: 与输入顺序一致的搜索结果列表
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run_one(query: str) -> Dict:
+            async with semaphore:
+                return await self.search_async(query, **kwargs)
+
+        return list(await asyncio.gather(*(run_one(query) for query in queries)))
+
+    def search_many_sync(self, queries: List[str], concurrency: int = 4, **kwargs) -> List[Dict]:
+        """
+        search_many的同步封装，供非异步代码调用
+        """
+        return run_sync(self.search_many(queries, concurrency=concurrency, **kwargs))
+
 def main():
     """命令行接口示例"""
     import sys
@@ -73,7 +146,7 @@ def main():
     query = " ".join(sys.argv[1:])
     
     try:
-        tool = TavilySearchTool()
+        tool = TavilySearchTool(cache=get_default_cache())
         result = tool.search(query)
         
         if "error" in result:
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+异步定时调度器的单元测试
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_scheduler import AsyncScheduler, DailyTrigger, IntervalTrigger
+
+class TriggerTest(unittest.TestCase):
+    def test_interval_coalesces_missed_runs(self):
+        trigger = IntervalTrigger(60)
+        self.assertEqual(trigger.next_after(1000, 1030), (1060, 0))
+        # 停顿了5个间隔多一点：合并成一次，下一次计划在当前时间之后
+        self.assertEqual(trigger.next_after(1000, 1310), (1360, 5))
+
+    def test_daily_trigger_skips_missed_days(self):
+        trigger = DailyTrigger('09:00')
+        scheduled = datetime(2026, 1, 1, 9, 0).timestamp()
+        now = datetime(2026, 1, 4, 10, 0).timestamp()
+        next_time, missed = trigger.next_after(scheduled, now)
+        self.assertEqual(datetime.fromtimestamp(next_time), datetime(2026, 1, 5, 9, 0))
+        self.assertEqual(missed, 3)
+        with self.assertRaises(ValueError):
+            DailyTrigger('25:00')
+
+    def test_job_advance_records_coalesced(self):
+        scheduler = AsyncScheduler()
+        job = scheduler.every(10, lambda: None, jitter=0)
+        job.plan(1000)
+        job.advance(1045)
+        self.assertEqual(job.scheduled, 1050)
+        self.assertEqual(job.stats.coalesced, 4)
+
+class AsyncSchedulerTest(unittest.TestCase):
+    def test_overlapping_run_is_skipped(self):
+        scheduler = AsyncScheduler(max_concurrency=4)
+        active = []
+        peak = []
+
+        async def slow():
+            active.append(1)
+            peak.append(len(active))
+            await asyncio.sleep(0.15)
+            active.pop()
+
+        job = scheduler.every(0.04, slow, name='slow', jitter=0, run_immediately=True)
+
+        async def main():
+            runner = asyncio.ensure_future(scheduler.run())
+            await asyncio.sleep(0.35)
+            scheduler.stop()
+            await runner
+
+        asyncio.run(main())
+        stats = scheduler.stats()['slow']
+        self.assertEqual(max(peak), 1)
+        self.assertGreaterEqual(job.stats.skipped_overlap, 2)
+        self.assertGreaterEqual(stats['runs'], 2)
+        self.assertEqual(stats['failures'], 0)
+
+    def test_failures_are_recorded_and_loop_continues(self):
+        scheduler = AsyncScheduler()
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            raise RuntimeError('boom')
+
+        scheduler.every(0.02, flaky, name='flaky', jitter=0, run_immediately=True)
+
+        async def main():
+            runner = asyncio.ensure_future(scheduler.run())
+            await asyncio.sleep(0.1)
+            scheduler.stop()
+            await runner
+
+        asyncio.run(main())
+        stats = scheduler.stats()['flaky']
+        self.assertGreaterEqual(stats['failures'], 2)
+        self.assertEqual(stats['last_error'], 'boom')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+批量并发获取工具的单元测试
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_fetch import get_post_details, iter_batch
+
+class BatchFetchTest(unittest.TestCase):
+    def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def fetch(key):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+            return key * 2
+
+        results = {key: value for key, value, _ in iter_batch(fetch, range(20), concurrency=3)}
+        self.assertEqual(results, {key: key * 2 for key in range(20)})
+        self.assertLessEqual(peak[0], 3)
+        self.assertGreater(peak[0], 1)
+
+    def test_duplicate_ids_fetched_once_and_errors_isolated(self):
+        calls = []
+
+        def fetch(post_id):
+            calls.append(post_id)
+            if post_id == '2':
+                raise RuntimeError('状态码: 404')
+            return {'id': post_id}
+
+        batch = get_post_details(fetch, [1, ' 1', '2', 3, '3 '], concurrency=2)
+        self.assertEqual(sorted(calls), ['1', '2', '3'])
+        self.assertEqual(batch['results'], {'1': {'id': '1'}, '3': {'id': '3'}})
+        self.assertEqual(batch['errors'], {'2': '状态码: 404'})
+
+    def test_lazy_input_is_consumed_incrementally(self):
+        consumed = []
+
+        def keys():
+            for key in range(100):
+                consumed.append(key)
+                yield key
+
+        items = iter_batch(lambda key: key, keys(), concurrency=2)
+        next(items)
+        self.assertLess(len(consumed), 10)
+        items.close()
+
+if __name__ == '__main__':
+    unittest.main()
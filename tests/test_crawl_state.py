@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+增量抓取状态的单元测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawl_state import CrawlState, collect_new
+
+def make_iterate(posts, walked=None):
+    """
+    :param walked: 传入列表时记录每一轮实际遍历过的帖子数
+    """
+    def iterate(until_id):
+        for status in posts:
+            if until_id is not None and status['id'] <= until_id:
+                return
+            if walked is not None:
+                walked.append(status['id'])
+            yield status
+    return iterate
+
+class CollectNewTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.state = CrawlState(os.path.join(self._tmp.name, 'state.sqlite3'))
+
+    def tearDown(self):
+        self.state.close()
+        self._tmp.cleanup()
+
+    def test_truncated_runs_resume_below_returned_posts(self):
+        # 按ID倒序的100条帖子，每轮最多取20条，多轮后应完整取到全部帖子
+        iterate = make_iterate([{'id': i} for i in range(100, 0, -1)])
+        collected = []
+        for _ in range(5):
+            collected.extend(s['id'] for s in collect_new(self.state, 'q', iterate, max_posts=20))
+        self.assertEqual(sorted(collected), list(range(1, 101)))
+
+        # 全部读完后续抓游标被清除
+        self.assertEqual(collect_new(self.state, 'q', iterate, max_posts=20), [])
+        watermark = self.state.get_watermark('q')
+        self.assertEqual(watermark['last_id'], 100)
+        self.assertIsNone(watermark['resume_id'])
+
+    def test_truncated_run_records_resume_watermark(self):
+        posts = [{'id': i} for i in range(100, 0, -1)]
+        walked = []
+        iterate = make_iterate(posts, walked)
+        self.assertEqual([s['id'] for s in collect_new(self.state, 'q', iterate, max_posts=20)], list(range(100, 80, -1)))
+        watermark = self.state.get_watermark('q')
+        self.assertEqual((watermark['last_id'], watermark['resume_id'], watermark['resume_floor']), (100, 81, None))
+
+        # 有新帖子时先返回新帖子，余量再补较早的帖子
+        posts[:0] = [{'id': 102}, {'id': 101}]
+        fresh = collect_new(self.state, 'q', iterate, max_posts=20)
+        self.assertEqual([s['id'] for s in fresh], [102, 101] + list(range(80, 62, -1)))
+        self.assertEqual(self.state.get_watermark('q')['resume_id'], 63)
+
+        # 补完之后，没有新帖子的一轮只看一眼高水位以上
+        while collect_new(self.state, 'q', iterate, max_posts=20):
+            pass
+        del walked[:]
+        self.assertEqual(collect_new(self.state, 'q', iterate, max_posts=20), [])
+        self.assertEqual(walked, [])
+
+    def test_unordered_stops_after_seen_streak(self):
+        posts = [{'id': i} for i in range(1, 31)]
+        self.state.mark_seen(f'xueqiu:{i}' for i in range(1, 11))
+        fresh = collect_new(self.state, 'q', make_iterate(posts), ordered=False, stop_after_seen=10)
+        self.assertEqual(fresh, [])
+
+if __name__ == '__main__':
+    unittest.main()
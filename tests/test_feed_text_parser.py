@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+雪球信息流文本解析器的单元测试
+"""
+
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from feed_text_parser import parse_feed_text
+from bench_parse_post import DEFAULT_CORPUS, legacy_parse_post, load_corpus
+
+class ParseFeedTextTest(unittest.TestCase):
+    def test_typical_item(self):
+        text = '\n'.join([
+            '价值投资者老王',
+            '贵州茅台2025年报点评：高端需求依旧稳健',
+            '公司全年营收同比增长百分之十五，直营渠道占比继续提升，毛利率维持高位。',
+            '老王 10:32 · 来自雪球',
+            '赞 12  评论 3'
+        ])
+        result = parse_feed_text(text)
+        self.assertEqual(result['title'], '贵州茅台2025年报点评：高端需求依旧稳健')
+        self.assertEqual(result['author'], '老王 10:32 · 来自雪球')
+        # 超过20字的行都算正文，标题行也不例外（与旧实现一致）
+        self.assertEqual(result['content'], '贵州茅台2025年报点评：高端需求依旧稳健 '
+                                            '公司全年营收同比增长百分之十五，直营渠道占比继续提升，毛利率维持高位。')
+
+    def test_date_line_can_be_title_but_time_line_cannot(self):
+        self.assertEqual(parse_feed_text('作者甲 03-15 发布了观点')['title'], '作者甲 03-15 发布了观点')
+        self.assertEqual(parse_feed_text('作者甲 03-15 10:30 发布')['title'], '无标题')
+        self.assertEqual(parse_feed_text('作者甲 修改于03-15 的文章')['author'], '作者甲 修改于03-15 的文章')
+
+    def test_content_is_limited(self):
+        lines = [f'第{i}行' + '正文内容' * 10 for i in range(8)]
+        content = parse_feed_text('\n'.join(lines))['content']
+        self.assertTrue(content.startswith('第0行'))
+        self.assertNotIn('第5行', content)
+        long_text = parse_feed_text('长' * 600)['content']
+        self.assertEqual(long_text, '长' * 500 + '...')
+
+    def test_empty_text(self):
+        result = parse_feed_text('')
+        self.assertEqual((result['title'], result['author'], result['content']), ('无标题', '未知作者', ''))
+
+    def test_matches_legacy_parser_on_corpus(self):
+        corpus = load_corpus(DEFAULT_CORPUS)
+        self.assertTrue(corpus)
+        for text in corpus:
+            self.assertEqual(parse_feed_text(text), legacy_parse_post(text))
+
+if __name__ == '__main__':
+    unittest.main()
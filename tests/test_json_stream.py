@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+时间线响应流式解码的单元测试
+"""
+
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_stream import stream_statuses
+from post_model import extract_statuses, loads
+
+def split_every(body: bytes, size: int):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+class FakeResponse:
+    def __init__(self, body: bytes, chunk: int):
+        self.body = body
+        self.chunk = chunk
+        self.chunks_read = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size=None):
+        for part in split_every(self.body, self.chunk):
+            self.chunks_read += 1
+            yield part
+
+    def close(self):
+        self.closed = True
+
+class StreamStatusesTest(unittest.TestCase):
+    def test_chunk_split_inside_string_and_escape(self):
+        statuses = [{'id': i, 'text': f'引号\\"{i}\\\\ 反斜杠 \\u4e2d [{{}}]', 'user': {'id': i}} for i in range(5)]
+        body = json.dumps({'count': 5, 'statuses': statuses}, ensure_ascii=False).encode('utf-8')
+        expected = extract_statuses(loads(body))
+        for size in (1, 2, 3, 7, 64):
+            self.assertEqual(stream_statuses(split_every(body, size)), expected, size)
+
+    def test_statuses_preferred_over_list(self):
+        body = json.dumps({
+            'meta': {'list': [{'id': 100}], 'statuses': [{'id': 101}]},
+            'list': [{'id': 9}],
+            'statuses': [{'id': 1}, {'id': 2}]
+        }).encode('utf-8')
+        self.assertEqual(stream_statuses(split_every(body, 5)), extract_statuses(loads(body)))
+        self.assertEqual([s['id'] for s in stream_statuses(body)], [1, 2])
+
+    def test_list_used_when_no_statuses(self):
+        body = json.dumps({'meta': {'statuses': [{'id': 100}]}, 'list': [{'id': 3}], 'next_max_id': 2}).encode('utf-8')
+        self.assertEqual(stream_statuses(split_every(body, 4)), [{'id': 3}])
+        self.assertEqual(stream_statuses(b'{"statuses": null, "list": [{"id": 1}]}'), [])
+
+    def test_limit_closes_response_early(self):
+        statuses = [{'id': i, 'text': 'x' * 100} for i in range(200)]
+        body = json.dumps({'statuses': statuses}).encode('utf-8')
+        response = FakeResponse(body, 256)
+        self.assertEqual([s['id'] for s in stream_statuses(response, limit=2)], [0, 1])
+        self.assertTrue(response.closed)
+        self.assertLess(response.chunks_read, len(split_every(body, 256)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+近似重复检测的单元测试
+"""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import near_duplicate
+from near_duplicate import NearDuplicateIndex, hamming_distance, simhash
+
+ARTICLE = ('贵州茅台发布年度业绩预告，净利润同比增长约百分之十五，'
+           '公司表示高端白酒需求保持稳定，直营渠道占比继续提升，分析师普遍上调目标价')
+OTHER = '新能源汽车销量持续走高，多家车企公布月度交付数据，电池原材料价格回落带动毛利率修复'
+THIRD = '央行宣布下调存款准备金率，释放长期资金约一万亿元，市场流动性预期改善，债市应声走强'
+
+def flip_bits(value: int, positions) -> int:
+    for position in positions:
+        value ^= 1 << position
+    return value
+
+class NearDuplicateIndexTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_small_edit_is_duplicate(self):
+        index = NearDuplicateIndex(':memory:')
+        index.add(ARTICLE, label='https://a.example/1')
+        edited = ARTICLE.replace('分析师普遍上调目标价', '分析师上调目标价') + ' 来源：财经网'
+        self.assertLessEqual(hamming_distance(simhash(ARTICLE), simhash(edited)), index.threshold)
+        self.assertEqual(index.match(edited), 'https://a.example/1')
+        self.assertIsNone(index.match(OTHER))
+
+    def test_every_fingerprint_within_threshold_is_found(self):
+        # 按 threshold+1 段切分，汉明距离不超过threshold时至少有一段完全相同
+        index = NearDuplicateIndex(':memory:', threshold=3)
+        self.assertEqual(index.bands, 4)
+        rng = random.Random(1)
+        base = rng.getrandbits(64)
+        index._add_many([(base, 'base')])
+        for _ in range(200):
+            near = flip_bits(base, rng.sample(range(64), 3))
+            self.assertEqual(index._find(near), base)
+        far = flip_bits(base, range(0, 64, 8))
+        self.assertIsNone(index._find(far))
+
+    def test_filter_new_drops_duplicates_within_batch(self):
+        index = NearDuplicateIndex(':memory:')
+        items = [{'title': '茅台', 'content': ARTICLE}, {'title': '茅台', 'content': ARTICLE + '。'},
+                 {'title': '汽车', 'content': OTHER}, {'title': '短', 'content': ''}]
+        kept = index.filter_new(items, text=near_duplicate.post_text)
+        self.assertEqual([item['title'] for item in kept], ['茅台', '汽车', '短'])
+        self.assertEqual(index.filter_new(items[:3], text=near_duplicate.post_text), [])
+
+    def test_window_evicts_oldest(self):
+        index = NearDuplicateIndex(':memory:', window=2)
+        for text in (ARTICLE, OTHER, THIRD):
+            index.add(text)
+        self.assertIsNone(index.match(ARTICLE))
+        self.assertIsNotNone(index.match(OTHER))
+        self.assertEqual(index.stats()['entries'], 2)
+
+    def test_entries_expire_after_max_age(self):
+        now = [1_700_000_000.0]
+        with mock.patch.object(near_duplicate.time, 'time', lambda: now[0]):
+            index = NearDuplicateIndex(':memory:', max_age=60)
+            index.add(ARTICLE)
+            now[0] += 61
+            index.add(OTHER)
+        self.assertIsNone(index.match(ARTICLE))
+        self.assertIsNotNone(index.match(OTHER))
+
+    def test_fingerprints_persist_across_instances(self):
+        path = os.path.join(self._tmp.name, 'near.sqlite3')
+        index = NearDuplicateIndex(path)
+        index.add(ARTICLE, label='first')
+        index.close()
+
+        reopened = NearDuplicateIndex(path)
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.match(ARTICLE), 'first')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+帖子列式归档的单元测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from post_archive import ArchiveReader, NULL_INT, PostArchive, Segment, write_segment
+from post_model import Post
+
+CREATED_AT = 1_700_000_000_000
+
+def make_post(post_id, likes, text='正文'):
+    return Post(id=post_id, author='作者', title=f'标题{post_id}', created_at=CREATED_AT,
+                like_count=likes, comment_count=1, retweet_count=0, text=text)
+
+class PostArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_segment_round_trip(self):
+        path = os.path.join(self.root, 'one.seg')
+        write_segment(path, [make_post(1, 5, text='x' * 500), Post(title='无ID', created_at=None)])
+        with Segment(path) as segment:
+            self.assertEqual(segment.rows, 2)
+            self.assertEqual(list(segment.column('id')), [1, NULL_INT])
+            self.assertEqual(list(segment.column('like_count')), [5, 0])
+            posts = segment.posts()
+        self.assertEqual(posts[0].text, 'x' * 500)
+        self.assertIsNone(posts[1].created_at)
+
+    def test_summarize_counts_refetched_post_once(self):
+        archive = PostArchive(self.root)
+        archive.append([make_post(1, 5), make_post(2, 3)])
+        archive.flush()
+        # 再次获取到同一帖子，互动数据已更新
+        archive.append([make_post(1, 9)])
+        archive.flush()
+
+        summary = ArchiveReader(self.root).summarize()
+        self.assertEqual(summary['posts'], 2)
+        self.assertEqual(summary['like_count'], 12)
+        self.assertEqual(summary['comment_count'], 2)
+
+    def test_duplicates_in_one_batch_and_compact_keep_latest(self):
+        archive = PostArchive(self.root)
+        archive.append([make_post(1, 5), make_post(1, 6)])
+        archive.flush()
+        archive.append([make_post(1, 7)])
+        archive.flush()
+
+        partition = os.listdir(self.root)[0]
+        self.assertEqual(archive.compact(partition), 2)
+        posts = list(ArchiveReader(self.root).iter_posts())
+        self.assertEqual([(post.id, post.like_count) for post in posts], [(1, 7)])
+
+if __name__ == '__main__':
+    unittest.main()
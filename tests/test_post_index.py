@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+本地帖子全文索引的单元测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from post_index import PostIndex, fts5_available, tokenize
+from post_model import Post
+
+DAY_MS = 24 * 3600 * 1000
+NOW_MS = 1_700_000_000_000
+
+@unittest.skipUnless(fts5_available(), '当前SQLite不支持FTS5')
+class PostIndexTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.index = PostIndex(os.path.join(self._tmp.name, 'index.sqlite3'))
+
+    def tearDown(self):
+        self.index.close()
+        self._tmp.cleanup()
+
+    def test_tokenize_bigrams_and_words(self):
+        self.assertEqual(tokenize('贵州茅台 ETF <b>ok</b> https://x.com/a'), ['贵州', '州茅', '茅台', 'etf', 'ok'])
+
+    def test_bigram_matching(self):
+        self.index.add_posts([
+            Post(id=1, title='贵州茅台年报', text='净利润增长'),
+            Post(id=2, title='五粮液', text='茅台镇的酱香酒')
+        ])
+        self.assertEqual({post.id for post in self.index.search('茅台')}, {1, 2})
+        self.assertEqual([post.id for post in self.index.search('贵州茅台')], [1])
+        # 单字查询按前缀匹配二元组
+        self.assertEqual({post.id for post in self.index.search('茅')}, {1, 2})
+        self.assertEqual(self.index.search('比亚迪'), [])
+
+    def test_platform_and_since_filters(self):
+        self.index.add_posts([Post(id=1, title='茅台分析', created_at=NOW_MS)], platform='xueqiu')
+        self.index.add_posts([Post(id=2, title='茅台旅行', created_at=NOW_MS - 10 * DAY_MS, url='u2')],
+                             platform='xiaohongshu')
+        self.assertEqual([post.id for post in self.index.search('茅台', platform='xiaohongshu')], [2])
+        self.assertEqual([post.id for post in self.index.search('茅台', since=NOW_MS - DAY_MS)], [1])
+        self.assertEqual(self.index.search('茅台', platform='xiaohongshu', since=NOW_MS - DAY_MS), [])
+
+    def test_readd_upserts_post(self):
+        self.index.add_posts([Post(id=1, title='茅台', like_count=1)], platform='xueqiu')
+        self.index.flush()
+        self.index.add_posts([Post(id=1, title='茅台 更新', like_count=9)])
+        self.assertEqual(self.index.count(), 1)
+        posts = self.index.search('更新')
+        self.assertEqual([(post.id, post.like_count) for post in posts], [(1, 9)])
+        self.assertEqual(self.index.search('茅台', min_likes=5, platform='xueqiu')[0].id, 1)
+        # 旧文本不再命中
+        self.index.add_posts([Post(id=1, title='五粮液')])
+        self.assertEqual(self.index.search('茅台'), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+统一帖子模型的单元测试
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from post_model import Post
+
+class PostTest(unittest.TestCase):
+    def test_extra_fields_reference_status_objects(self):
+        status = {'id': 1, 'text': '正文' * 200, 'user': {'id': 7, 'screen_name': '作者'}, 'tags': ['a']}
+        post = Post.from_status(status)
+        self.assertIs(post.text, status['text'])
+        self.assertIs(post.user, status['user'])
+        self.assertEqual(post.content, status['text'])
+        self.assertEqual(Post.from_dict(post.to_dict()).to_dict(), post.to_dict())
+
+    def test_empty_extra_fields(self):
+        post = Post(id=2, description='摘要')
+        self.assertEqual(post.text, '')
+        self.assertEqual(post.tags, [])
+        self.assertEqual(post.content, '摘要')
+        self.assertNotIn('text', post.to_dict())
+
+    def test_getitem_known_field_none_and_unknown_key(self):
+        post = Post(id=None, title='标题')
+        self.assertIsNone(post['id'])
+        self.assertIsNone(post['created_at'])
+        self.assertEqual(post['title'], '标题')
+        self.assertEqual(post['likes'], 0)
+        with self.assertRaises(KeyError):
+            post['missing']
+        with self.assertRaises(KeyError):
+            post['_extra']
+
+if __name__ == '__main__':
+    unittest.main()
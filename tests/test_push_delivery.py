@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+推送投递管道的单元测试
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from push_delivery import DeliveryPipeline
+
+class BlockingSink:
+    """
+    第一批消息阻塞到release()为止，用来占住后台线程
+    """
+
+    def __init__(self):
+        self.started = threading.Event()
+        self._release = threading.Event()
+        self.batches = []
+
+    def release(self):
+        self._release.set()
+
+    def send(self, messages):
+        self.started.set()
+        self._release.wait(5)
+        self.batches.append(list(messages))
+
+class FlakySink:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = []
+        self.batches = []
+
+    def send(self, messages):
+        self.calls.append(time.monotonic())
+        if len(self.calls) <= self.failures:
+            raise RuntimeError('503')
+        self.batches.append(list(messages))
+
+def delivered(sink):
+    return [message for batch in sink.batches for message in batch]
+
+class DeliveryPipelineTest(unittest.TestCase):
+    def make_pipeline(self, sink, **kwargs):
+        pipeline = DeliveryPipeline(sink, **kwargs)
+        self.addCleanup(pipeline.close, 5)
+        return pipeline
+
+    def occupy_worker(self, pipeline, sink):
+        pipeline.submit('m0')
+        self.assertTrue(sink.started.wait(2))
+
+    def test_messages_within_window_are_batched(self):
+        sink = FlakySink(failures=0)
+        pipeline = self.make_pipeline(sink, flush_interval=0.2, max_batch=10)
+        for i in range(5):
+            pipeline.submit(f'm{i}')
+        self.assertTrue(pipeline.flush(timeout=2))
+        self.assertEqual(sink.batches, [['m0', 'm1', 'm2', 'm3', 'm4']])
+
+    def test_drop_oldest_when_queue_is_full(self):
+        sink = BlockingSink()
+        pipeline = self.make_pipeline(sink, max_queue=2, max_batch=1, flush_interval=0)
+        self.occupy_worker(pipeline, sink)
+        self.assertFalse(pipeline.submit('m1'))
+        self.assertFalse(pipeline.submit('m2'))
+        self.assertTrue(pipeline.submit('m3'))
+        sink.release()
+        self.assertTrue(pipeline.flush(timeout=2))
+        self.assertEqual(delivered(sink), ['m0', 'm2', 'm3'])
+        self.assertEqual(pipeline.stats()['dropped'], 1)
+
+    def test_block_waits_for_space(self):
+        sink = BlockingSink()
+        pipeline = self.make_pipeline(sink, max_queue=2, max_batch=1, flush_interval=0,
+                                      overflow='block', block_timeout=2)
+        self.occupy_worker(pipeline, sink)
+        pipeline.submit('m1')
+        pipeline.submit('m2')
+        threading.Timer(0.05, sink.release).start()
+        self.assertFalse(pipeline.submit('m3'))
+        self.assertTrue(pipeline.flush(timeout=2))
+        self.assertEqual(delivered(sink), ['m0', 'm1', 'm2', 'm3'])
+        self.assertEqual(pipeline.stats()['dropped'], 0)
+
+    def test_block_drops_oldest_after_timeout(self):
+        sink = BlockingSink()
+        pipeline = self.make_pipeline(sink, max_queue=1, max_batch=1, flush_interval=0,
+                                      overflow='block', block_timeout=0.05)
+        self.occupy_worker(pipeline, sink)
+        pipeline.submit('m1')
+        started = time.monotonic()
+        self.assertTrue(pipeline.submit('m2'))
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        sink.release()
+        self.assertTrue(pipeline.flush(timeout=2))
+        self.assertEqual(delivered(sink), ['m0', 'm2'])
+
+    def test_retry_with_exponential_backoff(self):
+        sink = FlakySink(failures=2)
+        pipeline = self.make_pipeline(sink, flush_interval=0, retry_backoff=0.05, max_retries=3)
+        pipeline.submit('m0')
+        self.assertTrue(pipeline.flush(timeout=2))
+        self.assertEqual(delivered(sink), ['m0'])
+        gaps = [b - a for a, b in zip(sink.calls, sink.calls[1:])]
+        self.assertGreaterEqual(gaps[0], 0.05)
+        self.assertGreaterEqual(gaps[1], 0.1)
+        self.assertEqual(pipeline.stats()['retries'], 2)
+
+    def test_gives_up_after_max_retries(self):
+        sink = FlakySink(failures=10)
+        pipeline = self.make_pipeline(sink, flush_interval=0, retry_backoff=0.01, max_retries=2)
+        pipeline.submit('m0')
+        self.assertTrue(pipeline.flush(timeout=2))
+        self.assertEqual(len(sink.calls), 3)
+        self.assertEqual(pipeline.stats()['failed'], 1)
+
+    def test_unknown_overflow_policy(self):
+        with self.assertRaises(ValueError):
+            DeliveryPipeline(FlakySink(0), overflow='grow')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+自适应令牌桶限流器的单元测试
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rate_limiter
+from rate_limiter import AdaptiveTokenBucket, configure_host, get_limiter
+
+class AdaptiveTokenBucketTest(unittest.TestCase):
+    def test_concurrent_429s_decrease_once(self):
+        # 同一批并发请求的8个429只算一次限流事件
+        bucket = AdaptiveTokenBucket(2.0, 5, max_rate=10.0)
+        sent_at = time.monotonic()
+        barrier = threading.Barrier(8)
+
+        def respond():
+            barrier.wait()
+            bucket.on_response(429, sent_at=sent_at)
+
+        threads = [threading.Thread(target=respond) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(bucket.throttled, 8)
+        self.assertAlmostEqual(bucket.rate, 1.0)
+        self.assertLessEqual(bucket.stats()['paused_for'], 1.0)
+
+    def test_later_request_decreases_again(self):
+        bucket = AdaptiveTokenBucket(2.0, 5, max_rate=10.0)
+        bucket.on_response(429, retry_after='0', sent_at=time.monotonic())
+        bucket.on_response(429, retry_after='0', sent_at=time.monotonic())
+        self.assertAlmostEqual(bucket.rate, 0.5)
+
+    def test_429s_during_pause_without_sent_at(self):
+        bucket = AdaptiveTokenBucket(2.0, 5, max_rate=10.0)
+        for _ in range(8):
+            bucket.on_response(429)
+        self.assertAlmostEqual(bucket.rate, 1.0)
+
+    def test_recovery_proportional_to_max_rate(self):
+        for max_rate in (10.0, 1000.0):
+            bucket = AdaptiveTokenBucket(max_rate, 5)
+            bucket.on_response(429, retry_after='0')
+            successes = 0
+            while bucket.rate < max_rate:
+                bucket.on_response(200)
+                successes += 1
+            # 从一半恢复到上限所需的成功次数与max_rate无关
+            self.assertEqual(successes, 10)
+
+class ConfigureHostTest(unittest.TestCase):
+    def setUp(self):
+        saved_limits = dict(rate_limiter.HOST_LIMITS)
+        saved_limiters = dict(rate_limiter._limiters)
+
+        def restore():
+            rate_limiter.HOST_LIMITS.clear()
+            rate_limiter.HOST_LIMITS.update(saved_limits)
+            rate_limiter._limiters.clear()
+            rate_limiter._limiters.update(saved_limiters)
+        self.addCleanup(restore)
+
+    def test_subdomain_config_overrides_parent(self):
+        parent = get_limiter('xueqiu.com')
+        self.assertIs(get_limiter('stock.xueqiu.com'), parent)
+
+        configure_host('stock.xueqiu.com', 1.0, 2)
+        limiter = get_limiter('stock.xueqiu.com')
+        self.assertIsNot(limiter, parent)
+        self.assertAlmostEqual(limiter.rate, 1.0)
+        self.assertIs(get_limiter('api.xueqiu.com'), parent)
+
+        # 之后再配置主域名，不影响更具体的子域名配置
+        configure_host('xueqiu.com', 3.0, 5)
+        self.assertIs(get_limiter('stock.xueqiu.com'), limiter)
+        self.assertAlmostEqual(get_limiter('api.xueqiu.com').rate, 3.0)
+
+    def test_configure_replaces_default_subdomain_limiters(self):
+        default = get_limiter('a.example.org')
+        configure_host('example.org', 4.0, 4)
+        limiter = get_limiter('a.example.org')
+        self.assertIsNot(limiter, default)
+        self.assertAlmostEqual(limiter.rate, 4.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+请求合并（single-flight）的单元测试
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from single_flight import SingleFlight, request_key
+
+class SingleFlightTest(unittest.TestCase):
+    def run_concurrently(self, flight, fn, callers=8):
+        results = [None] * callers
+        errors = [None] * callers
+
+        def call(i):
+            try:
+                results[i] = flight.do('key', fn)
+            except Exception as e:
+                errors[i] = e
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+        for thread in threads:
+            thread.start()
+        return threads, results, errors
+
+    def wait_for_waiters(self, flight, count):
+        # 等到其余调用方都挂在同一次调用上
+        while flight.shared < count:
+            threading.Event().wait(0.001)
+
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            release.wait(5)
+            return {'value': 42}
+
+        threads, results, errors = self.run_concurrently(flight, fn)
+        self.wait_for_waiters(flight, 7)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(errors, [None] * 8)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(flight.stats()['executions'], 1)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_exception_propagates_to_all_callers(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def fn():
+            release.wait(5)
+            raise RuntimeError('boom')
+
+        threads, results, errors = self.run_concurrently(flight, fn, callers=4)
+        self.wait_for_waiters(flight, 3)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(all(isinstance(error, RuntimeError) for error in errors))
+        # 调用结束后记录被移除，之后的请求重新执行
+        self.assertEqual(flight.do('key', lambda: 'again'), 'again')
+
+    def test_request_key_ignores_cache_busters(self):
+        a = request_key('get', 'https://xueqiu.com/x', {'q': ' 茅台  股票', 't': 1, 'page': 1})
+        b = request_key('GET', 'https://xueqiu.com/x', {'page': 1, 'q': '茅台 股票', 't': 2})
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, request_key('GET', 'https://xueqiu.com/x', {'q': '茅台 股票', 'page': 1}, identity='u1'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+定时推送任务与Tavily缓存时长的单元测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tavily_cache
+import tavily_search_tool
+from crawl_state import CrawlState
+from near_duplicate import NearDuplicateIndex
+from post_archive import PostArchive
+from post_fetcher import SocialMediaPostFetcher
+from post_index import PostIndex
+from push_delivery import DeliveryPipeline
+from single_flight import SingleFlight
+from tavily_cache import TavilyCache
+from social_post_scheduler import SocialPostScheduler, XUEQIU_HOT_INTERVAL, cache_ttl_for
+
+class FakeClock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+class FakeSession:
+    """
+    每次请求返回一个新来源，模拟热门榜单随时间变化
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def post(self, url, json=None, timeout=None):
+        self.calls += 1
+        return FakeResponse({
+            'answer': f'第{self.calls}次摘要',
+            'sources': [{'title': f'帖子{self.calls}', 'url': f'https://xueqiu.com/1/{self.calls}',
+                         'content': f'第{self.calls}轮热门讨论内容，编号{self.calls}'}]
+        })
+
+class ListSink:
+    def __init__(self):
+        self.messages = []
+
+    def send(self, messages):
+        self.messages.extend(messages)
+
+class ScheduledCacheTtlTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        tmp = self._tmp.name
+        env = mock.patch.dict(os.environ, {'TAVILY_API_KEY': 'test-key', 'OPENCLAW_CACHE_DIR': tmp})
+        env.start()
+        self.addCleanup(env.stop)
+
+        self.clock = FakeClock()
+        self.session = FakeSession()
+        for patcher in (mock.patch.object(tavily_cache, 'time', self.clock),
+                        mock.patch.object(tavily_search_tool, 'get_shared_session', lambda: self.session)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.delivery = DeliveryPipeline(ListSink(), flush_interval=0.01)
+        self.scheduler = SocialPostScheduler(
+            crawl_state=CrawlState(os.path.join(tmp, 'state.sqlite3')),
+            delivery=self.delivery,
+            near_duplicates=NearDuplicateIndex(':memory:'),
+            archive=PostArchive(os.path.join(tmp, 'archive'))
+        )
+        self.scheduler.fetcher = SocialMediaPostFetcher(
+            cache=TavilyCache(os.path.join(tmp, 'cache.sqlite3')),
+            flight=SingleFlight(),
+            post_index=PostIndex(os.path.join(tmp, 'index.sqlite3'))
+        )
+
+    def tearDown(self):
+        self.delivery.close()
+        self._tmp.cleanup()
+
+    def test_ttl_is_shorter_than_interval(self):
+        for interval in (1800, 3600, 86400):
+            self.assertLess(cache_ttl_for(interval), interval)
+
+    def test_next_run_fetches_fresh_results(self):
+        ttl = cache_ttl_for(XUEQIU_HOT_INTERVAL)
+        self.assertTrue(self.scheduler.fetch_and_push_posts('xueqiu', '热门讨论', cache_ttl=ttl))
+        self.assertEqual(self.session.calls, 1)
+
+        # 同一次运行内的重复查询由缓存吸收
+        self.clock.now += 5
+        self.scheduler.fetcher.fetch_posts_with_tavily('xueqiu', '热门讨论', cache_ttl=ttl)
+        self.assertEqual(self.session.calls, 1)
+
+        # 一个间隔之后的下一次运行必须重新请求，并推送新来源
+        self.clock.now += XUEQIU_HOT_INTERVAL
+        self.assertTrue(self.scheduler.fetch_and_push_posts('xueqiu', '热门讨论', cache_ttl=ttl))
+        self.assertEqual(self.session.calls, 2)
+
+if __name__ == '__main__':
+    unittest.main()
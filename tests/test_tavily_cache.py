@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tavily结果缓存的单元测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tavily_cache
+from tavily_cache import TavilyCache
+
+class FakeClock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+class TavilyCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.clock = FakeClock()
+        patcher = mock.patch.object(tavily_cache, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def make_cache(self, **kwargs) -> TavilyCache:
+        cache = TavilyCache(os.path.join(self._tmp.name, 'cache.sqlite3'), **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_entry_expires_after_ttl(self):
+        cache = self.make_cache(default_ttl=60)
+        cache.set('a', {'answer': 1})
+        cache.set('b', {'answer': 2}, ttl=10)
+        self.clock.now += 30
+        self.assertEqual(cache.get('a'), {'answer': 1})
+        self.assertIsNone(cache.get('b'))
+        self.clock.now += 31
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_non_positive_ttl_is_not_stored(self):
+        cache = self.make_cache()
+        cache.set('a', {'answer': 1}, ttl=0)
+        self.assertIsNone(cache.get('a'))
+
+    def test_lru_eviction_keeps_recently_read(self):
+        cache = self.make_cache(max_entries=2)
+        cache.set('a', {'v': 'a'})
+        self.clock.now += 1
+        cache.set('b', {'v': 'b'})
+        self.clock.now += 1
+        self.assertIsNotNone(cache.get('a'))
+        self.clock.now += 1
+        cache.set('c', {'v': 'c'})
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_persists_across_instances(self):
+        cache = self.make_cache()
+        cache.set('a', {'answer': '中文'})
+        cache.close()
+        self.assertEqual(self.make_cache().get('a'), {'answer': '中文'})
+
+    def test_key_ignores_api_key_and_query_whitespace(self):
+        base = {'query': '雪球 热门', 'api_key': 'one', 'max_results': 5}
+        self.assertEqual(TavilyCache.make_key(base),
+                         TavilyCache.make_key(dict(base, query='  雪球\t 热门 ', api_key='two')))
+        self.assertNotEqual(TavilyCache.make_key(base), TavilyCache.make_key(dict(base, max_results=6)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+雪球时间线XHR捕获的单元测试
+"""
+
+import asyncio
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xhr_capture import TimelineCapture, is_timeline_url
+
+class FakeRequest:
+    def __init__(self, resource_type):
+        self.resource_type = resource_type
+
+class FakeResponse:
+    def __init__(self, url, payload, status=200, resource_type='xhr'):
+        self.url = url
+        self.status = status
+        self.request = FakeRequest(resource_type)
+        self._body = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+
+    async def body(self):
+        await asyncio.sleep(0)
+        return self._body
+
+TIMELINE = 'https://xueqiu.com/v4/statuses/public_timeline_by_category.json?since_id=-1&category=-1'
+
+class TimelineCaptureTest(unittest.TestCase):
+    def test_is_timeline_url_ignores_query(self):
+        self.assertTrue(is_timeline_url(TIMELINE))
+        self.assertFalse(is_timeline_url('https://xueqiu.com/statuses/hot/listV2.json.map'))
+        self.assertFalse(is_timeline_url('https://xueqiu.com/?x=/v2/statuses/mini.json'))
+
+    def test_collects_and_dedupes_timeline_posts(self):
+        async def scenario():
+            capture = TimelineCapture()
+            # 部分时间线接口把status序列化成字符串放在data字段里
+            wrapped = {'list': [{'id': 1, 'data': json.dumps({'id': 1, 'text': '一', 'user': {'screen_name': 'a'}})}]}
+            capture._on_response(FakeResponse(TIMELINE, wrapped))
+            capture._on_response(FakeResponse('https://xueqiu.com/v2/statuses/mini.json',
+                                              {'statuses': [{'id': 1, 'text': '重复'}, {'id': 2, 'text': '二'}]}))
+            # 非XHR、非200、非时间线、无法解码的响应
+            capture._on_response(FakeResponse(TIMELINE, {'statuses': [{'id': 3}]}, resource_type='document'))
+            capture._on_response(FakeResponse(TIMELINE, {'statuses': [{'id': 4}]}, status=500))
+            capture._on_response(FakeResponse('https://xueqiu.com/other.json', {'statuses': [{'id': 5}]}))
+            capture._on_response(FakeResponse(TIMELINE, b'<html>'))
+            posts = await capture.wait_for(2, timeout=1)
+            await capture.drain()
+            return capture, posts
+
+        capture, posts = asyncio.run(scenario())
+        self.assertEqual([post.id for post in posts], [1, 2])
+        self.assertEqual(posts[0].text, '一')
+        self.assertEqual(posts[0].method, 'browser_xhr')
+        self.assertEqual((capture.responses, capture.errors), (2, 1))
+        self.assertEqual([post.id for post in capture.collected(limit=1)], [1])
+
+    def test_wait_for_times_out(self):
+        async def scenario():
+            return await TimelineCapture().wait_for(1, timeout=0.05)
+
+        self.assertEqual(asyncio.run(scenario()), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+雪球分页遍历工具的单元测试
+"""
+
+import os
+import sys
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xueqiu_pagination import iter_pages, iter_statuses, page_cursor, to_epoch_ms
+
+def make_fetcher(pages, requested):
+    """
+    pages: {页码: status列表}，最后一页之后游标为None
+    """
+    last = max(pages)
+
+    def fetch_page(page):
+        requested.append(page)
+        return pages.get(page, []), (page + 1 if page < last else None)
+    return fetch_page
+
+class PaginationTest(unittest.TestCase):
+    def test_to_epoch_ms(self):
+        self.assertEqual(to_epoch_ms(1_700_000_000), 1_700_000_000_000)
+        self.assertEqual(to_epoch_ms(1_700_000_000_000), 1_700_000_000_000)
+        self.assertEqual(to_epoch_ms(datetime.fromtimestamp(1_700_000_000)), 1_700_000_000_000)
+        self.assertIsNone(to_epoch_ms(None))
+
+    def test_page_cursor_stops_at_max_page(self):
+        self.assertEqual(page_cursor(1, {'maxPage': 3}), 2)
+        self.assertIsNone(page_cursor(3, {'maxPage': 3}))
+        self.assertEqual(page_cursor(7, {}), 8)
+
+    def test_iter_pages_is_lazy_without_prefetch(self):
+        requested = []
+        pages = iter_pages(make_fetcher({1: [{'id': 1}], 2: [{'id': 2}], 3: [{'id': 3}]}, requested), 1, prefetch=False)
+        self.assertEqual(next(pages), [{'id': 1}])
+        self.assertEqual(requested, [1])
+        self.assertEqual(list(pages), [[{'id': 2}], [{'id': 3}]])
+
+    def test_iter_pages_stops_on_empty_page_and_max_pages(self):
+        for prefetch in (False, True):
+            requested = []
+            fetch = make_fetcher({1: [{'id': 1}], 2: [], 3: [{'id': 3}]}, requested)
+            self.assertEqual(list(iter_pages(fetch, 1, prefetch=prefetch)), [[{'id': 1}]])
+            fetch = make_fetcher({i: [{'id': i}] for i in range(1, 10)}, [])
+            self.assertEqual(len(list(iter_pages(fetch, 1, prefetch=prefetch, max_pages=3))), 3)
+
+    def test_ordered_stops_at_until_id_and_since(self):
+        pages = {1: [{'id': 10, 'created_at': 1_700_005_000_000}, {'id': 9, 'created_at': 1_700_004_000_000}],
+                 2: [{'id': 8, 'created_at': 1_700_003_000_000}, {'id': 7, 'created_at': 1_700_002_000_000}],
+                 3: [{'id': 6, 'created_at': 1_700_001_000_000}]}
+        requested = []
+        ids = [s['id'] for s in iter_statuses(make_fetcher(pages, requested), 1, until_id=8, prefetch=False)]
+        self.assertEqual(ids, [10, 9])
+        self.assertEqual(requested, [1, 2])
+
+        ids = [s['id'] for s in iter_statuses(make_fetcher(pages, []), 1, since=1_700_002_500, prefetch=False)]
+        self.assertEqual(ids, [10, 9, 8])
+
+    def test_unordered_filters_without_stopping(self):
+        pages = {1: [{'id': 3}, {'id': 9}], 2: [{'id': 1}, {'id': 12}]}
+        ids = [s['id'] for s in iter_statuses(make_fetcher(pages, []), 1, until_id=5, ordered=False, prefetch=False)]
+        self.assertEqual(ids, [9, 12])
+
+    def test_max_posts(self):
+        requested = []
+        pages = {i: [{'id': 100 - 2 * i}, {'id': 99 - 2 * i}] for i in range(1, 6)}
+        ids = [s['id'] for s in iter_statuses(make_fetcher(pages, requested), 1, max_posts=3, prefetch=False)]
+        self.assertEqual(ids, [98, 97, 96])
+        self.assertEqual(requested, [1, 2])
+        self.assertEqual(list(iter_statuses(make_fetcher(pages, []), 1, max_posts=0)), [])
+
+if __name__ == '__main__':
+    unittest.main()
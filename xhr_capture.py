@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+雪球时间线XHR捕获
+页面加载和滚动时，雪球首页会通过XHR拉取JSON格式的时间线；
+监听这些响应并直接解码为Post，无需解析页面文本
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+
+from post_model import Post, extract_statuses, loads
+
+# 时间线/帖子接口的URL特征
+TIMELINE_URL_PATTERNS = (
+    '/statuses/hot/listV2.json',
+    '/statuses/hot_timeline.json',
+    '/v4/statuses/public_timeline_by_category.json',
+    '/v4/statuses/home_timeline.json',
+    '/v4/statuses/user_timeline.json',
+    '/trends/statuses.json',
+    '/statuses/search.json',
+    '/v2/statuses/mini.json'
+)
+
+def is_timeline_url(url: str, patterns=TIMELINE_URL_PATTERNS) -> bool:
+    path = url.split('?', 1)[0]
+    return any(path.endswith(pattern) for pattern in patterns)
+
+class TimelineCapture:
+    """
+    挂到页面上收集时间线响应，按帖子ID去重，保持首次出现的顺序
+    """
+
+    def __init__(self, url_patterns=TIMELINE_URL_PATTERNS):
+        self.url_patterns = url_patterns
+        self.posts: Dict[object, Post] = {}
+        self.responses = 0
+        self.errors = 0
+        self._pending = set()
+        self._updated = asyncio.Event()
+
+    def attach(self, page):
+        page.on('response', self._on_response)
+        return self
+
+    def detach(self, page):
+        page.remove_listener('response', self._on_response)
+
+    def _on_response(self, response):
+        if response.request.resource_type not in ('xhr', 'fetch'):
+            return
+        if response.status != 200 or not is_timeline_url(response.url, self.url_patterns):
+            return
+        task = asyncio.ensure_future(self._consume(response))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _consume(self, response):
+        try:
+            statuses = extract_statuses(loads(await response.body()))
+        except Exception:
+            self.errors += 1
+            return
+
+        self.responses += 1
+        for status in statuses:
+            if not isinstance(status, dict) or 'id' not in status:
+                continue
+            if status['id'] not in self.posts:
+                self.posts[status['id']] = Post.from_status(status, method='browser_xhr')
+        self._updated.set()
+
+    async def wait_for(self, min_posts: int, timeout: float) -> List[Post]:
+        """
+        等待捕获到至少min_posts个帖子，超时后返回已捕获的内容
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while len(self.posts) < min_posts:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            self._updated.clear()
+            try:
+                await asyncio.wait_for(self._updated.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return self.collected()
+
+    async def drain(self):
+        """
+        等待已收到但尚未解码完的响应
+        """
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def collected(self, limit: Optional[int] = None) -> List[Post]:
+        posts = list(self.posts.values())
+        return posts if limit is None else posts[:limit]
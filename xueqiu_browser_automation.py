@@ -4,100 +4,309 @@
 使用Playwright浏览器自动化获取雪球帖子内容
 """
 
-from playwright.sync_api import sync_playwright
 import time
 import re
+import asyncio
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
+from post_model import Post
+from browser_pool import BrowserPool, BackgroundBrowserPool
+from browser_navigation import install_resource_blocking, navigate_fast
+from xhr_capture import TimelineCapture
+from feed_text_parser import parse_feed_text
+from post_index import PostIndex, get_default_index
+from post_archive import PostArchive, get_default_archive
+from async_utils import run_sync
+
+# 帖子元素的候选选择器，按顺序尝试
+FEED_SELECTORS = ['article', 'div.feed-item', 'div.status-item', 'div.stream-item']
+FALLBACK_SELECTOR = 'div[class*="feed" i], div[class*="status" i], div[class*="post" i]'
+
+# 一次page.evaluate提取所有帖子的结构化字段；结构化字段缺失时用fullText交给_parse_post兜底
+# onlyNew为true时只返回尚未提取过的元素，并给它们打上标记（用于滚动增量提取）
+FEED_EXTRACT_SCRIPT = """
+({selectors, fallback, maxPosts, onlyNew}) => {
+    let used = null;
+    let nodes = [];
+    for (const sel of selectors) {
+        const found = document.querySelectorAll(sel);
+        if (found.length) { used = sel; nodes = found; break; }
+    }
+    if (!nodes.length) { used = fallback; nodes = document.querySelectorAll(fallback); }
+
+    const textOf = el => (el && el.innerText ? el.innerText.trim() : '');
+    const pick = (root, sels) => {
+        for (const s of sels) {
+            const el = root.querySelector(s);
+            if (textOf(el)) return el;
+        }
+        return null;
+    };
+
+    let candidates = Array.from(nodes);
+    if (onlyNew) {
+        candidates = candidates.filter(node => !node.hasAttribute('data-oc-seen'));
+    }
+
+    const items = [];
+    for (const node of candidates.slice(0, maxPosts)) {
+        // 只标记本次实际提取的节点，超出maxPosts的留给下一次调用
+        if (onlyNew) node.setAttribute('data-oc-seen', '1');
+        const link = Array.from(node.querySelectorAll('a[href]'))
+            .find(a => /^(https:\/\/xueqiu\.com)?\/\d+\/\d+/.test(a.getAttribute('href')));
+        const href = link ? link.getAttribute('href') : '';
+        const idMatch = href.match(/\/\d+\/(\d+)/);
+        const counts = {};
+        for (const el of node.querySelectorAll('[class*="like" i], [class*="comment" i], [class*="retweet" i], [class*="forward" i], [class*="repost" i]')) {
+            const cls = (el.className && el.className.baseVal !== undefined ? el.className.baseVal : el.className || '').toLowerCase();
+            const key = cls.includes('like') ? 'like' : cls.includes('comment') ? 'comment' : 'retweet';
+            if (!(key in counts)) counts[key] = textOf(el);
+        }
+        items.push({
+            id: node.dataset && node.dataset.id ? node.dataset.id : (idMatch ? idMatch[1] : null),
+            author: textOf(pick(node, ['[class*="user-name" i]', '[class*="username" i]', '[class*="name" i]'])),
+            time: textOf(pick(node, ['time', 'a[class*="time" i]', 'span[class*="time" i]', '[class*="date" i]'])),
+            title: textOf(pick(node, ['h3', 'h2', '[class*="title" i]'])),
+            text: textOf(pick(node, ['[class*="content" i]', '[class*="text" i]', '[class*="detail" i]'])),
+            href: href,
+            counts: counts,
+            fullText: node.innerText || ''
+        });
+    }
+    return {selector: used, items: items};
+}
+"""
+
+# 页面上是否出现了尚未提取过的帖子元素
+NEW_ITEMS_SCRIPT = """
+(selectors) => selectors.some(sel => document.querySelector(sel + ':not([data-oc-seen])'))
+"""
+
+_COUNT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(万)?')
+
+def parse_count(text: Optional[str]) -> int:
+    """
+    解析页面上的互动数，如 "赞 12"、"1.2万"；没有数字时返回0
+    """
+    if not text:
+        return 0
+    match = _COUNT_PATTERN.search(text)
+    if not match:
+        return 0
+    value = float(match.group(1))
+    if match.group(2):
+        value *= 10000
+    return int(value)
 
 class XueqiuBrowserAutomation:
-    def __init__(self, u_value: str, xq_a_token: str):
+    def __init__(self, u_value: str, xq_a_token: str, pool: Optional[BackgroundBrowserPool] = None,
+                 post_index: Optional[PostIndex] = None,
+                 archive: Optional[PostArchive] = None):
+        """
+        :param pool: 常驻浏览器池；提供时get_posts复用池中已登录的上下文，不再每次启动浏览器
+        :param post_index: 本地全文索引，获取到的帖子自动写入，不提供则在首次写入时使用默认索引
+        :param archive: 列式归档，获取到的帖子自动追加，不提供则在首次写入时使用默认归档
+        """
         self.u_value = u_value
         self.xq_a_token = xq_a_token
+        self.pool = pool
+        # 最近一次快速导航的各阶段耗时
+        self.last_timings = {}
+        self.post_index = post_index
+        self.archive = archive
+    
+    def _get_post_index(self) -> PostIndex:
+        if self.post_index is None:
+            self.post_index = get_default_index()
+        return self.post_index
+
+    def _get_archive(self) -> PostArchive:
+        if self.archive is None:
+            self.archive = get_default_archive()
+        return self.archive
+
+    def _record(self, posts: List[Post]) -> List[Post]:
+        """
+        把获取到的帖子写入本地全文索引和列式归档
+        """
+        self._get_post_index().add_posts(posts, platform='xueqiu')
+        self._get_archive().append(posts)
+        return posts
         
-    def get_posts(self, max_posts: int = 10) -> List[Dict]:
+    def get_posts(self, max_posts: int = 10, fast: bool = False, allowlist: Optional[List[str]] = None,
+                  capture_xhr: bool = False) -> List[Post]:
         """
-        获取雪球帖子
+        获取雪球帖子；没有提供常驻浏览器池时为本次调用临时启动浏览器
+        :param fast: 快速导航模式，见 get_posts_async
+        :param allowlist: 快速导航模式下放行的域名或URL片段
+        :param capture_xhr: 捕获时间线XHR响应，见 get_posts_async
         """
-        posts = []
+        if self.pool is not None:
+            return self.pool.call(lambda pool: self.get_posts_async(
+                pool, max_posts=max_posts, fast=fast, allowlist=allowlist, capture_xhr=capture_xhr))
         
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True, args=[
-                '--no-sandbox', 
-                '--disable-setuid-sandbox',
-                '--disable-dev-shm-usage'
-            ])
-            page = browser.new_page()
-            
-            # 设置请求头
-            page.set_extra_http_headers({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            })
-            
-            # 设置cookies
-            cookies = [
-                {'name': 'u', 'value': self.u_value, 'domain': '.xueqiu.com', 'path': '/'},
-                {'name': 'xq_a_token', 'value': self.xq_a_token, 'domain': '.xueqiu.com', 'path': '/'}
-            ]
-            
-            page.context.add_cookies(cookies)
-            
+        # 没有常驻浏览器池时临时启动一个单上下文的池，与池模式走同一条路径；
+        # 在运行中的事件循环里（如异步调度器）调用时由run_sync改到独立线程执行
+        async def run_once():
+            async with BrowserPool(self.u_value, self.xq_a_token, size=1) as pool:
+                return await self.get_posts_async(
+                    pool, max_posts=max_posts, fast=fast, allowlist=allowlist, capture_xhr=capture_xhr)
+        
+        return run_sync(run_once())
+    
+    async def get_posts_async(self, pool: BrowserPool, max_posts: int = 10, fast: bool = False,
+                              allowlist: Optional[List[str]] = None, capture_xhr: bool = False,
+                              scrolls: int = 3) -> List[Post]:
+        """
+        从浏览器池租用页面获取雪球帖子，只需一次页面导航
+        :param fast: 快速导航模式：拦截图片/媒体/字体/统计请求，
+                     等到首个帖子元素出现或网络空闲即开始解析，不再固定等待3秒
+        :param allowlist: 快速导航模式下放行的域名或URL片段
+        :param capture_xhr: 直接使用页面加载/滚动时拉取的时间线JSON，
+                            得到与接口获取器相同的结构化帖子；未捕获到时退回解析页面
+        :param scrolls: 捕获XHR时最多滚动的次数，用于触发加载更多
+        """
+        async with pool.lease() as page:
             try:
                 print(f"[{datetime.now().strftime('%H:%M:%S')}] 访问雪球首页...")
-                page.goto('https://xueqiu.com/', timeout=15000)
-                
-                # 等待页面加载
-                page.wait_for_timeout(3000)
-                
-                # 查找帖子元素
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] 查找帖子元素...")
-                
-                # 尝试多种选择器
-                selectors = ['article', 'div.feed-item', 'div.status-item', 'div.stream-item']
+                started = time.monotonic()
+                capture = TimelineCapture().attach(page) if capture_xhr else None
+                if fast:
+                    block_stats = await install_resource_blocking(page, allowlist=allowlist)
+                    timings = await navigate_fast(page, 'https://xueqiu.com/', FEED_SELECTORS)
+                else:
+                    await page.goto('https://xueqiu.com/', timeout=15000)
+                    if capture is None:
+                        await page.wait_for_timeout(3000)
                 
-                posts_elements = []
-                for selector in selectors:
-                    try:
-                        elements = page.query_selector_all(selector)
-                        if elements and len(elements) > 0:
-                            posts_elements = elements
-                            print(f"   - 使用选择器 '{selector}' 找到 {len(elements)} 个帖子")
-                            break
-                    except:
-                        continue
+                extract_started = time.monotonic()
+                posts = []
+                if capture is not None:
+                    posts = await self._collect_from_xhr(page, capture, max_posts, scrolls)
+                    if not posts:
+                        print("   - 未捕获到时间线数据，改为解析页面")
+                if not posts:
+                    posts = await self._extract_posts_async(page, max_posts)
                 
-                if not posts_elements:
-                    print("   - 未找到帖子元素，尝试通用选择器")
-                    posts_elements = page.query_selector_all('div[class*=\"feed\" i], div[class*=\"status\" i], div[class*=\"post\" i]')
-                
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] 解析 {len(posts_elements)} 个帖子...")
-                
-                for i, element in enumerate(posts_elements[:max_posts]):
-                    try:
-                        # 获取完整的帖子文本内容
-                        full_text = element.inner_text()
-                        
-                        if not full_text or len(full_text.strip()) < 20:
-                            continue  # 跳过内容太少的元素
-                        
-                        # 解析帖子内容
-                        parsed_post = self._parse_post(full_text)
-                        
-                        if parsed_post:
-                            parsed_post['index'] = i + 1
-                            posts.append(parsed_post)
-                            
-                    except Exception as e:
-                        print(f"   - 解析帖子 {i+1} 时出错: {e}")
-                        continue
-                        
+                if fast:
+                    timings['extract_ms'] = (time.monotonic() - extract_started) * 1000
+                    timings['total_ms'] = (time.monotonic() - started) * 1000
+                    self.last_timings = dict(timings, **block_stats)
+                    print(f"   - 导航 {timings['goto_ms']:.0f}ms | 就绪({timings['ready_by']}) {timings['ready_ms']:.0f}ms"
+                          f" | 解析 {timings['extract_ms']:.0f}ms | 拦截 {block_stats['blocked']} 个请求")
+                return self._record(posts)
             except Exception as e:
                 print(f"❌ 浏览器自动化过程中出错: {e}")
-                import traceback
-                traceback.print_exc()
-            
-            finally:
-                browser.close()
+                return []
+    
+    async def _collect_from_xhr(self, page, capture: TimelineCapture, max_posts: int, scrolls: int) -> List[Post]:
+        """
+        等待时间线XHR响应，数量不足时滚动页面触发加载更多
+        """
+        # 先等首个时间线响应，之后每次滚动只等到有新帖子为止
+        await capture.wait_for(1, timeout=3)
+        for _ in range(scrolls):
+            if not capture.posts or len(capture.posts) >= max_posts:
+                break
+            await page.evaluate('window.scrollBy(0, document.body.scrollHeight)')
+            await capture.wait_for(len(capture.posts) + 1, timeout=2)
+        await capture.drain()
+        
+        posts = capture.collected(max_posts)
+        if posts:
+            print(f"   - 从 {capture.responses} 个时间线响应中获取到 {len(posts)} 个帖子")
+        return posts
+    
+    async def _extract_posts_async(self, page, max_posts: int) -> List[Post]:
+        """
+        在已加载的页面中提取帖子
+        优先用一次page.evaluate取回所有帖子的结构化记录，脚本执行失败时退回逐元素读取文本
+        """
+        try:
+            result = await page.evaluate(FEED_EXTRACT_SCRIPT, {
+                'selectors': FEED_SELECTORS,
+                'fallback': FALLBACK_SELECTOR,
+                'maxPosts': max_posts,
+                'onlyNew': False
+            })
+        except Exception as e:
+            print(f"   - 批量提取失败，改为逐个解析: {e}")
+            return await self._extract_posts_by_element(page, max_posts)
+        
+        if not isinstance(result, dict):
+            return await self._extract_posts_by_element(page, max_posts)
+        
+        items = result.get('items') or []
+        print(f"   - 使用选择器 '{result.get('selector')}' 提取到 {len(items)} 个帖子")
+        posts = []
+        for item in items:
+            post = self._post_from_record(item)
+            if post is not None:
+                posts.append(post)
+        return posts
+    
+    def _post_from_record(self, record: Dict) -> Optional[Post]:
+        """
+        把页面脚本返回的记录转换为Post；缺少正文或作者时用全文解析兜底
+        """
+        counts = record.get('counts') or {}
+        href = record.get('href') or ''
+        post_id = record.get('id')
+        
+        if record.get('text') and record.get('author'):
+            parsed = {
+                'title': record.get('title') or '无标题',
+                'author': record['author'],
+                'content': record['text'][:500] + ('...' if len(record['text']) > 500 else ''),
+                'time_info': record.get('time', '')
+            }
+        else:
+            full_text = record.get('fullText') or ''
+            if len(full_text.strip()) < 20:
+                return None  # 跳过内容太少的元素
+            parsed = self._parse_post(full_text)
+        
+        parsed.update({
+            'id': int(post_id) if post_id and str(post_id).isdigit() else None,
+            'url': href if href.startswith('http') else (f"https://xueqiu.com{href}" if href else ''),
+            'like_count': parse_count(counts.get('like')),
+            'comment_count': parse_count(counts.get('comment')),
+            'retweet_count': parse_count(counts.get('retweet'))
+        })
+        return Post.from_parsed(parsed)
+    
+    async def _extract_posts_by_element(self, page, max_posts: int) -> List[Post]:
+        """
+        逐个元素读取文本并解析（每个元素一次浏览器往返）
+        """
+        posts_elements = []
+        for selector in FEED_SELECTORS:
+            try:
+                elements = await page.query_selector_all(selector)
+                if elements:
+                    posts_elements = elements
+                    print(f"   - 使用选择器 '{selector}' 找到 {len(elements)} 个帖子")
+                    break
+            except Exception:
+                continue
+        
+        if not posts_elements:
+            print("   - 未找到帖子元素，尝试通用选择器")
+            posts_elements = await page.query_selector_all(FALLBACK_SELECTOR)
+        
+        posts = []
+        for i, element in enumerate(posts_elements[:max_posts]):
+            try:
+                full_text = await element.inner_text()
+                if not full_text or len(full_text.strip()) < 20:
+                    continue  # 跳过内容太少的元素
+                
+                parsed_post = self._parse_post(full_text)
+                if parsed_post:
+                    posts.append(Post.from_parsed(parsed_post))
+            except Exception as e:
+                print(f"   - 解析帖子 {i+1} 时出错: {e}")
+                continue
         
         return posts
     
@@ -105,63 +314,134 @@ class XueqiuBrowserAutomation:
         """
         解析帖子文本内容
         """
-        lines = full_text.split('\n')
-        lines = [line.strip() for line in lines if line.strip()]
+        return parse_feed_text(full_text)
+    
+    def harvest(self, urls: List[str], **kwargs) -> Dict[str, List[Post]]:
+        """
+        同步版本的 harvest_many_async，需要构造时提供浏览器池
+        """
+        if self.pool is None:
+            raise RuntimeError("滚动采集需要常驻浏览器池，请在构造时传入pool")
+        return self.pool.call(lambda pool: self.harvest_many_async(pool, urls, **kwargs))
+    
+    async def harvest_many_async(self, pool: BrowserPool, urls: List[str], **kwargs) -> Dict[str, List[Post]]:
+        """
+        在同一个已登录的上下文中并发打开多个页面（首页、热榜、用户主页等）滚动采集
+        :param urls: 要采集的页面地址
+        :param kwargs: 透传给 harvest_page_async 的停止条件等参数
+        :return: {页面地址: 帖子列表}
+        """
+        async with pool.lease_context() as context:
+            pages = [await context.new_page() for _ in urls]
+            try:
+                results = await asyncio.gather(
+                    *(self.harvest_page_async(page, url, **kwargs) for page, url in zip(pages, urls)),
+                    return_exceptions=True
+                )
+            finally:
+                for page in pages:
+                    await page.close()
         
-        # 初始化帖子内容
-        post = {
-            'title': '无标题',
-            'author': '未知作者',
-            'content': '',
-            'time_info': '',
-            'interactions': ''
-        }
+        harvested = {}
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                print(f"❌ 采集 {url} 时出错: {result}")
+                harvested[url] = []
+            else:
+                harvested[url] = result
+        return harvested
+    
+    async def harvest_page_async(
+        self,
+        page,
+        url: str = 'https://xueqiu.com/',
+        max_posts: int = 200,
+        max_age: Optional[float] = None,
+        time_budget: float = 60,
+        idle_scrolls: int = 3,
+        capture_xhr: bool = True,
+        fast: bool = True,
+        allowlist: Optional[List[str]] = None,
+        old_streak: int = 5
+    ) -> List[Post]:
+        """
+        在页面上持续向下滚动，每轮只提取新插入的帖子，按帖子ID跨虚拟滚动重绘去重
+        :param max_posts: 采集到这么多帖子后停止
+        :param max_age: 只保留这么多秒以内发布的帖子；更早的帖子被跳过，置顶帖等个别旧帖不会提前结束采集
+        :param time_budget: 本页的总耗时上限（秒）
+        :param idle_scrolls: 连续这么多次滚动都没有新帖子时停止
+        :param old_streak: 连续遇到这么多个超出max_age的帖子时停止
+        :param capture_xhr: 同时捕获时间线XHR，得到完整的结构化帖子
+        """
+        started = time.monotonic()
+        deadline = started + time_budget
+        since_ms = int((time.time() - max_age) * 1000) if max_age is not None else None
         
-        # 尝试识别各个部分
-        author_patterns = [
-            r'.*?修改于.*',  # 包含"修改于"的行
-            r'.*?·\s*来自.*',  # 包含"· 来自"的行
-            r'.*?\d{1,2}:\d{2}.*',  # 包含时间的行
-            r'.*?\d{1,2}-\d{1,2}.*'  # 包含日期的行
-        ]
-        
-        content_lines = []
-        author_line = ''
-        
-        for line in lines:
-            # 检查是否是作者信息行
-            is_author = False
-            for pattern in author_patterns:
-                if re.search(pattern, line):
-                    author_line = line
-                    is_author = True
-                    break
+        capture = TimelineCapture().attach(page) if capture_xhr else None
+        if fast:
+            await install_resource_blocking(page, allowlist=allowlist)
+            await navigate_fast(page, url, FEED_SELECTORS)
+        else:
+            await page.goto(url, timeout=15000)
+        
+        collected = {}
+        seen_old = set()
+        consecutive_old = 0
+        
+        def add(post: Post):
+            nonlocal consecutive_old
+            key = post.id if post.id is not None else hash((post.author, post.content[:100]))
+            if key in seen_old:
+                return
+            if since_ms is not None and isinstance(post.created_at, (int, float)) and post.created_at < since_ms:
+                seen_old.add(key)
+                consecutive_old += 1
+                return
+            if key not in collected:
+                consecutive_old = 0
+                collected[key] = post
+            elif post.method == 'browser_xhr' and collected[key].method != 'browser_xhr':
+                # 同一帖子同时来自XHR和页面时，保留字段更完整的XHR版本
+                collected[key] = post
+        
+        idle = 0
+        while True:
+            before = len(collected)
+            if capture is not None:
+                for post in capture.collected():
+                    add(post)
             
-            # 如果不是作者信息，也不是短标题行，则认为是内容
-            if not is_author and len(line) > 20:
-                content_lines.append(line)
-        
-        # 设置作者
-        if author_line:
-            post['author'] = author_line
-        
-        # 设置内容
-        if content_lines:
-            post['content'] = ' '.join(content_lines[:5])  # 取前5行内容
-        
-        # 尝试从内容中提取标题（较短的有意义行）
-        for line in lines:
-            if 10 < len(line) < 100 and not re.search(r'·\s*来自|修改于|\d{1,2}:\d{2}', line):
-                post['title'] = line
+            result = await page.evaluate(FEED_EXTRACT_SCRIPT, {
+                'selectors': FEED_SELECTORS,
+                'fallback': FALLBACK_SELECTOR,
+                'maxPosts': max_posts,
+                'onlyNew': True
+            })
+            for record in (result or {}).get('items') or []:
+                post = self._post_from_record(record)
+                if post is not None:
+                    add(post)
+            
+            idle = idle + 1 if len(collected) == before else 0
+            reached_old = consecutive_old >= old_streak
+            if len(collected) >= max_posts or reached_old or idle >= idle_scrolls or time.monotonic() >= deadline:
                 break
+            
+            await page.evaluate('window.scrollBy(0, window.innerHeight * 2)')
+            # 等到出现新的帖子元素（或新的XHR数据）再提取，而不是固定等待
+            wait_ms = int(max(0.1, min(2.0, deadline - time.monotonic())) * 1000)
+            try:
+                await page.wait_for_function(NEW_ITEMS_SCRIPT, arg=FEED_SELECTORS, timeout=wait_ms)
+            except Exception:
+                pass
         
-        # 限制内容长度
-        if len(post['content']) > 500:
-            post['content'] = post['content'][:500] + '...'
-        
-        return post
+        if capture is not None:
+            capture.detach(page)
+        posts = list(collected.values())[:max_posts]
+        print(f"   - {url} 采集到 {len(posts)} 个帖子，用时 {time.monotonic() - started:.1f}s")
+        return self._record(posts)
     
-    def display_posts(self, posts: List[Dict]):
+    def display_posts(self, posts: List[Post]):
         """
         显示帖子内容
         """
@@ -172,11 +452,11 @@ class XueqiuBrowserAutomation:
         print(f"\n📊 获取到 {len(posts)} 个帖子:")
         print("="*80)
         
-        for post in posts:
-            print(f"\n📈 帖子 {post['index']}:")
-            print(f"📝 标题: {post['title']}")
-            print(f"👤 作者: {post['author']}")
-            print(f"📄 内容: {post['content']}")
+        for i, post in enumerate(posts, 1):
+            print(f"\n📈 帖子 {i}:")
+            print(f"📝 标题: {post.title}")
+            print(f"👤 作者: {post.author}")
+            print(f"📄 内容: {post.content}")
             print("-" * 60)
 
 def main():
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+雪球分页遍历工具
+按页码游标惰性翻页，并在调用方处理当前页时后台预取下一页
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+# fetch_page(cursor) -> (本页帖子列表, 下一页游标)，下一页游标为None表示没有更多；
+# 帖子可以是status字典或Post，只需支持 .get('id') / .get('created_at')
+PageFetcher = Callable[[Any], Tuple[List[Dict], Any]]
+
+def to_epoch_ms(value: Union[int, float, datetime, None]) -> Optional[int]:
+    """
+    把时间统一转换为毫秒时间戳（雪球接口的created_at单位）
+    接受datetime、秒级或毫秒级时间戳
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    value = float(value)
+    # 小于1e11的视为秒级时间戳
+    return int(value * 1000) if value < 1e11 else int(value)
+
+def iter_pages(fetch_page: PageFetcher, start_cursor: Any, prefetch: bool = True, max_pages: int = 100) -> Iterator[List[Dict]]:
+    """
+    惰性遍历分页结果
+    :param fetch_page: 拉取单页的函数
+    :param start_cursor: 第一页的游标（如页码）
+    :param prefetch: 是否在产出当前页时后台预取下一页
+    :param max_pages: 最多拉取的页数，防止接口游标异常时无限翻页
+    """
+    if not prefetch:
+        cursor = start_cursor
+        for _ in range(max_pages):
+            items, cursor = fetch_page(cursor)
+            if not items:
+                return
+            yield items
+            if cursor is None:
+                return
+        return
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        future = executor.submit(fetch_page, start_cursor)
+        for _ in range(max_pages):
+            items, cursor = future.result()
+            if not items:
+                return
+            # 先提交下一页请求，再把当前页交给调用方处理
+            future = executor.submit(fetch_page, cursor) if cursor is not None else None
+            yield items
+            if future is None:
+                return
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def iter_statuses(
+    fetch_page: PageFetcher,
+    start_cursor: Any,
+    max_posts: Optional[int] = None,
+    since: Union[int, float, datetime, None] = None,
+    until_id: Optional[int] = None,
+    prefetch: bool = True,
+    max_pages: int = 100,
+    ordered: bool = True
+) -> Iterator[Dict]:
+    """
+    逐条遍历帖子，满足任一停止条件即结束翻页
+    时间线按时间倒序返回，因此遇到早于since或不大于until_id的帖子即可停止
+    :param max_posts: 最多产出的帖子数
+    :param since: 时间窗口起点，早于该时间的帖子不再产出
+    :param until_id: 已知的帖子ID，不大于该ID的帖子不再产出
+    :param ordered: 帖子是否按时间倒序；搜索结果按相关度排序时传False，
+                    此时只跳过不满足since/until_id的帖子，翻页由max_posts/max_pages结束
+    """
+    since_ms = to_epoch_ms(since)
+    produced = 0
+
+    if max_posts is not None and max_posts <= 0:
+        return
+
+    for page in iter_pages(fetch_page, start_cursor, prefetch=prefetch, max_pages=max_pages):
+        for status in page:
+            created_at = status.get('created_at')
+            status_id = status.get('id')
+            too_old = (since_ms is not None and isinstance(created_at, (int, float)) and created_at < since_ms) or \
+                (until_id is not None and isinstance(status_id, int) and status_id <= until_id)
+            if too_old:
+                if ordered:
+                    return
+                continue
+
+            yield status
+            produced += 1
+            if max_posts is not None and produced >= max_posts:
+                return
+
+def page_cursor(page: int, data: Dict) -> Optional[int]:
+    """
+    页码游标：根据返回的maxPage判断是否还有下一页
+    """
+    max_page = data.get('maxPage')
+    if max_page is not None and page >= max_page:
+        return None
+    return page + 1
+
+def cache_buster() -> int:
+    """
+    请求参数中附加的毫秒时间戳
+    """
+    return int(time.time() * 1000)
@@ -4,121 +4,227 @@
 用于获取完整的帖子内容
 """
 
-import requests
-import json
-import time
-from typing import Dict, List, Optional
-from urllib.parse import urlencode
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from http_transport import create_xueqiu_session, xueqiu_url
+from xueqiu_pagination import PageFetcher, iter_statuses, page_cursor
+from crawl_state import CrawlState, collect_new
+from post_model import Post, loads
+import batch_fetch
+from single_flight import SingleFlight, get_default_flight, request_key
+from post_index import PostIndex, get_default_index
+from post_archive import PostArchive, get_default_archive
 
 class XueqiuScraper:
-    def __init__(self, cookies: Optional[Dict] = None):
+    def __init__(self, cookies: Optional[Dict] = None, crawl_state: Optional[CrawlState] = None,
+                 flight: Optional[SingleFlight] = None, post_index: Optional[PostIndex] = None,
+                 archive: Optional[PostArchive] = None):
         """
         初始化雪球爬取器
         :param cookies: 登录后的cookies，用于访问需要登录的内容
+        :param crawl_state: 增量抓取状态，不提供则在首次增量抓取时使用默认状态文件
+        :param flight: 请求合并器，不提供则使用进程共享的合并器
+        :param post_index: 本地全文索引，获取到的帖子自动写入，不提供则在首次写入时使用默认索引
+        :param archive: 列式归档，获取到的帖子自动追加，不提供则在首次写入时使用默认归档
         """
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Referer': 'https://xueqiu.com/',
-            'Accept': 'application/json, text/plain, */*',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8'
-        })
-        
-        if cookies:
-            self.session.cookies.update(cookies)
+        self.session = create_xueqiu_session(cookies=cookies)
+        self.crawl_state = crawl_state
+        self.flight = flight if flight is not None else get_default_flight()
+        # 不同登录身份的请求不合并
+        self._identity = tuple(sorted((cookies or {}).items()))
+        self.post_index = post_index
+        self.archive = archive
     
-    def search_topics(self, query: str, count: int = 10) -> List[Dict]:
+    def _get(self, url: str, params: Dict):
         """
-        搜索话题
+        发起GET请求，并发的相同请求共享同一个响应
+        """
+        key = request_key('GET', url, params, identity=self._identity)
+        return self.flight.do(key, self.session.get, url, params=params)
+    
+    def _get_crawl_state(self) -> CrawlState:
+        if self.crawl_state is None:
+            self.crawl_state = CrawlState()
+        return self.crawl_state
+
+    def _get_post_index(self) -> PostIndex:
+        if self.post_index is None:
+            self.post_index = get_default_index()
+        return self.post_index
+
+    def _get_archive(self) -> PostArchive:
+        if self.archive is None:
+            self.archive = get_default_archive()
+        return self.archive
+
+    def _record(self, posts: List[Post]) -> List[Post]:
+        """
+        把获取到的帖子写入本地全文索引和列式归档
+        """
+        self._get_post_index().add_posts(posts, platform='xueqiu')
+        self._get_archive().append(posts)
+        return posts
+
+    def _recorded(self, fetch_page: PageFetcher) -> PageFetcher:
+        """
+        包装翻页函数：每页的status转换为帖子后整页写入索引和归档，逐条遍历时不再逐个记录
+        """
+        def fetch(page: int) -> Tuple[List[Post], Optional[int]]:
+            statuses, next_page = fetch_page(page)
+            return self._record([Post.from_status(status) for status in statuses]), next_page
+        return fetch
+    
+    def _fetch_search_page(self, query: str, page: int, count: int) -> Tuple[List[Dict], Optional[int]]:
         """
-        search_url = "https://xueqiu.com/statuses/search.json"
+        拉取一页搜索结果，返回 (status列表, 下一页页码)
+        """
+        search_url = xueqiu_url("/statuses/search.json")
         params = {
             'q': query,
             'count': count,
-            'page': 1
+            'page': page
+        }
+        
+        response = self._get(search_url, params)
+        response.raise_for_status()
+        data = loads(response.content)
+        statuses = data.get('statuses', [])
+        return statuses, page_cursor(page, data)
+    
+    def _fetch_user_timeline_page(self, user_id: str, page: int, count: int) -> Tuple[List[Dict], Optional[int]]:
+        """
+        拉取一页用户时间线，返回 (status列表, 下一页页码)
+        """
+        user_url = xueqiu_url("/v4/statuses/user_timeline.json")
+        params = {
+            'user_id': user_id,
+            'page': page,
+            'count': count
         }
         
+        response = self._get(user_url, params)
+        response.raise_for_status()
+        data = loads(response.content)
+        statuses = data.get('statuses', [])
+        return statuses, page_cursor(page, data)
+    
+    def search_topics(self, query: str, count: int = 10, incremental: bool = False) -> List[Post]:
+        """
+        搜索话题
+        :param incremental: 增量模式，只返回之前没有处理过的帖子（最多count个）
+        """
+        if incremental:
+            # 搜索结果按相关度排序，不能用ID截断，依靠已处理集合判断是否进入已知区域
+            return collect_new(
+                self._get_crawl_state(), f"search:{query}",
+                lambda until_id: self.iter_search(query, count=count),
+                max_posts=count, ordered=False
+            )
+        
         try:
-            response = self.session.get(search_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            # 提取帖子信息
-            statuses = data.get('statuses', [])
-            posts = []
-            
-            for status in statuses:
-                post = {
-                    'id': status.get('id'),
-                    'user': status.get('user', {}).get('screen_name'),
-                    'title': status.get('title', ''),
-                    'description': status.get('description', ''),
-                    'text': status.get('text', ''),
-                    'created_at': status.get('created_at'),
-                    'like_count': status.get('like_count', 0),
-                    'comment_count': status.get('comment_count', 0),
-                    'retweet_count': status.get('retweet_count', 0),
-                    'href': f"https://xueqiu.com{status.get('target', '')}"
-                }
-                posts.append(post)
-            
-            return posts
+            statuses, _ = self._fetch_search_page(query, 1, count)
+            return self._record([Post.from_status(status) for status in statuses])
         except Exception as e:
             print(f"搜索失败: {e}")
             return []
     
-    def get_post_detail(self, post_id: str) -> Dict:
+    def iter_search(
+        self,
+        query: str,
+        count: int = 10,
+        max_posts: Optional[int] = None,
+        since=None,
+        until_id: Optional[int] = None,
+        prefetch: bool = True
+    ) -> Iterator[Post]:
+        """
+        逐条遍历搜索结果，按需翻页
+        :param count: 每页帖子数
+        :param max_posts: 最多返回的帖子数
+        :param since: 时间窗口起点（datetime或时间戳），更早的帖子不再返回
+        :param until_id: 不返回不大于该ID的帖子
+        :param prefetch: 是否后台预取下一页
+        搜索结果按相关度排序，since/until_id只过滤帖子，不会提前结束翻页
+        """
+        fetch_page = lambda page: self._fetch_search_page(query, page, count)
+        try:
+            for post in iter_statuses(self._recorded(fetch_page), 1, max_posts=max_posts, since=since, until_id=until_id, prefetch=prefetch,
+                                        ordered=False):
+                yield post
+        except Exception as e:
+            print(f"搜索翻页失败: {e}")
+    
+    def _fetch_post_detail(self, post_id: str) -> Post:
         """
-        获取单个帖子的详细内容
+        请求单个帖子详情，失败时抛出异常
         """
-        detail_url = f"https://xueqiu.com/statuses/original/show.json"
+        detail_url = xueqiu_url("/statuses/original/show.json")
         params = {'id': post_id}
         
+        response = self._get(detail_url, params)
+        response.raise_for_status()
+        return self._record([Post.from_status(loads(response.content))])[0]
+    
+    def get_post_detail(self, post_id: str) -> Optional[Post]:
+        """
+        获取单个帖子的详细内容，失败时返回None
+        """
         try:
-            response = self.session.get(detail_url, params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._fetch_post_detail(post_id)
         except Exception as e:
             print(f"获取帖子详情失败: {e}")
-            return {}
+            return None
+    
+    def iter_post_details(self, post_ids: Iterable, concurrency: int = 8) -> Iterator[Tuple[str, Optional[Post], Optional[str]]]:
+        """
+        并发获取多个帖子详情，按完成顺序逐条产出 (帖子ID, 帖子, 错误信息)，见 batch_fetch.iter_post_details
+        """
+        return batch_fetch.iter_post_details(self._fetch_post_detail, post_ids, concurrency=concurrency)
     
-    def get_user_posts(self, user_id: str, count: int = 20) -> List[Dict]:
+    def get_post_details(self, post_ids: Iterable, concurrency: int = 8) -> Dict[str, Dict]:
+        """
+        批量获取帖子详情
+        :return: {'results': {帖子ID: 帖子}, 'errors': {帖子ID: 错误信息}}
+        """
+        return batch_fetch.get_post_details(self._fetch_post_detail, post_ids, concurrency=concurrency)
+    
+    def get_user_posts(self, user_id: str, count: int = 20, incremental: bool = False) -> List[Post]:
         """
         获取特定用户的帖子
+        :param incremental: 增量模式，翻页到上次的高水位即停止，只返回新帖子（最多count个）
         """
-        user_url = f"https://xueqiu.com/v4/statuses/user_timeline.json"
-        params = {
-            'user_id': user_id,
-            'page': 1,
-            'count': count
-        }
+        if incremental:
+            return collect_new(
+                self._get_crawl_state(), f"user:{user_id}",
+                lambda until_id: self.iter_user_timeline(user_id, count=count, until_id=until_id),
+                max_posts=count
+            )
         
         try:
-            response = self.session.get(user_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            statuses = data.get('statuses', [])
-            posts = []
-            
-            for status in statuses:
-                post = {
-                    'id': status.get('id'),
-                    'user': status.get('user', {}).get('screen_name'),
-                    'title': status.get('title', ''),
-                    'text': status.get('text', ''),
-                    'created_at': status.get('created_at'),
-                    'like_count': status.get('like_count', 0),
-                    'comment_count': status.get('comment_count', 0),
-                    'retweet_count': status.get('retweet_count', 0),
-                    'href': f"https://xueqiu.com{status.get('target', '')}"
-                }
-                posts.append(post)
-            
-            return posts
+            statuses, _ = self._fetch_user_timeline_page(user_id, 1, count)
+            return self._record([Post.from_status(status) for status in statuses])
         except Exception as e:
             print(f"获取用户帖子失败: {e}")
             return []
+    
+    def iter_user_timeline(
+        self,
+        user_id: str,
+        count: int = 20,
+        max_posts: Optional[int] = None,
+        since=None,
+        until_id: Optional[int] = None,
+        prefetch: bool = True
+    ) -> Iterator[Post]:
+        """
+        逐条遍历用户时间线，按需翻页
+        参数含义同 iter_search；时间线按时间倒序，遇到早于since或不大于until_id的帖子即停止翻页
+        """
+        fetch_page = lambda page: self._fetch_user_timeline_page(user_id, page, count)
+        try:
+            for post in iter_statuses(self._recorded(fetch_page), 1, max_posts=max_posts, since=since, until_id=until_id, prefetch=prefetch):
+                yield post
+        except Exception as e:
+            print(f"用户时间线翻页失败: {e}")
 
 def demo_xueqiu_scraper():
     """
@@ -135,6 +241,8 @@ def demo_xueqiu_scraper():
     print("  1. search_topics(query) - 搜索话题")
     print("  2. get_post_detail(post_id) - 获取帖子详情") 
     print("  3. get_user_posts(user_id) - 获取用户帖子")
+    print("  4. iter_search(query) / iter_user_timeline(user_id) - 自动翻页逐条遍历")
+    print("  5. get_post_details(post_ids) - 并发批量获取帖子详情")
     
     print("\n🔐 使用方法：")
     print("  scraper = XueqiuScraper(cookies={'xueqiu_auth_token': 'your_token'})")